@@ -6,20 +6,54 @@ Handles all chatbot requests and medical logic
 import datetime
 import json
 import os
+import queue
+import threading
+import time
+
+_BOOT_STARTED = time.perf_counter()
+
+from dotenv import load_dotenv
+
+# Services now load lazily, so read .env before anything calls os.getenv
+load_dotenv()
 
 from auth_manager import auth_manager
-from camera_analyzer import camera_analyzer
-from database import db
+from caching import LRUCache, normalize_message
+from duration_parser import parse_durations
 from emergency_detector import EmergencyDetector
-from emergency_service import emergency_service
-from flask import Flask, jsonify, request, send_from_directory
+from emergency_service import EMERGENCY_HEADLINE, emergency_service
+from flask import (
+    Flask,
+    Response,
+    g,
+    jsonify,
+    request,
+    send_from_directory,
+    stream_with_context,
+)
 from flask_cors import CORS
-from gemini_service import gemini_service
+from knowledge_base import knowledge_base
 from otp_service import otp_service
+from response_store import ResponseStore
+from service_registry import services
 from severity_classifier import SeverityClassifier
 from symptom_analyzer import SymptomAnalyzer
+from traffic_recorder import TrafficRecorder
 from unified_auth import register_unified_auth_route
 
+# Heavy subsystems are imported and initialized on first use
+services.register(
+    "gemini",
+    "gemini_service",
+    "gemini_service",
+    dependencies=("PIL.Image", "google.generativeai"),
+)
+services.register("camera", "camera_analyzer", "camera_analyzer")
+services.register("db", "database", "db")
+gemini_service = services.lazy("gemini")
+camera_analyzer = services.lazy("camera")
+db = services.lazy("db")
+
 app = Flask(__name__)
 CORS(app)  # Allow frontend to communicate
 
@@ -28,9 +62,31 @@ analyzer = SymptomAnalyzer()
 classifier = SeverityClassifier()
 emergency = EmergencyDetector()
 
-# Load knowledge bases
-with open("medical_kb.json", "r") as f:
-    MEDICAL_KB = json.load(f)
+# Memoize rule-based triage results for repeated messages
+triage_cache = LRUCache(
+    capacity=int(os.getenv("TRIAGE_CACHE_SIZE", "2048")), name="triage"
+)
+
+# Slow follow-ups (LLM elaborations) run in the background and are fetched by id
+background_responses = ResponseStore(
+    ttl=float(os.getenv("BACKGROUND_RESPONSE_TTL", "300")),
+    max_workers=int(os.getenv("BACKGROUND_RESPONSE_WORKERS", "4")),
+    shared_cache=lambda: gemini_service.disk_cache,
+    name="responses",
+)
+# Off by default: the template is reviewed wording, an AI addition is not
+EMERGENCY_AI_ELABORATION = os.getenv("EMERGENCY_AI_ELABORATION", "0") == "1"
+# Long-polls hold a worker, so keep them short
+LONG_POLL_MAX_WAIT = float(os.getenv("LONG_POLL_MAX_WAIT", "10"))
+# /api/chat answers from the rule engine at once and upgrades to Gemini in the
+# background (per request with {"speculative": true})
+SPECULATIVE_CHAT = os.getenv("SPECULATIVE_CHAT", "0") == "1"
+SPECULATIVE_STREAM_MAX_WAIT = float(os.getenv("SPECULATIVE_STREAM_MAX_WAIT", "30"))
+SSE_MIN_POLL_INTERVAL = 0.5
+# Anonymized /api/chat traffic for offline replay (CHAT_RECORD_PATH, off by default)
+chat_recorder = TrafficRecorder.from_env()
+
+# Load knowledge bases (medical_kb.json is shared and hot-reloaded via knowledge_base)
 with open("doctors_db.json", "r") as f:
     DOCTORS_DB = json.load(f)
 
@@ -58,6 +114,28 @@ def serve_frontend(path):
         return send_from_directory("../frontend", "index.html")
 
 
+@app.before_request
+def start_chat_recording():
+    if chat_recorder.enabled and request.endpoint == "chat":
+        g.chat_started = time.perf_counter()
+
+
+@app.after_request
+def record_chat_traffic(response):
+    """Append the finished /api/chat request to the traffic recording"""
+    if chat_recorder.enabled and "chat_started" in g:
+        data = request.get_json(silent=True) or {}
+        chat_recorder.record(
+            message=str(data.get("message", "")),
+            user_id=data.get("user_id"),
+            triage=g.get("chat_triage"),
+            seconds=time.perf_counter() - g.chat_started,
+            status=response.status_code,
+            speculative=bool(data.get("speculative", SPECULATIVE_CHAT)),
+        )
+    return response
+
+
 @app.route("/api/chat", methods=["POST"])
 def chat():
     """Main chat endpoint with LLM-style responses"""
@@ -65,16 +143,21 @@ def chat():
         data = request.json
         user_message = data.get("message", "").lower().strip()
         user_id = data.get("user_id", "anonymous")
+        speculative = bool(data.get("speculative", SPECULATIVE_CHAT))
 
-        # Simulate thinking time (like LLM processing)
-        import random
-        import time
+        if not speculative:
+            # Simulate thinking time (like LLM processing)
+            import random
+            import time
 
-        thinking_time = random.uniform(0.5, 1.5)  # 0.5-1.5 seconds
-        time.sleep(thinking_time)
+            thinking_time = random.uniform(0.5, 1.5)  # 0.5-1.5 seconds
+            time.sleep(thinking_time)
+
+        triage = run_triage(user_message)
+        g.chat_triage = triage
 
         # Check if non-medical query
-        if is_non_medical(user_message):
+        if triage["non_medical"]:
             return jsonify(
                 {
                     "response": generate_llm_style_response(
@@ -92,7 +175,7 @@ def chat():
             )
 
         # Check for emergency first
-        emergency_result = emergency.check_emergency(user_message)
+        emergency_result = triage["emergency"]
         if emergency_result["is_emergency"]:
             return jsonify(
                 {
@@ -110,11 +193,16 @@ def chat():
             )
 
         # Analyze symptoms with detailed reasoning
-        symptoms = analyzer.extract_symptoms(user_message)
-        severity = classifier.classify(user_message, symptoms)
+        symptoms = triage["symptoms"]
+        severity = triage["severity"]
+
+        if speculative:
+            return speculative_chat(user_message, symptoms, severity, user_id, triage)
 
         # Generate AI-powered response using Gemini
-        ai_response = gemini_service.chat_medical(user_message, symptoms, severity)
+        ai_response = gemini_service.chat_medical(
+            user_message, symptoms, severity, durations=triage["durations"]
+        )
 
         # Generate enhanced LLM-style response with reasoning
         response = generate_medical_response_llm(
@@ -158,6 +246,229 @@ def chat():
         )
 
 
+def speculative_chat(user_message, symptoms, severity, user_id, triage):
+    """
+    Answer /api/chat from the rule engine right away. Unless Gemini can answer
+    without an upstream call (cache hit, local answer), its answer is computed
+    by a background worker and offered as an `upgrade` the client picks up
+    via long-poll or SSE.
+    """
+    response = generate_medical_response_llm(user_message, symptoms, severity, user_id)
+    durations = triage["durations"]
+
+    final_response, source, upgrade = response["text"], "rules", None
+    quick_text, quick_source, upstream = gemini_service.cached_chat_answer(
+        user_message, symptoms, severity, durations=durations
+    )
+    if upstream is None:
+        final_response, source = quick_text, quick_source
+    else:
+
+        def upgrade_answer():
+            # Continues the same call - the caches were already checked
+            text, answer_source = upstream()
+            # A Gemini fallback is no better than the rule-based answer already shown
+            upgraded = answer_source in ("model", "cache")
+            return {
+                "response": text if upgraded else None,
+                "source": answer_source,
+                "upgraded": upgraded,
+            }
+
+        upgrade_id = background_responses.submit(upgrade_answer)
+        upgrade = {
+            "id": upgrade_id,
+            "status": "pending",
+            "poll_url": f"/api/chat/upgrade/{upgrade_id}",
+            "stream_url": f"/api/chat/upgrade/{upgrade_id}/stream",
+        }
+
+    return jsonify(
+        {
+            "response": final_response,
+            "source": source,
+            "upgrade": upgrade,
+            "severity": severity,
+            "type": response["type"],
+            "suggested_doctors": response.get("doctors", []),
+            "actions": response.get("actions", []),
+            "redirect_to": response.get("redirect_to"),
+            "thinking_process": response.get("thinking_process", ""),
+            "reasoning": response.get("reasoning", ""),
+            "follow_up": response.get("follow_up", []),
+        }
+    )
+
+
+def chat_upgrade_payload(entry):
+    result = entry["result"] or {}
+    return {
+        "success": entry["status"] != "failed",
+        "id": entry["id"],
+        "status": entry["status"],
+        "upgraded": bool(result.get("upgraded")),
+        "response": result.get("response"),
+        "source": result.get("source"),
+    }
+
+
+@app.route("/api/chat/upgrade/<response_id>", methods=["GET"])
+def chat_upgrade(response_id):
+    """
+    Poll for the Gemini answer behind a speculative /api/chat response
+    ?wait=<seconds> long-polls until it is ready (capped at LONG_POLL_MAX_WAIT)
+    """
+    wait = min(request.args.get("wait", 0, type=float), LONG_POLL_MAX_WAIT)
+    entry = background_responses.get(response_id, wait=max(0.0, wait))
+    return jsonify(chat_upgrade_payload(entry))
+
+
+@app.route("/api/chat/upgrade/<response_id>/stream", methods=["GET"])
+def chat_upgrade_stream(response_id):
+    """
+    SSE variant of /api/chat/upgrade/<id>: keep-alive comments while pending,
+    then one `upgrade` event (or `error` if it failed, expired or timed out)
+    """
+
+    def generate():
+        deadline = time.monotonic() + SPECULATIVE_STREAM_MAX_WAIT
+        while True:
+            started = time.monotonic()
+            remaining = deadline - started
+            entry = background_responses.get(
+                response_id, wait=max(0.0, min(5.0, remaining))
+            )
+            if entry["status"] == "ready":
+                yield sse_event("upgrade", chat_upgrade_payload(entry))
+                return
+            if entry["status"] != "pending" or remaining <= 0:
+                yield sse_event("error", chat_upgrade_payload(entry))
+                return
+            yield ": pending\n\n"
+            # Never spin, even if a lookup returns before its wait is up
+            idle = SSE_MIN_POLL_INTERVAL - (time.monotonic() - started)
+            if idle > 0:
+                time.sleep(min(idle, max(0.0, deadline - time.monotonic())))
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def sse_event(event, data):
+    """Format one Server-Sent Events frame with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.route("/api/chat/stream", methods=["GET", "POST"])
+def chat_stream():
+    """
+    Streaming chat (Server-Sent Events). The rule-based triage result is sent
+    first as a `triage` event, followed by `token` events as Gemini generates
+    the answer and a final `done` event.
+
+    POST takes the same JSON body as /api/chat; GET takes ?message=&user_id=&city=
+    so the endpoint also works with a browser EventSource.
+    """
+    data = request.get_json(silent=True) or request.args
+    user_message = (data.get("message") or "").lower().strip()
+    user_id = data.get("user_id", "anonymous")
+    city = data.get("city", "unknown")
+
+    def generate():
+        try:
+            triage = run_triage(user_message)
+
+            if triage["non_medical"]:
+                yield sse_event("triage", {"severity": 0, "type": "general"})
+                yield sse_event(
+                    "token",
+                    {
+                        "text": "I appreciate you reaching out, but I'm specifically designed to assist with medical and health-related concerns. I'm trained to analyze symptoms, provide health guidance, and help in medical emergencies.\n\nIs there a health concern I can help you with today?"
+                    },
+                )
+                yield sse_event(
+                    "done",
+                    {
+                        "follow_up": [
+                            "Do you have any health symptoms?",
+                            "Is there a medical concern I can help with?",
+                        ]
+                    },
+                )
+                return
+
+            emergency_result = triage["emergency"]
+            if emergency_result["is_emergency"]:
+                yield sse_event(
+                    "triage",
+                    {
+                        "severity": 4,
+                        "type": "emergency",
+                        "is_emergency": True,
+                        "level": emergency_result.get("level", 4),
+                        "first_aid": emergency_result.get("first_aid", []),
+                        "hospitals": get_nearby_hospitals(city),
+                    },
+                )
+                yield sse_event("token", {"text": emergency_result["response"]})
+                yield sse_event(
+                    "done",
+                    {
+                        "reasoning": "Based on the keywords in your message, this appears to be a medical emergency requiring immediate attention."
+                    },
+                )
+                return
+
+            symptoms = triage["symptoms"]
+            severity = triage["severity"]
+            response = generate_medical_response_llm(
+                user_message, symptoms, severity, user_id
+            )
+            yield sse_event(
+                "triage",
+                {
+                    "severity": severity,
+                    "type": response["type"],
+                    "is_emergency": False,
+                    "symptoms": symptoms,
+                    "suggested_doctors": response.get("doctors", []),
+                    "actions": response.get("actions", []),
+                    "redirect_to": response.get("redirect_to"),
+                },
+            )
+
+            for text in gemini_service.stream_chat_medical(
+                user_message, symptoms, severity, durations=triage["durations"]
+            ):
+                yield sse_event("token", {"text": text})
+
+            yield sse_event(
+                "done",
+                {
+                    "thinking_process": response.get("thinking_process", ""),
+                    "reasoning": response.get("reasoning", ""),
+                    "follow_up": response.get("follow_up", []),
+                },
+            )
+        except Exception as e:
+            print(f"[ERROR] Chat stream failed: {e}")
+            yield sse_event(
+                "error",
+                {
+                    "response": "I encountered an issue processing your message. Could you please rephrase your symptoms more clearly? For example: 'I have a fever and cough for 2 days.'"
+                },
+            )
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/api/save-doctor", methods=["POST"])
 def save_doctor():
     """Save user's family doctor"""
@@ -251,6 +562,61 @@ def analyze_injury_image():
         )
 
 
+@app.route("/api/analyze-injury-image/stream", methods=["POST"])
+def analyze_injury_image_stream():
+    """
+    Streaming injury analysis (Server-Sent Events). `field` events carry each
+    field of the analysis as soon as the model has produced it (stage
+    "preview" or "full" in progressive mode), then a `result` event carries
+    the complete analysis, same as /api/analyze-injury-image returns.
+    """
+    data = request.get_json(silent=True) or {}
+    image_data = data.get("image")
+    user_notes = data.get("notes", "")
+    if not image_data:
+        return jsonify({"success": False, "error": "No image data provided"}), 400
+
+    events = queue.Queue()
+    finished = object()
+
+    def analyze():
+        try:
+            analysis = gemini_service.analyze_injury_image(
+                image_data,
+                on_field=lambda field, value, stage: events.put(
+                    ("field", {"field": field, "value": value, "stage": stage})
+                ),
+            )
+            if user_notes and analysis.get("success"):
+                analysis["user_notes"] = user_notes
+            events.put(("result", analysis))
+        except Exception as e:
+            print(f"[ERROR] Injury image stream failed: {e}")
+            events.put(
+                (
+                    "error",
+                    {"success": False, "message": "Analysis failed. Please try again."},
+                )
+            )
+        finally:
+            events.put(finished)
+
+    threading.Thread(target=analyze, name="injury-image-stream", daemon=True).start()
+
+    def generate():
+        while True:
+            event = events.get()
+            if event is finished:
+                return
+            yield sse_event(*event)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/api/injury-stats", methods=["GET"])
 def get_injury_stats():
     """Get available injury types and statistics"""
@@ -278,6 +644,33 @@ def find_doctors():
     return jsonify({"doctors": matches[:5]})  # Return top 5
 
 
+def run_triage(message, cache=None):
+    """
+    Run the rule engine (non-medical, emergency, symptoms, severity) once per
+    normalized message. Cached results are shared - callers must not mutate them.
+    """
+    cache = triage_cache if cache is None else cache
+    # Pin one knowledge base version for the whole request
+    kb = knowledge_base.current()
+    key = normalize_message(message)
+    cache_key = (kb.version, key)
+    result = cache.get(cache_key)
+    if result is not None:
+        return result
+
+    symptoms = analyzer.extract_symptoms(key, kb=kb)
+    durations = parse_durations(key)
+    result = {
+        "non_medical": is_non_medical(key),
+        "emergency": emergency.check_emergency(key),
+        "symptoms": symptoms,
+        "durations": durations,
+        "severity": classifier.classify(key, symptoms, durations),
+    }
+    cache.put(cache_key, result)
+    return result
+
+
 def is_non_medical(message):
     """Detect non-medical queries"""
     non_medical_keywords = [
@@ -607,11 +1000,14 @@ def chat_message():
     # Use existing chat endpoint logic (same as /api/chat)
     try:
         # Analyze symptoms
-        symptoms = analyzer.extract_symptoms(message)
-        severity = classifier.classify(message, symptoms)
+        triage = run_triage(message)
+        symptoms = triage["symptoms"]
+        severity = triage["severity"]
 
         # Generate AI-powered response using Gemini for disease recognition
-        ai_response = gemini_service.chat_medical(message, symptoms, severity)
+        ai_response = gemini_service.chat_medical(
+            message, symptoms, severity, durations=triage["durations"]
+        )
 
         return jsonify(
             {
@@ -636,6 +1032,97 @@ def chat_message():
         )
 
 
+@app.route("/api/cache/stats", methods=["GET"])
+def cache_stats():
+    """Hit/miss statistics for the in-process caches"""
+    # Like /api/health, reading stats must not force Gemini to load
+    if not services.is_loaded("gemini"):
+        return jsonify(
+            {
+                "success": True,
+                "triage": triage_cache.stats(),
+                "gemini_chat": None,
+                "gemini_semantic": None,
+                "disk": None,
+            }
+        )
+    return jsonify(
+        {
+            "success": True,
+            "triage": triage_cache.stats(),
+            "gemini_chat": gemini_service.response_cache.stats(),
+            "gemini_semantic": gemini_service.semantic_cache.stats(),
+            "disk": (
+                gemini_service.disk_cache.stats() if gemini_service.disk_cache else None
+            ),
+        }
+    )
+
+
+@app.route("/api/health", methods=["GET"])
+def health():
+    """Service health, including each Gemini model's circuit breaker state"""
+    # Health probes must not force the lazy Gemini service to load
+    if not services.is_loaded("gemini"):
+        gemini = {"loaded": False}
+        degraded = False
+    else:
+        circuits = gemini_service.breaker_stats()
+        degraded = not gemini_service.is_configured or any(
+            breaker["state"] != "closed" for breaker in circuits.values()
+        )
+        gemini = {
+            "loaded": True,
+            "configured": gemini_service.is_configured,
+            "circuits": circuits,
+        }
+    return jsonify(
+        {
+            "status": "degraded" if degraded else "ok",
+            "gemini": gemini,
+            "knowledge_base_version": knowledge_base.current().version,
+        }
+    )
+
+
+@app.route("/api/services/stats", methods=["GET"])
+def services_stats():
+    """Boot time, which lazy services are loaded, and per-module import times"""
+    return jsonify(
+        {
+            "success": True,
+            **services.stats(),
+            "background_responses": background_responses.stats(),
+            "traffic_recorder": chat_recorder.stats(),
+        }
+    )
+
+
+@app.route("/api/gemini/stats", methods=["GET"])
+def gemini_stats():
+    """Upstream call deadlines with timeout and late-arrival counters"""
+    if not services.is_loaded("gemini"):
+        return jsonify({"success": True, "upstream": None})
+    return jsonify({"success": True, "upstream": gemini_service.call_stats()})
+
+
+@app.route("/api/metrics", methods=["GET"])
+def metrics():
+    """Per-call Gemini accounting: size, latency, cache and fallback histograms,
+    plus upstream latency on cold vs warm connections"""
+    # Like /api/health, scraping metrics must not force Gemini to load
+    if not services.is_loaded("gemini"):
+        return jsonify({"success": True, "gemini": None, "connections": None})
+    recent = request.args.get("recent", "1") not in ("0", "false", "no")
+    return jsonify(
+        {
+            "success": True,
+            "gemini": gemini_service.metrics.snapshot(recent=recent),
+            "connections": gemini_service.connections.stats(),
+        }
+    )
+
+
 @app.route("/api/chat/history/<user_id>", methods=["GET"])
 def chat_history(user_id):
     """Get chat history for user"""
@@ -1099,6 +1586,7 @@ def search():
     search_type = request.args.get("type", "all")
 
     results = {"doctors": [], "symptoms": [], "medicines": [], "articles": []}
+    medical_kb = knowledge_base.current().data
 
     # Search doctors
     if search_type in ["all", "doctors"]:
@@ -1112,7 +1600,7 @@ def search():
 
     # Search symptoms
     if search_type in ["all", "symptoms"]:
-        symptoms = MEDICAL_KB.get("symptoms", {})
+        symptoms = medical_kb.get("symptoms", {})
         results["symptoms"] = [
             {"name": symptom, "info": info}
             for symptom, info in symptoms.items()
@@ -1121,7 +1609,7 @@ def search():
 
     # Search medicines
     if search_type in ["all", "medicines"]:
-        medicines = MEDICAL_KB.get("medicines", {})
+        medicines = medical_kb.get("medicines", {})
         results["medicines"] = [
             {"name": med, "info": info}
             for med, info in medicines.items()
@@ -1435,32 +1923,33 @@ def emergency_chat():
             session_id=session_id, user_message=user_message
         )
 
-        # Get strict emergency prompt to override normal AI
-        strict_prompt = emergency_context["strict_prompt"]
-
-        # Generate AI response with emergency restrictions
-        # This MUST NOT diagnose, treat, or reassure
-        emergency_response = gemini_service.chat_medical(
-            user_message=user_message,
-            symptoms=[],
-            severity=4,
-            system_override=strict_prompt,  # Force emergency mode
+        # Answer instantly from the keyword templates - never wait on an LLM
+        # before telling someone to call 112
+        emergency_response = emergency_service.render_template_response(
+            emergency.check_emergency(user_message)
         )
 
-        # Ensure response prioritizes 112
-        if "🚨 CALL 112 IMMEDIATELY" not in emergency_response:
-            emergency_response = (
-                "🚨 CALL 112 IMMEDIATELY\n\n"
-                "This is a potential emergency situation. "
-                "Professional emergency services are the ONLY appropriate response.\n\n"
-                + emergency_response
+        # The LLM elaboration (strict prompt: no diagnosis, no treatment, no
+        # reassurance) is fetched off the critical path and picked up by polling
+        elaboration = None
+        if EMERGENCY_AI_ELABORATION:
+            strict_prompt = emergency_context["strict_prompt"]
+            elaboration_id = background_responses.submit(
+                lambda: elaborate_emergency(user_message, strict_prompt)
             )
+            elaboration = {
+                "id": elaboration_id,
+                "status": "pending",
+                "poll_url": f"/api/emergency/chat/{elaboration_id}",
+            }
 
         return (
             jsonify(
                 {
                     "success": True,
                     "response": emergency_response,
+                    "source": "template",
+                    "elaboration": elaboration,
                     "emergency_mode": True,
                     "restrictions": emergency_context["context"]["restrictions"],
                     "session_id": session_id,
@@ -1487,6 +1976,52 @@ def emergency_chat():
         )
 
 
+def elaborate_emergency(user_message, strict_prompt):
+    """Background job: strict-mode LLM answer for an emergency message"""
+    if not gemini_service.is_configured:
+        return {"response": None, "source": "template"}
+
+    # Generate AI response with emergency restrictions
+    # This MUST NOT diagnose, treat, or reassure
+    emergency_response = gemini_service.chat_medical(
+        user_message=user_message,
+        symptoms=[],
+        severity=4,
+        system_override=strict_prompt,  # Force emergency mode
+    )
+
+    # Ensure response prioritizes 112
+    if EMERGENCY_HEADLINE not in emergency_response:
+        emergency_response = (
+            f"{EMERGENCY_HEADLINE}\n\n"
+            "This is a potential emergency situation. "
+            "Professional emergency services are the ONLY appropriate response.\n\n"
+            + emergency_response
+        )
+    return {"response": emergency_response, "source": "ai"}
+
+
+@app.route("/api/emergency/chat/<response_id>", methods=["GET"])
+def emergency_chat_elaboration(response_id):
+    """
+    Poll for the LLM elaboration of an emergency chat answer
+    ?wait=<seconds> long-polls until it is ready (capped at LONG_POLL_MAX_WAIT)
+    """
+    wait = min(request.args.get("wait", 0, type=float), LONG_POLL_MAX_WAIT)
+    entry = background_responses.get(response_id, wait=max(0.0, wait))
+    result = entry["result"] or {}
+    return jsonify(
+        {
+            "success": entry["status"] != "failed",
+            "id": response_id,
+            "status": entry["status"],
+            "response": result.get("response"),
+            "source": result.get("source"),
+            "emergency_mode": True,
+        }
+    )
+
+
 @app.route("/api/emergency/hospitals", methods=["POST"])
 def emergency_hospitals():
     """
@@ -1549,6 +2084,10 @@ def emergency_hospitals():
 # ============================================
 register_unified_auth_route(app, db, otp_service)
 
+services.boot_seconds = round(time.perf_counter() - _BOOT_STARTED, 4)
+if os.getenv("PREWARM_SERVICES", "0") == "1":
+    services.prewarm()
+
 
 if __name__ == "__main__":
     print("🚀 MedicSense AI Backend Starting...")
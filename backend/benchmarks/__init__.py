@@ -0,0 +1,4 @@
+"""
+Benchmarks and load-test tooling for the MedicSense AI backend
+Run modules from the backend directory, e.g. `python -m benchmarks.triage_bench`
+"""
@@ -0,0 +1,186 @@
+"""
+Synthetic Corpus - Seeded generator of realistic chat messages
+Varies message length, symptom density, emergency rate and typo rate
+"""
+
+import random
+from typing import Dict, List, Optional
+
+SYMPTOM_PHRASES = [
+    "fever",
+    "headache",
+    "cough",
+    "dry cough",
+    "chest pain",
+    "nausea",
+    "sore throat",
+    "runny nose",
+    "back pain",
+    "stomach ache",
+    "dizziness",
+    "rash",
+    "vomiting",
+    "diarrhea",
+    "chills",
+    "fatigue",
+    "head pain",
+    "queasy",
+    "short of breath",
+    "joint pain",
+]
+
+EMERGENCY_PHRASES = [
+    "he is unconscious",
+    "bleeding heavily from the leg",
+    "snake bite on my foot",
+    "i cannot breathe",
+    "my father may be having a heart attack",
+    "signs of a stroke",
+    "had an accident",
+    "i think my arm is broken",
+]
+
+NON_MEDICAL_PHRASES = [
+    "tell me a joke",
+    "what is the weather today",
+    "recommend a movie",
+    "who won the sport match",
+    "give me a pasta recipe",
+]
+
+OPENERS = [
+    "i have",
+    "i am having",
+    "i feel",
+    "since yesterday i have",
+    "my son has",
+    "hello doctor i have",
+    "please help i have",
+]
+
+CONNECTORS = ["and", "with", "plus", "also", "along with"]
+
+DURATIONS = [
+    "for 2 days",
+    "for two days",
+    "since 3-4 hours",
+    "for 20 minutes",
+    "for a week",
+    "for 3 weeks",
+    "for six months",
+    "since 1 year",
+]
+
+# Short messages that real traffic repeats verbatim (or nearly so)
+COMMON_MESSAGES = [
+    "i have a fever",
+    "headache",
+    "cough for 2 days",
+    "I have a fever",
+    "i have a  headache",
+    "sore throat",
+    "stomach ache",
+    "i feel dizzy",
+]
+
+FILLER = [
+    "it is getting worse",
+    "and i am worried",
+    "mostly at night",
+    "after eating",
+    "i tried paracetamol",
+    "it comes and goes",
+    "not sure what to do",
+    "my mother says i should rest",
+    "is it serious",
+    "what should i do",
+]
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    """Apply one random keyboard-style edit to a word"""
+    if len(word) < 3:
+        return word
+    i = rng.randrange(len(word))
+    op = rng.random()
+    if op < 0.25:
+        return word[:i] + word[i + 1 :]  # deletion
+    if op < 0.5:
+        return word[:i] + rng.choice("aeiou") + word[i:]  # insertion
+    if op < 0.75 and i < len(word) - 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2 :]  # transposition
+    return word[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + word[i + 1 :]
+
+
+class SyntheticCorpus:
+    """Deterministic message generator - same seed and settings, same corpus"""
+
+    def __init__(
+        self,
+        seed: int = 42,
+        min_words: int = 3,
+        max_words: int = 40,
+        symptom_density: float = 0.6,
+        emergency_rate: float = 0.05,
+        non_medical_rate: float = 0.05,
+        typo_rate: float = 0.05,
+        repeat_rate: float = 0.3,
+    ):
+        self.seed = seed
+        self.min_words = min_words
+        self.max_words = max_words
+        self.symptom_density = symptom_density
+        self.emergency_rate = emergency_rate
+        self.non_medical_rate = non_medical_rate
+        self.typo_rate = typo_rate
+        self.repeat_rate = repeat_rate
+
+    def settings(self) -> Dict:
+        """Generator settings, stored alongside benchmark results"""
+        return {
+            "seed": self.seed,
+            "min_words": self.min_words,
+            "max_words": self.max_words,
+            "symptom_density": self.symptom_density,
+            "emergency_rate": self.emergency_rate,
+            "non_medical_rate": self.non_medical_rate,
+            "typo_rate": self.typo_rate,
+            "repeat_rate": self.repeat_rate,
+        }
+
+    def generate(self, count: int, rng: Optional[random.Random] = None) -> List[str]:
+        """Generate `count` messages"""
+        rng = rng or random.Random(self.seed)
+        return [self._message(rng) for _ in range(count)]
+
+    def _message(self, rng: random.Random) -> str:
+        if rng.random() < self.repeat_rate:
+            return rng.choice(COMMON_MESSAGES)
+
+        target = rng.randint(self.min_words, self.max_words)
+        roll = rng.random()
+
+        if roll < self.non_medical_rate:
+            parts = [rng.choice(NON_MEDICAL_PHRASES)]
+        else:
+            parts = [rng.choice(OPENERS), rng.choice(SYMPTOM_PHRASES)]
+            if roll < self.non_medical_rate + self.emergency_rate:
+                parts.insert(0, rng.choice(EMERGENCY_PHRASES))
+
+        words = len(" ".join(parts).split())
+        while words < target:
+            if rng.random() < self.symptom_density:
+                chunk = f"{rng.choice(CONNECTORS)} {rng.choice(SYMPTOM_PHRASES)}"
+            elif rng.random() < 0.3:
+                chunk = rng.choice(DURATIONS)
+            else:
+                chunk = rng.choice(FILLER)
+            parts.append(chunk)
+            words += len(chunk.split())
+
+        tokens = " ".join(parts).split()[: max(target, 2)]
+        if self.typo_rate:
+            tokens = [
+                _typo(t, rng) if rng.random() < self.typo_rate else t for t in tokens
+            ]
+        return " ".join(tokens)
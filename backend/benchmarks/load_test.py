@@ -0,0 +1,354 @@
+"""
+Load Test - Latency and throughput of the AI endpoints against a fake Gemini backend
+Drives /api/chat, /api/chat/message, /api/emergency/chat and /api/analyze-injury-image
+with concurrent clients under scenarios that vary upstream latency, errors and stalls
+
+Usage (from backend/):
+    python -m benchmarks.load_test                                  # every scenario, in-process
+    python -m benchmarks.load_test --scenario flaky --concurrency 32 --duration 30
+    python -m benchmarks.load_test --list
+
+    # Against a running server (start it with the scenario's FAKE_LLM_* settings):
+    GEMINI_BACKEND=fake FAKE_LLM_ERROR_RATE=0.3 gunicorn app:app --bind 127.0.0.1:5000
+    python -m benchmarks.load_test --url http://127.0.0.1:5000 --scenario flaky
+
+In-process runs use Flask's test client, so the numbers exclude HTTP and
+gunicorn overhead; they are best compared with each other, not with production.
+"""
+
+import argparse
+import base64
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from benchmarks.corpus import EMERGENCY_PHRASES, SyntheticCorpus
+from benchmarks.triage_bench import percentile
+
+# FAKE_LLM_* settings and endpoint mix per scenario
+SCENARIOS = {
+    "steady": {
+        "description": "Healthy upstream: ~1.2 s median, 1% errors",
+        "fake": {"LATENCY": "lognormal:1.2,0.4", "ERROR_RATE": "0.01"},
+        "mix": {"chat": 3, "chat_message": 4, "emergency_chat": 1, "injury_image": 1},
+    },
+    "slow": {
+        "description": "Degraded upstream: ~3 s median with 5% 30 s stalls",
+        "fake": {
+            "LATENCY": "lognormal:3.0,0.5",
+            "SLOW_RATE": "0.05",
+            "SLOW_LATENCY": "fixed:30",
+        },
+        "mix": {"chat": 3, "chat_message": 4, "emergency_chat": 1, "injury_image": 1},
+    },
+    "flaky": {
+        "description": "Failing upstream: 40% errors (circuit breaker should open)",
+        "fake": {"LATENCY": "lognormal:0.8,0.4", "ERROR_RATE": "0.4"},
+        "mix": {"chat": 3, "chat_message": 4, "emergency_chat": 1, "injury_image": 1},
+    },
+    "emergency_surge": {
+        "description": "Incident: half of the traffic is emergency chat",
+        "fake": {"LATENCY": "lognormal:1.5,0.5", "ERROR_RATE": "0.02"},
+        "mix": {"chat": 1, "chat_message": 3, "emergency_chat": 4},
+    },
+    "images": {
+        "description": "Image-heavy traffic with slower vision calls",
+        "fake": {"LATENCY": "lognormal:4.0,0.4", "ERROR_RATE": "0.02"},
+        "mix": {"chat_message": 1, "injury_image": 3},
+    },
+}
+
+ENDPOINT_PATHS = {
+    "chat": "/api/chat",
+    "chat_message": "/api/chat/message",
+    "emergency_chat": "/api/emergency/chat",
+    "injury_image": "/api/analyze-injury-image",
+}
+
+
+def make_images(seed: int) -> List[str]:
+    """A few phone-photo sized JPEG data URLs (different sizes, so different cache keys)"""
+    from PIL import Image
+
+    images = []
+    for index, size in enumerate(
+        [(4032, 3024), (3024, 4032), (1920, 1080), (1280, 960)]
+    ):
+        image = Image.effect_noise(size, 40 + index).convert("RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=90)
+        images.append(
+            "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode()
+        )
+    random.Random(seed).shuffle(images)
+    return images
+
+
+class RequestFactory:
+    """Builds (endpoint, path, payload) tuples for one simulated client"""
+
+    def __init__(self, mix: Dict[str, float], seed: int, images: List[str]):
+        self.rng = random.Random(seed)
+        self.endpoints = list(mix)
+        self.weights = [mix[name] for name in self.endpoints]
+        self.corpus = SyntheticCorpus(seed=seed, emergency_rate=0.0)
+        self.messages = self.corpus.generate(500)
+        self.images = images
+        self.user_id = f"loadtest-{seed}"
+
+    def next(self) -> Tuple[str, str, Dict]:
+        endpoint = self.rng.choices(self.endpoints, self.weights)[0]
+        if endpoint == "emergency_chat":
+            payload = {
+                "session_id": f"{self.user_id}-{self.rng.randrange(10**6)}",
+                "message": self.rng.choice(EMERGENCY_PHRASES),
+            }
+        elif endpoint == "injury_image":
+            payload = {"image": self.rng.choice(self.images)}
+        elif endpoint == "chat":
+            payload = {
+                "message": self.rng.choice(self.messages),
+                "user_id": self.user_id,
+            }
+        else:
+            payload = {
+                "message": self.rng.choice(self.messages),
+                "userId": self.user_id,
+            }
+        return endpoint, ENDPOINT_PATHS[endpoint], payload
+
+
+def in_process_client():
+    """post(path, payload) -> status, backed by the Flask test client"""
+    import app
+
+    client = app.app.test_client()
+
+    def post(path: str, payload: Dict) -> int:
+        return client.post(path, json=payload).status_code
+
+    return post
+
+
+def http_client(base_url: str, timeout: float = 60):
+    """post(path, payload) -> status, over real HTTP"""
+
+    def post(path: str, payload: Dict) -> int:
+        request = urllib.request.Request(
+            base_url.rstrip("/") + path,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+        except (urllib.error.URLError, OSError):
+            return 0
+
+    return post
+
+
+def install_fake_backend(fake_settings: Dict[str, str], seed: int):
+    """Fresh in-process GeminiService on the fake backend with this scenario's settings"""
+    for key in [k for k in os.environ if k.startswith("FAKE_LLM_")]:
+        del os.environ[key]
+    os.environ.update(
+        {f"FAKE_LLM_{key}": value for key, value in fake_settings.items()}
+    )
+    os.environ["FAKE_LLM_SEED"] = str(seed)
+    os.environ["GEMINI_BACKEND"] = "fake"
+
+    import app
+    from gemini_service import GeminiService
+
+    service = GeminiService()
+    app.services.override("gemini", service)
+    app.triage_cache.clear()
+    return service
+
+
+def run_scenario(
+    name: str,
+    concurrency: int,
+    duration: float,
+    seed: int,
+    images: List[str],
+    url: str = None,
+) -> Dict:
+    """Closed-loop load: each client sends its next request as soon as the last returns"""
+    scenario = SCENARIOS[name]
+    service = None
+    if url:
+        make_client = lambda: http_client(url)
+    else:
+        service = install_fake_backend(scenario["fake"], seed)
+        make_client = in_process_client
+
+    samples: Dict[str, List[float]] = defaultdict(list)
+    failures: Dict[str, int] = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client_loop(index: int):
+        post = make_client()
+        factory = RequestFactory(scenario["mix"], seed * 1000 + index, images)
+        while time.perf_counter() < deadline:
+            endpoint, path, payload = factory.next()
+            started = time.perf_counter()
+            status = post(path, payload)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with lock:
+                samples[endpoint].append(elapsed_ms)
+                if status != 200:
+                    failures[endpoint] += 1
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=client_loop, args=(i,), daemon=True)
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for endpoint, values in sorted(samples.items()):
+        values.sort()
+        endpoints[endpoint] = {
+            "requests": len(values),
+            "errors": failures[endpoint],
+            "p50_ms": round(percentile(values, 50), 1),
+            "p95_ms": round(percentile(values, 95), 1),
+            "p99_ms": round(percentile(values, 99), 1),
+            "max_ms": round(values[-1], 1),
+            "throughput_per_s": round(len(values) / elapsed, 2),
+        }
+
+    return {
+        "scenario": name,
+        "description": scenario["description"],
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 1),
+        "requests": sum(e["requests"] for e in endpoints.values()),
+        "throughput_per_s": round(sum(len(v) for v in samples.values()) / elapsed, 2),
+        "endpoints": endpoints,
+        "upstream": upstream_summary(service, url),
+    }
+
+
+def upstream_summary(service, url: str = None) -> Dict:
+    """Timeouts, shedding and breaker state after the run"""
+    if url:
+        try:
+            with urllib.request.urlopen(
+                url.rstrip("/") + "/api/gemini/stats", timeout=5
+            ) as r:
+                stats = json.load(r)["upstream"]
+        except (urllib.error.URLError, OSError, ValueError, KeyError):
+            return {}
+        circuits = None
+    else:
+        stats = service.call_stats()
+        circuits = service.breaker_stats()
+
+    priorities = stats.get("scheduler", {}).get("priorities", {})
+    return {
+        "calls": stats.get("calls"),
+        "timeouts": stats.get("timeouts"),
+        "late_arrivals": stats.get("late_arrivals"),
+        "shed": sum(p["shed"] + p["expired"] for p in priorities.values()),
+        "coalesced": stats.get("single_flight", {}).get("coalesced"),
+        "circuit": (
+            {name: b["state"] for name, b in circuits.items()} if circuits else None
+        ),
+        "circuit_opened": (
+            sum(b["times_opened"] for b in circuits.values()) if circuits else None
+        ),
+    }
+
+
+def print_report(result: Dict):
+    print(
+        f"\n📈 {result['scenario']} - {result['description']}\n"
+        f"   {result['concurrency']} clients, {result['duration_s']}s, "
+        f"{result['requests']} requests, {result['throughput_per_s']}/s"
+    )
+    print(
+        f"   {'endpoint':<16}{'requests':>9}{'errors':>8}{'p50 ms':>10}"
+        f"{'p95 ms':>10}{'p99 ms':>10}{'req/s':>8}"
+    )
+    for endpoint, stats in result["endpoints"].items():
+        print(
+            f"   {endpoint:<16}{stats['requests']:>9}{stats['errors']:>8}"
+            f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+            f"{stats['throughput_per_s']:>8.2f}"
+        )
+    upstream = result["upstream"]
+    if upstream:
+        print(
+            "   upstream: "
+            + ", ".join(
+                f"{key}={value}" for key, value in upstream.items() if value is not None
+            )
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--scenario", action="append", choices=sorted(SCENARIOS), help="repeatable"
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--duration", type=float, default=15, help="seconds per scenario"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--url", help="load test a running server instead of in-process"
+    )
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--list", action="store_true", help="list scenarios and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, scenario in SCENARIOS.items():
+            settings = " ".join(
+                f"FAKE_LLM_{k}={v}" for k, v in scenario["fake"].items()
+            )
+            print(f"{name:<16}{scenario['description']}\n{'':<16}{settings}")
+        return 0
+
+    if not args.url:
+        # Measure the live path, not answers left on disk by earlier runs
+        os.environ["GEMINI_DISK_CACHE_PATH"] = ""
+
+    images = make_images(args.seed)
+    results = []
+    for name in args.scenario or list(SCENARIOS):
+        result = run_scenario(
+            name, args.concurrency, args.duration, args.seed, images, args.url
+        )
+        print_report(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
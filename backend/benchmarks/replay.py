@@ -0,0 +1,317 @@
+"""
+Replay - Drive recorded /api/chat traffic through triage and GeminiService offline
+Replays an NDJSON recording (CHAT_RECORD_PATH, see traffic_recorder.py) against
+a fake Gemini backend under several cache/router/deadline configurations and
+reports cache hit rate, latency distribution and fallback rate for each
+
+Usage (from backend/):
+    python -m benchmarks.replay data/chat_traffic.ndjson              # every configuration
+    python -m benchmarks.replay traffic.ndjson --config baseline --config no_semantic
+    python -m benchmarks.replay traffic.ndjson --speed 1              # recorded pacing
+    python -m benchmarks.replay --synthetic 2000                      # no recording needed
+    python -m benchmarks.replay --list
+
+Each configuration starts from empty caches; the disk cache is disabled so runs
+do not leak answers into each other. Without --speed the recording is replayed
+far faster than it arrived, so the upstream rate limit is lifted (it would shed
+most calls); replay at --speed 1 to evaluate rate limiting.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from benchmarks.corpus import SyntheticCorpus
+from benchmarks.triage_bench import percentile
+
+# Environment overrides per configuration (FAKE_LLM_* shape the stub model)
+CONFIGS = {
+    "baseline": {
+        "description": "Current defaults",
+        "env": {},
+    },
+    "no_cache": {
+        "description": "Exact and semantic answer caches disabled",
+        "env": {"GEMINI_CACHE_SIZE": "0", "GEMINI_SEMANTIC_CACHE_SIZE": "0"},
+    },
+    "no_semantic": {
+        "description": "Exact-match cache only",
+        "env": {"GEMINI_SEMANTIC_CACHE_SIZE": "0"},
+    },
+    "loose_semantic": {
+        "description": "Semantic cache threshold lowered to 0.75",
+        "env": {"GEMINI_SEMANTIC_THRESHOLD": "0.75"},
+    },
+    "local_answers": {
+        "description": "Local condition-scorer answers for mild cases",
+        "env": {"LOCAL_ANSWER_MAX_SEVERITY": "1"},
+    },
+    "tight_deadline": {
+        "description": "1.5 s chat deadline",
+        "env": {"GEMINI_CHAT_TIMEOUT": "1.5"},
+    },
+    "flaky": {
+        "description": "Upstream failing 30% of calls",
+        "env": {"FAKE_LLM_ERROR_RATE": "0.3"},
+    },
+    "router": {
+        "description": "Fast and pro fake models, fast one failing 25% of calls",
+        "env": {
+            "FAKE_LLM_FAST_LATENCY": "lognormal:0.5,0.3",
+            "FAKE_LLM_FAST_ERROR_RATE": "0.25",
+        },
+    },
+}
+
+CACHE_HITS = ("memory", "disk", "semantic")
+
+
+def load_traffic(path: str, limit: int = 0) -> List[Dict]:
+    """Recorded requests in arrival order"""
+    from traffic_recorder import read_records
+
+    records = [r for r in read_records(path) if r.get("status", 200) == 200]
+    records.sort(key=lambda r: r.get("ts", 0))
+    return records[:limit] if limit else records
+
+
+def synthetic_traffic(count: int, seed: int, rate: float = 20.0) -> List[Dict]:
+    """Recording-shaped records from the synthetic corpus, `rate` requests per second"""
+    messages = SyntheticCorpus(seed=seed).generate(count)
+    return [{"ts": i / rate, "message": message} for i, message in enumerate(messages)]
+
+
+def replay_message(record: Dict) -> str:
+    """The recorded message, or one rebuilt from its symptoms (text not recorded)"""
+    if record.get("message"):
+        return record["message"]
+    return "i have " + " and ".join(record.get("symptoms") or ["a health problem"])
+
+
+def install_service(env: Dict[str, str], seed: int):
+    """Fresh in-process GeminiService on the fake backend with these overrides"""
+    for key in [k for k in os.environ if k.startswith("FAKE_LLM_")]:
+        del os.environ[key]
+    os.environ.update(env)
+    os.environ.setdefault("FAKE_LLM_SEED", str(seed))
+    os.environ["GEMINI_BACKEND"] = "fake"
+
+    import app
+    from gemini_service import GeminiService
+
+    service = GeminiService()
+    app.services.override("gemini", service)
+    app.triage_cache.clear()
+    return service
+
+
+def run_config(
+    name: str,
+    records: List[Dict],
+    base_env: Dict[str, str],
+    seed: int,
+    concurrency: int,
+    speed: float,
+) -> Dict:
+    """Replay every record once through triage and chat_medical"""
+    import app
+
+    config = CONFIGS[name]
+    saved = dict(os.environ)
+    try:
+        service = install_service({**base_env, **config["env"]}, seed)
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+    samples: List[float] = []
+    outcomes: Counter = Counter()
+    lock = threading.Lock()
+
+    def replay_one(record: Dict):
+        message = replay_message(record).lower().strip()
+        started = time.perf_counter()
+        try:
+            triage = app.run_triage(message)
+            if triage["non_medical"]:
+                outcome = "non_medical"
+            elif triage["emergency"]["is_emergency"]:
+                outcome = "emergency"
+            else:
+                symptoms, severity = triage["symptoms"], triage["severity"]
+                _text, outcome = service.chat_medical_with_source(
+                    message, symptoms, severity, durations=triage["durations"]
+                )
+                app.generate_medical_response_llm(message, symptoms, severity, "replay")
+        except Exception as e:
+            print(f"[ERROR] Replay of {message[:40]!r} failed: {e}")
+            outcome = "error"
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with lock:
+            samples.append(elapsed_ms)
+            outcomes[outcome] += 1
+
+    started = time.perf_counter()
+    first_ts = records[0].get("ts", 0) if records else 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for record in records:
+            if speed > 0:
+                due = started + (record.get("ts", first_ts) - first_ts) / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            pool.submit(replay_one, record)
+    elapsed = time.perf_counter() - started
+
+    samples.sort()
+    chat = service.metrics.snapshot(recent=False)["kinds"].get("chat", {})
+    cache = chat.get("cache", {})
+    hits = sum(cache.get(tier, 0) for tier in CACHE_HITS)
+    lookups = hits + cache.get("miss", 0)
+    chat_calls = chat.get("calls", 0)
+    fallbacks = chat.get("sources", {}).get("fallback", 0)
+    upstream = chat.get("upstream_seconds", {})
+    router = service.router.stats()
+    # Pro and vision share one fake client; count each client once
+    clients = {
+        id(p.client): p.client
+        for p in service.router.providers.values()
+        if not p.is_local
+    }.values()
+
+    return {
+        "config": name,
+        "description": config["description"],
+        "requests": len(samples),
+        "duration_s": round(elapsed, 1),
+        "outcomes": dict(outcomes),
+        "latency_ms": {
+            "p50": round(percentile(samples, 50), 1),
+            "p95": round(percentile(samples, 95), 1),
+            "p99": round(percentile(samples, 99), 1),
+            "max": round(samples[-1], 1) if samples else 0.0,
+        },
+        "chat_calls": chat_calls,
+        "cache": {
+            **cache,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        },
+        "fallback_rate": round(fallbacks / chat_calls, 4) if chat_calls else 0.0,
+        "fallback_reasons": chat.get("fallback_reasons", {}),
+        "upstream": {
+            "calls": sum(client.calls for client in clients),
+            "providers": {
+                name: provider["calls"]
+                for name, provider in router["providers"].items()
+                if provider["calls"]
+            },
+            "selections": router["selections"],
+            "p50_s": upstream.get("p50"),
+            "p95_s": upstream.get("p95"),
+        },
+    }
+
+
+def print_report(result: Dict):
+    latency = result["latency_ms"]
+    print(
+        f"\n🔁 {result['config']} - {result['description']}\n"
+        f"   {result['requests']} requests in {result['duration_s']}s, "
+        f"{result['chat_calls']} answered by GeminiService, "
+        f"{result['upstream']['calls']} upstream calls"
+    )
+    print(
+        f"   latency ms: p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  "
+        f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}"
+    )
+    print(
+        f"   cache hit rate {result['cache']['hit_rate']:.1%}, "
+        f"fallback rate {result['fallback_rate']:.1%}"
+        + (f" {result['fallback_reasons']}" if result["fallback_reasons"] else "")
+    )
+    if len(result["upstream"]["providers"]) > 1:
+        print(
+            "   upstream calls by provider: "
+            + ", ".join(
+                f"{k}={v}" for k, v in sorted(result["upstream"]["providers"].items())
+            )
+        )
+    print(
+        "   outcomes: "
+        + ", ".join(f"{k}={v}" for k, v in sorted(result["outcomes"].items()))
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("traffic", nargs="?", help="NDJSON recording of /api/chat")
+    parser.add_argument(
+        "--config", action="append", choices=sorted(CONFIGS), help="repeatable"
+    )
+    parser.add_argument(
+        "--synthetic", type=int, default=0, help="replay N synthetic messages"
+    )
+    parser.add_argument("--limit", type=int, default=0, help="replay at most N records")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0,
+        help="1 = recorded pacing, 0 = as fast as possible",
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--latency",
+        default="lognormal:1.2,0.4",
+        help="stub model latency (FAKE_LLM_LATENCY)",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument(
+        "--list", action="store_true", help="list configurations and exit"
+    )
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, config in CONFIGS.items():
+            settings = " ".join(f"{k}={v}" for k, v in config["env"].items())
+            print(f"{name:<16}{config['description']}\n{'':<16}{settings}")
+        return 0
+
+    if args.traffic:
+        records = load_traffic(args.traffic, args.limit)
+    elif args.synthetic:
+        records = synthetic_traffic(args.synthetic, args.seed)
+    else:
+        parser.error("give a recording to replay or --synthetic N")
+    if not records:
+        print("❌ Nothing to replay")
+        return 1
+
+    # Replays must not read or fill the shared disk cache
+    base_env = {"GEMINI_DISK_CACHE_PATH": "", "FAKE_LLM_LATENCY": args.latency}
+    if args.speed <= 0:
+        base_env.update(
+            {"GEMINI_RATE_LIMIT_RPM": "1000000", "GEMINI_RATE_BURST": "1000000"}
+        )
+    results = []
+    for name in args.config or list(CONFIGS):
+        result = run_config(
+            name, records, base_env, args.seed, args.concurrency, args.speed
+        )
+        print_report(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
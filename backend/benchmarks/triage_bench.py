@@ -0,0 +1,280 @@
+"""
+Triage Benchmark - Latency and throughput of the rule-based triage engine
+Reports p50/p99/throughput per stage and end to end, and compares against a stored baseline
+
+Usage (from backend/):
+    python -m benchmarks.triage_bench                      # run and compare to baseline
+    python -m benchmarks.triage_bench --save-baseline      # record a new baseline
+    python -m benchmarks.triage_bench --typo-rate 0.2 --messages 20000
+
+The stored baseline is machine-specific - re-record it on the machine that
+runs the comparison.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.corpus import SyntheticCorpus
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(
+        0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1)
+    )
+    return sorted_values[rank]
+
+
+def time_stage(fn: Callable, inputs: List, rounds: int = 5, warmup: int = 200) -> Dict:
+    """
+    Call fn once per input, timing each call individually, with the garbage
+    collector paused while timing. p50 is the best (lowest) over `rounds`
+    passes - the least noisy estimate and the one regressions are gated on;
+    the other metrics are the median over passes.
+    """
+    for item in inputs[:warmup]:
+        fn(item)
+
+    perf_counter_ns = time.perf_counter_ns
+    passes = []
+    for _ in range(rounds):
+        samples = []
+        gc.disable()
+        try:
+            started = perf_counter_ns()
+            for item in inputs:
+                t0 = perf_counter_ns()
+                fn(item)
+                samples.append((perf_counter_ns() - t0) / 1000)
+            elapsed = (perf_counter_ns() - started) / 1e9
+        finally:
+            gc.enable()
+
+        samples.sort()
+        passes.append(
+            {
+                "p50_us": percentile(samples, 50),
+                "p99_us": percentile(samples, 99),
+                "mean_us": sum(samples) / len(samples),
+                "throughput_per_s": len(samples) / elapsed if elapsed else 0.0,
+            }
+        )
+
+    summary = {
+        metric: round(sorted(p[metric] for p in passes)[len(passes) // 2], 2)
+        for metric in passes[0]
+    }
+    summary["p50_us"] = round(min(p["p50_us"] for p in passes), 2)
+    return summary
+
+
+def reference_us(rounds: int = 50) -> float:
+    """
+    Best-of-rounds time of a fixed pure-Python workload (string and dict work,
+    like triage). Comparing stages relative to it cancels out machine-wide
+    slowdowns - CPU throttling, noisy neighbours - between runs.
+    """
+    words = [f"Word{i % 97}" for i in range(2000)]
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter_ns()
+        counts = {}
+        for word in words:
+            key = word.lower()
+            counts[key] = counts.get(key, 0) + 1
+        " ".join(words).split()
+        best = min(best, (time.perf_counter_ns() - started) / 1000)
+    return round(best, 2)
+
+
+def run_benchmark(corpus: SyntheticCorpus, count: int, rounds: int = 5) -> Dict:
+    """Benchmark each triage stage and the full pipeline over one corpus"""
+    import app
+    from caching import LRUCache, normalize_message
+
+    messages = [normalize_message(m) for m in corpus.generate(count)]
+    symptoms = [app.analyzer.extract_symptoms(m) for m in messages]
+    pairs = list(zip(messages, symptoms))
+
+    # Timed between stages so a slow spell mid-run shows up in the median
+    references = [reference_us()]
+
+    def timed(fn, inputs):
+        result = time_stage(fn, inputs, rounds)
+        references.append(reference_us())
+        return result
+
+    no_cache = LRUCache(0)
+    stages = {
+        "is_non_medical": timed(app.is_non_medical, messages),
+        "emergency_detector": timed(app.emergency.check_emergency, messages),
+        "symptom_analyzer": timed(app.analyzer.extract_symptoms, messages),
+        "severity_classifier": timed(
+            lambda pair: app.classifier.classify(pair[0], pair[1]), pairs
+        ),
+        "end_to_end": timed(lambda m: app.run_triage(m, cache=no_cache), messages),
+    }
+
+    # Same pipeline behind the memoization cache, as served in production
+    # (the cache stays warm across passes, like a long-running worker). With
+    # the default capacity most of the corpus misses, so p50 lands on a miss
+    # and only mean_us / throughput show the saving.
+    cache = LRUCache(capacity=int(os.getenv("TRIAGE_CACHE_SIZE", "2048")))
+    stages["end_to_end_cached"] = timed(
+        lambda m: app.run_triage(m, cache=cache), messages
+    )
+    stages["end_to_end_cached"]["hit_rate"] = cache.stats()["hit_rate"]
+
+    return {
+        "messages": count,
+        "reference_us": sorted(references)[len(references) // 2],
+        "corpus": corpus.settings(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "stages": stages,
+    }
+
+
+def compare(
+    results: Dict, baseline: Dict, tolerance: float, min_delta_us: float = 1.0
+) -> List[str]:
+    """
+    Return human-readable regressions against the baseline. Only best-of-rounds
+    p50 is gated - p99 and throughput of microsecond stages swing by tens of
+    percent between identical runs - and a slowdown must also exceed
+    `min_delta_us` so sub-microsecond jitter on the cheapest stages is ignored.
+    """
+    scale = machine_scale(results, baseline)
+    regressions = []
+    for stage, current in results["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base:
+            continue
+        expected = base["p50_us"] * scale
+        delta = current["p50_us"] - expected
+        if current["p50_us"] > expected * (1 + tolerance) and delta > min_delta_us:
+            regressions.append(
+                f"{stage}: p50 {current['p50_us']}us > baseline {expected:.2f}us"
+                f" ({base['p50_us']}us x machine speed {scale:.2f})"
+            )
+    return regressions
+
+
+def machine_scale(results: Dict, baseline: Dict) -> float:
+    """
+    How much slower this run's machine is than the baseline's (1.0 if unknown).
+    Never below 1.0: a reference loop that happens to run fast must not
+    tighten the budget below the recorded baseline.
+    """
+    current, base = results.get("reference_us"), (baseline or {}).get("reference_us")
+    return max(1.0, current / base) if current and base else 1.0
+
+
+def print_report(results: Dict, baseline: Dict = None):
+    print(
+        f"\n📊 Triage benchmark - {results['messages']} messages "
+        f"(seed {results['corpus']['seed']}, typo rate {results['corpus']['typo_rate']})"
+    )
+    print(f"{'stage':<22}{'p50 us':>10}{'p99 us':>10}{'msg/s':>12}{'vs base p50':>14}")
+    for stage, stats in results["stages"].items():
+        base = (baseline or {}).get("stages", {}).get(stage)
+        delta = ""
+        if base and base["p50_us"]:
+            expected = base["p50_us"] * machine_scale(results, baseline)
+            delta = f"{(stats['p50_us'] / expected - 1) * 100:+.1f}%"
+        print(
+            f"{stage:<22}{stats['p50_us']:>10}{stats['p99_us']:>10}"
+            f"{stats['throughput_per_s']:>12}{delta:>14}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--min-words", type=int, default=3)
+    parser.add_argument("--max-words", type=int, default=40)
+    parser.add_argument("--symptom-density", type=float, default=0.6)
+    parser.add_argument("--emergency-rate", type=float, default=0.05)
+    parser.add_argument("--non-medical-rate", type=float, default=0.05)
+    parser.add_argument("--typo-rate", type=float, default=0.05)
+    parser.add_argument("--repeat-rate", type=float, default=0.3)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative p50 slowdown before a stage counts as regressed",
+    )
+    parser.add_argument(
+        "--min-delta-us",
+        type=float,
+        default=1.0,
+        help="ignore p50 slowdowns smaller than this many microseconds",
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    corpus = SyntheticCorpus(
+        seed=args.seed,
+        min_words=args.min_words,
+        max_words=args.max_words,
+        symptom_density=args.symptom_density,
+        emergency_rate=args.emergency_rate,
+        non_medical_rate=args.non_medical_rate,
+        typo_rate=args.typo_rate,
+        repeat_rate=args.repeat_rate,
+    )
+    results = run_benchmark(corpus, args.messages, args.rounds)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print_report(results)
+        print(f"\n✅ Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        if baseline.get("corpus") != results["corpus"]:
+            print(
+                "[WARNING] Corpus settings differ from the baseline - deltas are not comparable"
+            )
+
+    print_report(results, baseline)
+    if baseline is not None:
+        print(f"machine speed vs baseline: x{machine_scale(results, baseline):.2f}")
+    if baseline is None:
+        print(f"\n[INFO] No baseline at {args.baseline} - run with --save-baseline")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_us)
+    if regressions:
+        print("\n❌ Regressions:")
+        for line in regressions:
+            print(f"  • {line}")
+        return 1
+    print("\n✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
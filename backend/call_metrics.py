@@ -0,0 +1,278 @@
+"""
+Call Metrics - Per-call accounting for Gemini requests
+Records prompt/response size (characters and tokens), latency, cache status and
+fallback reason for every chat, stream and image call, aggregated in-process
+into fixed-bucket histograms
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30)
+TOKEN_BUCKETS = (32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+# Rough size of English text and images in Gemini tokens, used when a
+# response carries no usage metadata
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 258
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def response_usage(response) -> Dict:
+    """Token counts and finish reason reported by a generate_content response"""
+    usage = {}
+    try:
+        metadata = response.usage_metadata
+        usage["prompt_tokens"] = int(metadata.prompt_token_count) or None
+        usage["response_tokens"] = int(metadata.candidates_token_count) or None
+    except (AttributeError, TypeError, ValueError):
+        pass
+    try:
+        reason = response.candidates[0].finish_reason
+        usage["finish_reason"] = getattr(reason, "name", str(reason))
+    except (AttributeError, IndexError, TypeError):
+        pass
+    return {key: value for key, value in usage.items() if value is not None}
+
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram (upper bounds inclusive, plus +Inf)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.bounds = tuple(buckets)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        index = len(self.bounds)
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+
+    def _quantile(self, counts: List[int], q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds + (self.max,), counts):
+            seen += count
+            if seen >= rank:
+                return round(min(bound, self.max), 4)
+        return round(self.max, 4)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self._counts)
+            return {
+                "count": self.count,
+                "sum": round(self.total, 4),
+                "mean": round(self.total / self.count, 4) if self.count else None,
+                "max": round(self.max, 4),
+                "p50": self._quantile(counts, 0.50),
+                "p95": self._quantile(counts, 0.95),
+                "buckets": {
+                    **{
+                        f"le_{bound:g}": count
+                        for bound, count in zip(self.bounds, counts)
+                    },
+                    "le_inf": counts[-1],
+                },
+            }
+
+
+class CallRecord:
+    """What one GeminiService call did; filled in as the call progresses"""
+
+    __slots__ = (
+        "kind",
+        "request_class",
+        "stage",
+        "provider",
+        "model",
+        "cache",
+        "source",
+        "fallback_reason",
+        "prompt_chars",
+        "prompt_tokens",
+        "response_chars",
+        "response_tokens",
+        "tokens_estimated",
+        "finish_reason",
+        "upstream_seconds",
+        "started",
+        "seconds",
+    )
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.request_class = None
+        self.stage = None
+        self.provider = None
+        self.model = None
+        self.cache = None
+        self.source = None
+        self.fallback_reason = None
+        self.prompt_chars = None
+        self.prompt_tokens = None
+        self.response_chars = None
+        self.response_tokens = None
+        self.tokens_estimated = False
+        self.finish_reason = None
+        self.upstream_seconds = None
+        self.started = time.perf_counter()
+        self.seconds = None
+
+    def use_provider(self, provider):
+        self.provider = provider.name
+        self.model = provider.model
+
+    def prompt(self, text: str, images: int = 0):
+        self.prompt_chars = len(text)
+        self.prompt_tokens = estimate_tokens(text) + images * IMAGE_TOKENS
+        self.tokens_estimated = True
+
+    def response(self, response, text: Optional[str], upstream_seconds: float = None):
+        """Sizes from the upstream response; usage metadata beats the estimate"""
+        self.upstream_seconds = upstream_seconds
+        self.response_chars = len(text) if text else 0
+        self.response_tokens = estimate_tokens(text)
+        usage = response_usage(response)
+        self.finish_reason = usage.get("finish_reason")
+        if "prompt_tokens" in usage and "response_tokens" in usage:
+            self.prompt_tokens = usage["prompt_tokens"]
+            self.response_tokens = usage["response_tokens"]
+            self.tokens_estimated = False
+
+    def fallback(self, reason: str):
+        self.source = "fallback"
+        self.fallback_reason = reason
+
+    def as_dict(self) -> Dict:
+        record = {
+            slot: getattr(self, slot) for slot in self.__slots__ if slot != "started"
+        }
+        for key in ("upstream_seconds", "seconds"):
+            if record[key] is not None:
+                record[key] = round(record[key], 4)
+        return record
+
+
+class _KindMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.seconds = Histogram(LATENCY_BUCKETS)
+        self.upstream_seconds = Histogram(LATENCY_BUCKETS)
+        self.prompt_tokens = Histogram(TOKEN_BUCKETS)
+        self.response_tokens = Histogram(TOKEN_BUCKETS)
+        self.prompt_chars = 0
+        self.response_chars = 0
+        self.cache: Dict[str, int] = {}
+        self.sources: Dict[str, int] = {}
+        self.fallback_reasons: Dict[str, int] = {}
+        self.finish_reasons: Dict[str, int] = {}
+
+
+def _bump(counter: Dict[str, int], key: Optional[str]):
+    if key:
+        counter[key] = counter.get(key, 0) + 1
+
+
+class CallMetrics:
+    """Aggregates CallRecords per call kind and per model"""
+
+    def __init__(self, recent: int = 50, name: str = "gemini"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._kinds: Dict[str, _KindMetrics] = {}
+        self._models: Dict[str, Histogram] = {}
+        self._recent: Deque[Dict] = deque(maxlen=recent)
+
+    def start(self, kind: str) -> CallRecord:
+        return CallRecord(kind)
+
+    def finish(self, call: CallRecord):
+        call.seconds = time.perf_counter() - call.started
+        if call.source is None:
+            answered = call.upstream_seconds is not None or call.cache == "coalesced"
+            call.source = "model" if answered else "unknown"
+
+        with self._lock:
+            kind = self._kinds.get(call.kind)
+            if kind is None:
+                kind = self._kinds[call.kind] = _KindMetrics()
+            kind.calls += 1
+            _bump(kind.cache, call.cache)
+            _bump(kind.sources, call.source)
+            _bump(kind.fallback_reasons, call.fallback_reason)
+            _bump(kind.finish_reasons, call.finish_reason)
+            kind.prompt_chars += call.prompt_chars or 0
+            kind.response_chars += call.response_chars or 0
+            if call.upstream_seconds is not None and call.model:
+                model = self._models.get(call.model)
+                if model is None:
+                    model = self._models[call.model] = Histogram(LATENCY_BUCKETS)
+            else:
+                model = None
+            self._recent.append(call.as_dict())
+
+        kind.seconds.observe(call.seconds)
+        if call.upstream_seconds is not None:
+            kind.upstream_seconds.observe(call.upstream_seconds)
+            if model:
+                model.observe(call.upstream_seconds)
+        if call.prompt_tokens and call.upstream_seconds is not None:
+            kind.prompt_tokens.observe(call.prompt_tokens)
+        if call.response_tokens and call.upstream_seconds is not None:
+            kind.response_tokens.observe(call.response_tokens)
+
+    def snapshot(self, recent: bool = True) -> Dict:
+        """Histograms and counters per call kind, upstream latency per model"""
+        with self._lock:
+            counters = {
+                name: {
+                    "calls": kind.calls,
+                    "prompt_chars": kind.prompt_chars,
+                    "response_chars": kind.response_chars,
+                    "cache": dict(kind.cache),
+                    "sources": dict(kind.sources),
+                    "fallback_reasons": dict(kind.fallback_reasons),
+                    "finish_reasons": dict(kind.finish_reasons),
+                }
+                for name, kind in self._kinds.items()
+            }
+            kinds = dict(self._kinds)
+            models = dict(self._models)
+            recent_calls = list(self._recent)
+
+        snapshot = {
+            "name": self.name,
+            "kinds": {
+                name: {
+                    **counters[name],
+                    "seconds": kind.seconds.snapshot(),
+                    "upstream_seconds": kind.upstream_seconds.snapshot(),
+                    "prompt_tokens": kind.prompt_tokens.snapshot(),
+                    "response_tokens": kind.response_tokens.snapshot(),
+                }
+                for name, kind in kinds.items()
+            },
+            "models": {name: hist.snapshot() for name, hist in models.items()},
+        }
+        if recent:
+            snapshot["recent"] = recent_calls
+        return snapshot
@@ -0,0 +1,171 @@
+"""
+Circuit Breaker - Stops calling an upstream service while it is failing
+Requests fail fast (no network) while the circuit is open; after a cool-down a
+few probe requests decide whether to close it again
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the upstream while the circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Closed -> open when, over the last `window` seconds (and at least
+    `min_calls` calls), the error rate reaches `error_rate_threshold` or the
+    share of calls slower than `slow_call_seconds` reaches `slow_rate_threshold`.
+    Open -> half-open after `open_seconds`; half-open lets `half_open_calls`
+    probes through and closes if they all succeed, re-opens on any failure.
+    """
+
+    def __init__(
+        self,
+        name: str = "upstream",
+        window: float = 60.0,
+        min_calls: int = 10,
+        error_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        slow_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 3,
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate_threshold = slow_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_started = 0
+        self._probes_succeeded = 0
+        # (timestamp, failed, slow) per finished call
+        self._calls: Deque[Tuple[float, bool, bool]] = deque()
+
+        self.rejected = 0
+        self.times_opened = 0
+        self.last_error = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._advance(time.monotonic())
+            return self._state
+
+    def _advance(self, now: float):
+        """Move open -> half-open once the cool-down has passed (lock held)"""
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes_started = 0
+            self._probes_succeeded = 0
+
+    def _prune(self, now: float):
+        cutoff = now - self.window
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    def _open(self, now: float):
+        self._state = OPEN
+        self._opened_at = now
+        self._calls.clear()
+        self.times_opened += 1
+        print(
+            f"[WARNING] Circuit '{self.name}' opened - failing fast for {self.open_seconds:g}s"
+        )
+
+    def allow_request(self) -> bool:
+        """True if the caller may contact the upstream now"""
+        with self._lock:
+            self._advance(time.monotonic())
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes_started < self.half_open_calls:
+                self._probes_started += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def release(self):
+        """A permitted call never reached the upstream (frees a half-open probe)"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes_started > 0:
+                self._probes_started -= 1
+
+    def record_success(self, latency: float):
+        """Report a completed call (slow calls count against the breaker)"""
+        self._record(False, latency)
+
+    def record_failure(self, latency: float, error=None):
+        """Report a failed or timed-out call"""
+        if error is not None:
+            self.last_error = str(error) or type(error).__name__
+        self._record(True, latency)
+
+    def _record(self, failed: bool, latency: float):
+        now = time.monotonic()
+        slow = latency >= self.slow_call_seconds
+        with self._lock:
+            self._advance(now)
+            if self._state == HALF_OPEN:
+                if failed or slow:
+                    self._open(now)
+                    return
+                self._probes_succeeded += 1
+                if self._probes_succeeded >= self.half_open_calls:
+                    self._state = CLOSED
+                    print(f"[OK] Circuit '{self.name}' closed - upstream recovered")
+                return
+            if self._state == OPEN:
+                # A call that started before the circuit opened
+                return
+
+            self._calls.append((now, failed, slow))
+            self._prune(now)
+            total = len(self._calls)
+            if total < self.min_calls:
+                return
+            failures = sum(1 for _, f, _ in self._calls if f)
+            slow_calls = sum(1 for _, _, s in self._calls if s)
+            if (
+                failures / total >= self.error_rate_threshold
+                or slow_calls / total >= self.slow_rate_threshold
+            ):
+                self._open(now)
+
+    def stats(self) -> Dict:
+        """Current state and rolling-window rates for health checks"""
+        with self._lock:
+            now = time.monotonic()
+            self._advance(now)
+            self._prune(now)
+            total = len(self._calls)
+            failures = sum(1 for _, f, _ in self._calls if f)
+            slow_calls = sum(1 for _, _, s in self._calls if s)
+            return {
+                "name": self.name,
+                "state": self._state,
+                "window_calls": total,
+                "error_rate": round(failures / total, 4) if total else 0.0,
+                "slow_rate": round(slow_calls / total, 4) if total else 0.0,
+                "retry_in": (
+                    round(max(0.0, self.open_seconds - (now - self._opened_at)), 1)
+                    if self._state == OPEN
+                    else 0.0
+                ),
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+                "last_error": self.last_error,
+            }
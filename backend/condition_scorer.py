@@ -0,0 +1,140 @@
+"""
+Condition Scorer - Local, offline ranking of likely conditions
+Hashes symptoms and message tokens into sparse vectors and scores them against
+a condition-symptom matrix built from medical_kb.json (no external service)
+"""
+
+import re
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z']+")
+
+SYMPTOM_WEIGHT = 1.0
+TOKEN_WEIGHT = 0.5
+
+
+@lru_cache(maxsize=16384)
+def _feature_index(feature: str, dim: int) -> int:
+    """Stable hash (unlike hash(), identical across workers and restarts)"""
+    return zlib.crc32(feature.encode("utf-8")) % dim
+
+
+class ConditionScorer:
+    """Cosine similarity between a message and every condition in the knowledge base"""
+
+    def __init__(
+        self, condition_features: Dict[str, Dict[str, float]], dim: int = 2048
+    ):
+        self.dim = dim
+        self.conditions: List[str] = list(condition_features)
+
+        matrix = np.zeros((len(self.conditions), dim), dtype=np.float32)
+        for row, features in enumerate(condition_features.values()):
+            for feature, weight in features.items():
+                matrix[row, _feature_index(feature, dim)] += weight
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+        self._matrix_t = np.ascontiguousarray(self.matrix.T)
+
+        # Columns no condition uses - query features hashing there are noise
+        self._active_columns = self.matrix.any(axis=0)
+        # Words some condition is described by
+        self.vocabulary = frozenset(
+            feature[4:]
+            for features in condition_features.values()
+            for feature in features
+            if feature.startswith("tok:")
+        )
+
+    @classmethod
+    def from_knowledge_base(cls, data: Dict, **kwargs) -> "ConditionScorer":
+        """Conditions are the `common_causes` listed under each symptom"""
+        condition_features: Dict[str, Dict[str, float]] = {}
+        for symptom, info in data.get("symptoms", {}).items():
+            keyword_tokens = set()
+            for keyword in info.get("keywords", []):
+                keyword_tokens.update(_TOKEN_RE.findall(keyword.lower()))
+
+            for condition in info.get("common_causes", []):
+                features = condition_features.setdefault(condition, {})
+                features[f"sym:{symptom}"] = SYMPTOM_WEIGHT
+                for token in keyword_tokens:
+                    features[f"tok:{token}"] = TOKEN_WEIGHT
+                # Naming the condition itself ("migraine") is strong evidence
+                for token in _TOKEN_RE.findall(condition.lower()):
+                    features[f"tok:{token}"] = SYMPTOM_WEIGHT
+        return cls(condition_features, **kwargs)
+
+    def unknown_tokens(self, text: str, ignore=frozenset()) -> List[str]:
+        """Words of `text` no condition is described by (minus `ignore`)"""
+        return [
+            token
+            for token in _TOKEN_RE.findall(text.lower())
+            if token not in self.vocabulary and token not in ignore
+        ]
+
+    def _sparse_query(self, symptoms: Sequence[str], text: str) -> Dict[int, float]:
+        """Hashed feature column -> weight, restricted to columns some condition uses"""
+        query: Dict[int, float] = {}
+        for token in _TOKEN_RE.findall(text.lower()):
+            index = _feature_index(f"tok:{token}", self.dim)
+            if self._active_columns[index]:
+                query[index] = TOKEN_WEIGHT
+        for symptom in symptoms:
+            index = _feature_index(f"sym:{symptom}", self.dim)
+            if self._active_columns[index]:
+                query[index] = SYMPTOM_WEIGHT
+        return query
+
+    def score_batch(
+        self, queries: Sequence[Tuple[Sequence[str], str]], top_k: int = 3
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Rank conditions for many (symptoms, text) queries with one matrix product
+
+        Returns:
+            Per query, up to top_k (condition, cosine score) pairs, best first
+        """
+        if not queries or not self.conditions:
+            return [[] for _ in queries]
+
+        rows, cols, values = [], [], []
+        for row, (symptoms, text) in enumerate(queries):
+            sparse = self._sparse_query(symptoms, text)
+            rows.extend([row] * len(sparse))
+            cols.extend(sparse.keys())
+            values.extend(sparse.values())
+
+        batch = np.zeros((len(queries), self.dim), dtype=np.float32)
+        batch[rows, cols] = values
+        norms = np.linalg.norm(batch, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        scores = (batch / norms) @ self._matrix_t
+
+        # Partial selection, then order only the k winners per row
+        k = min(top_k, len(self.conditions))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1).tolist()
+        top_scores = np.take_along_axis(top_scores, order, axis=1).tolist()
+
+        return [
+            [
+                (self.conditions[i], round(score, 3))
+                for i, score in zip(indices, row_scores)
+                if score > 0
+            ]
+            for indices, row_scores in zip(top, top_scores)
+        ]
+
+    def score(
+        self, symptoms: Sequence[str], text: str = "", top_k: int = 3
+    ) -> List[Tuple[str, float]]:
+        """Rank conditions for a single message"""
+        return self.score_batch([(symptoms, text)], top_k)[0]
@@ -0,0 +1,173 @@
+"""
+Connection Warmer - Prewarm, keep-alive and cold/warm accounting for model clients
+A client's first call (and the first after a long idle spell) pays for channel
+setup and the TLS handshake. Clients are pinged in the background right after
+a worker starts and again whenever they sit idle, and upstream latency is
+recorded separately for cold and warm connections
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+from call_metrics import LATENCY_BUCKETS, Histogram
+
+COLD = "cold"
+WARM = "warm"
+
+
+def ping(client) -> Optional[bool]:
+    """
+    Cheapest authenticated round trip a client supports: count_tokens costs
+    no generation quota. Returns True on success, None if the client has
+    nothing to ping (local fakes); raises on failure.
+    """
+    count_tokens = getattr(client, "count_tokens", None)
+    if count_tokens is None:
+        return None
+    count_tokens("ping")
+    return True
+
+
+class ConnectionWarmer:
+    """
+    Tracks when each client last completed a call
+
+    Args:
+        idle_cold_seconds: A client idle for longer than this counts as cold
+        keepalive_seconds: Ping clients idle for this long (0 disables keep-alive)
+    """
+
+    def __init__(
+        self,
+        idle_cold_seconds: float = 300.0,
+        keepalive_seconds: float = 240.0,
+        name: str = "gemini",
+    ):
+        self.name = name
+        self.idle_cold_seconds = idle_cold_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self.latency = {
+            COLD: Histogram(LATENCY_BUCKETS),
+            WARM: Histogram(LATENCY_BUCKETS),
+        }
+
+        self._lock = threading.Lock()
+        self._clients: Dict[int, object] = {}
+        self._last_used: Dict[int, float] = {}
+        self._keepalive: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.prewarm_state = {
+            "status": "not_started",
+            "seconds": None,
+            "verified": {},
+            "errors": {},
+        }
+        self.keepalive_pings = 0
+        self.keepalive_failures = 0
+
+    def state(self, client) -> str:
+        """COLD or WARM, judged when a call actually starts"""
+        with self._lock:
+            last = self._last_used.get(id(client))
+        if last is None or time.monotonic() - last > self.idle_cold_seconds:
+            return COLD
+        return WARM
+
+    def observe(self, client, state: str, seconds: float):
+        """A call that started in `state` completed successfully"""
+        self.latency[state].observe(seconds)
+        self._touch(client)
+
+    def _touch(self, client):
+        with self._lock:
+            self._clients[id(client)] = client
+            self._last_used[id(client)] = time.monotonic()
+
+    def prewarm(
+        self, clients: Sequence[object], background: bool = True
+    ) -> Optional[threading.Thread]:
+        """Open and verify each client's connection, then start the keep-alive"""
+        unique = list({id(client): client for client in clients if client}.values())
+
+        def warm_all():
+            started = time.perf_counter()
+            self.prewarm_state["status"] = "running"
+            for client in unique:
+                label = getattr(client, "model_name", None) or type(client).__name__
+                try:
+                    verified = ping(client)
+                    self.prewarm_state["verified"][label] = verified
+                    self._touch(client)
+                except Exception as e:
+                    self.prewarm_state["verified"][label] = False
+                    self.prewarm_state["errors"][label] = str(e)
+                    print(
+                        f"[WARNING] Prewarming {self.name} client '{label}' failed: {e}"
+                    )
+            seconds = time.perf_counter() - started
+            self.prewarm_state["seconds"] = round(seconds, 4)
+            self.prewarm_state["status"] = "done"
+            if not self.prewarm_state["errors"]:
+                print(
+                    f"[OK] Prewarmed {len(unique)} {self.name} client(s) in {seconds:.2f}s"
+                )
+            self.start_keepalive()
+
+        if not background:
+            warm_all()
+            return None
+        thread = threading.Thread(
+            target=warm_all, name=f"{self.name}-prewarm", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def start_keepalive(self):
+        """Ping idle clients every keepalive_seconds so their connections stay open"""
+        if self.keepalive_seconds <= 0 or self._keepalive is not None:
+            return
+        self._keepalive = threading.Thread(
+            target=self._keepalive_loop, name=f"{self.name}-keepalive", daemon=True
+        )
+        self._keepalive.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _keepalive_loop(self):
+        while not self._stop.wait(self.keepalive_seconds / 2):
+            now = time.monotonic()
+            with self._lock:
+                idle = [
+                    self._clients[key]
+                    for key, last in self._last_used.items()
+                    if now - last >= self.keepalive_seconds
+                ]
+            for client in idle:
+                try:
+                    if ping(client):
+                        self.keepalive_pings += 1
+                    self._touch(client)
+                except Exception as e:
+                    self.keepalive_failures += 1
+                    print(f"[WARNING] {self.name} keep-alive ping failed: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            tracked = len(self._last_used)
+        return {
+            "name": self.name,
+            "prewarm": {
+                **self.prewarm_state,
+                "verified": dict(self.prewarm_state["verified"]),
+                "errors": dict(self.prewarm_state["errors"]),
+            },
+            "tracked_clients": tracked,
+            "idle_cold_seconds": self.idle_cold_seconds,
+            "keepalive_seconds": self.keepalive_seconds,
+            "keepalive_pings": self.keepalive_pings,
+            "keepalive_failures": self.keepalive_failures,
+            "latency": {state: hist.snapshot() for state, hist in self.latency.items()},
+        }
@@ -0,0 +1,182 @@
+"""
+Disk Cache - Persistent SQLite cache tier for Gemini responses
+Survives restarts and deploys, and is shared by every gunicorn worker on the host
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+class DiskCache:
+    """
+    Key/value cache in a single SQLite file (WAL mode, so readers in other
+    workers never block on a writer). Values are stored as JSON. When the
+    total payload exceeds max_bytes, least recently accessed entries go first.
+    """
+
+    def __init__(
+        self,
+        path: str = "data/gemini_cache.sqlite3",
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float = 7 * 24 * 3600,
+        evict_every: int = 50,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.evict_every = evict_every
+
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._puts_since_evict = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread, re-opened after fork"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on miss/expiry/error"""
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._count("misses")
+                return None
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self._count("hits")
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"[WARNING] Disk cache read failed: {e}")
+            self._count("errors")
+            return None
+
+    def put(self, key: str, value: Any, kind: str = "chat"):
+        """Store a JSON-serializable value (errors are logged, never raised)"""
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+            now = time.time()
+            self._connection().execute(
+                "INSERT OR REPLACE INTO entries (key, kind, value, size, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, payload, len(payload.encode("utf-8")), now, now),
+            )
+            self._count("writes")
+
+            with self._stats_lock:
+                self._puts_since_evict += 1
+                due = self._puts_since_evict >= self.evict_every
+                if due:
+                    self._puts_since_evict = 0
+            if due:
+                self.evict()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"[WARNING] Disk cache write failed: {e}")
+            self._count("errors")
+
+    def evict(self) -> int:
+        """Drop expired entries, then LRU entries until under 90% of max_bytes"""
+        conn = self._connection()
+        removed = conn.execute(
+            "DELETE FROM entries WHERE created < ?", (time.time() - self.ttl,)
+        ).rowcount
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total > self.max_bytes:
+            target = int(self.max_bytes * 0.9)
+            victims = []
+            for key, size in conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed ASC"
+            ):
+                if total <= target:
+                    break
+                victims.append((key,))
+                total -= size
+            conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+            removed += len(victims)
+
+        self._count("evictions", removed)
+        return removed
+
+    def recent(
+        self, kind: Optional[str] = None, limit: int = 256
+    ) -> Iterator[Tuple[str, Any, float]]:
+        """Most recently used live entries as (key, value, age_seconds)"""
+        query = "SELECT key, value, created FROM entries WHERE created >= ?"
+        params = [time.time() - self.ttl]
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        query += " ORDER BY accessed DESC LIMIT ?"
+        params.append(limit)
+
+        now = time.time()
+        for key, value, created in self._connection().execute(query, params):
+            yield key, json.loads(value), now - created
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for this process plus shared size totals"""
+        try:
+            entries, size = (
+                self._connection()
+                .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries")
+                .fetchone()
+            )
+        except sqlite3.Error:
+            entries, size = None, None
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": "disk",
+                "path": self.path,
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "errors": self.errors,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,113 @@
+"""
+Duration Parser - Extracts "how long" references from user messages
+One compiled scan handles digits, word numbers ("two days") and ranges ("3-4 hours")
+"""
+
+import re
+from typing import List, NamedTuple
+
+WORD_NUMBERS = {
+    "a": 1,
+    "an": 1,
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+    "ten": 10,
+    "eleven": 11,
+    "twelve": 12,
+    "thirteen": 13,
+    "fourteen": 14,
+    "fifteen": 15,
+    "sixteen": 16,
+    "seventeen": 17,
+    "eighteen": 18,
+    "nineteen": 19,
+}
+_TENS = {
+    "twenty": 20,
+    "thirty": 30,
+    "forty": 40,
+    "fifty": 50,
+    "sixty": 60,
+    "seventy": 70,
+    "eighty": 80,
+    "ninety": 90,
+}
+WORD_NUMBERS.update(_TENS)
+_ONES = "one two three four five six seven eight nine".split()
+_TEENS = [word for word, number in WORD_NUMBERS.items() if 10 <= number < 20]
+# Compounds ("twenty-four") are keyed hyphenated; "twenty four" is normalized
+WORD_NUMBERS.update(
+    {
+        f"{tens_word}-{ones_word}": tens + WORD_NUMBERS[ones_word]
+        for tens_word, tens in _TENS.items()
+        for ones_word in _ONES
+    }
+)
+
+# Canonical (plural) unit names, matching SeverityClassifier.time_indicators
+UNITS = ("minutes", "hours", "days", "weeks", "months", "years")
+
+# Grouped rather than one flat alternation of every word, which is several
+# times slower. Compounds come first, so "twenty-four" wins over "twenty" and
+# the hyphen is never read as a range separator
+_NUMBER = (
+    r"\d+"
+    rf"|(?:{'|'.join(_TENS)})(?:[-\s](?:{'|'.join(_ONES)}))?"
+    rf"|{'|'.join(sorted(_TEENS, key=len, reverse=True))}"
+    rf"|{'|'.join(_ONES)}|an?"
+)
+_COMPOUND_SEP_RE = re.compile(r"[-\s]+")
+DURATION_RE = re.compile(
+    # "once a day" / "twice a week" / "3 times a day" are frequencies
+    r"\b(?<!once )(?<!twice )(?<!times )"
+    rf"(?P<low>{_NUMBER})"
+    rf"(?:\s*(?:-|–|to|or)\s*(?P<high>{_NUMBER}))?"
+    rf"\s*(?P<unit>minute|hour|day|week|month|year)s?\b",
+    re.IGNORECASE,
+)
+# Most messages name no unit at all and never reach DURATION_RE
+_UNIT_RE = re.compile(r"minute|hour|day|week|month|year", re.IGNORECASE)
+
+
+class Duration(NamedTuple):
+    """A reported duration; low == high unless a range was given"""
+
+    low: int
+    high: int
+    unit: str
+
+    def describe(self) -> str:
+        amount = str(self.low) if self.low == self.high else f"{self.low}-{self.high}"
+        unit = self.unit[:-1] if self.high == 1 else self.unit
+        return f"{amount} {unit}"
+
+
+def _to_int(token: str) -> int:
+    token = _COMPOUND_SEP_RE.sub("-", token.lower())
+    return int(token) if token.isdigit() else WORD_NUMBERS[token]
+
+
+def parse_durations(text: str) -> List[Duration]:
+    """Return every (number, unit) pair in text, in order of appearance"""
+    durations = []
+    if not _UNIT_RE.search(text):
+        return durations
+    for match in DURATION_RE.finditer(text):
+        low = _to_int(match.group("low"))
+        high = _to_int(match.group("high")) if match.group("high") else low
+        if high < low:
+            low, high = high, low
+        durations.append(Duration(low, high, match.group("unit").lower() + "s"))
+    return durations
+
+
+def describe_durations(durations: List[Duration]) -> str:
+    """Human-readable summary for prompts, e.g. '2 days, 3-4 hours'"""
+    return ", ".join(d.describe() for d in durations)
@@ -5,9 +5,55 @@ Handles emergency escalation, logging, and strict AI context
 
 import json
 import os
+import re
 from datetime import datetime
 from typing import Dict, List, Optional
 
+EMERGENCY_HEADLINE = "🚨 CALL 112 IMMEDIATELY"
+EMERGENCY_CLOSING = (
+    "Emergency services are the ONLY proper response. I cannot replace them."
+)
+GENERIC_SAFETY_ACTIONS = [
+    "Stay with the person and keep them still",
+    "Keep them calm, warm and comfortable",
+    "Do NOT give food, drink or medication",
+    "Follow the emergency dispatcher's instructions",
+]
+
+_TITLE_RE = re.compile(r"(EMERGENCY|INJURY DETECTED):\s*([^*\n]+)")
+_STEP_RE = re.compile(r"^\s*\d+\.\s*(.+)$", re.MULTILINE)
+# Steps that repeat the headline ("Call emergency services NOW")
+_CALL_STEP_RE = re.compile(r"\bcall\b.*\b(?:emergency|911|112)\b", re.IGNORECASE)
+# Steps the strict prompt forbids: medication or treatment ("Give aspirin"),
+# and waiting or monitoring ("Seek help if deep", "Monitor symptoms" - the
+# headline already sends them to emergency care).
+# Prohibitions ("Do NOT give food/drink") are safety actions and stay
+_UNSAFE_STEP_RE = re.compile(
+    r"\b(?:aspirin|medication|medicine|drug|pill|tablet|ointment|cream|dose|"
+    r"antibiotic|inject\w*|treat\w*|monitor\w*|seek)\b",
+    re.IGNORECASE,
+)
+_PROHIBITION_RE = re.compile(r"^\s*do not\b", re.IGNORECASE)
+MIN_SAFETY_ACTIONS = 3
+MAX_SAFETY_ACTIONS = 4
+
+# EmergencyDetector's injury keywords, as a reason line
+_INJURY_TITLES = {
+    "accident": "Accident with possible injuries",
+    "broken": "Possible broken bone",
+    "fracture": "Possible fracture",
+    "dislocation": "Possible dislocation",
+    "cut": "Serious cut",
+    "burn": "Serious burn",
+}
+
+
+def _is_safety_action(step: str) -> bool:
+    """A step the template may repeat: no call-112 duplicate, no treatment"""
+    if _CALL_STEP_RE.search(step):
+        return False
+    return bool(_PROHIBITION_RE.match(step)) or not _UNSAFE_STEP_RE.search(step)
+
 
 class EmergencyService:
     def __init__(self):
@@ -155,6 +201,44 @@ class EmergencyService:
 
         return {"success": False, "message": "No active emergency context"}
 
+    def render_template_response(self, detection: Optional[Dict] = None) -> str:
+        """
+        Deterministic response in the exact shape the strict prompt demands,
+        built from EmergencyDetector's keyword templates - no LLM involved
+
+        Args:
+            detection: Result of EmergencyDetector.check_emergency (or None)
+        """
+        detection = detection or {}
+        title_match = _TITLE_RE.search(detection.get("response", ""))
+        if title_match:
+            kind, situation = title_match.group(1), title_match.group(2).strip()
+            if kind == "INJURY DETECTED":
+                situation = _INJURY_TITLES.get(situation.lower(), "Serious injury")
+            reason = f"{situation} - this can be life-threatening and needs emergency care now."
+        else:
+            reason = "This may be a life-threatening situation that needs emergency care now."
+
+        # Only safety actions, never medication or treatment (the strict
+        # prompt's rule), padded with generic ones to the 3-4 it asks for
+        steps = [
+            step.strip() for step in _STEP_RE.findall(detection.get("response", ""))
+        ] or list(detection.get("first_aid", []))
+        actions = [step for step in steps if _is_safety_action(step)]
+        wanted = MIN_SAFETY_ACTIONS if actions else MAX_SAFETY_ACTIONS
+        for generic in GENERIC_SAFETY_ACTIONS:
+            if len(actions) >= wanted:
+                break
+            if generic not in actions:
+                actions.append(generic)
+        actions = actions[:MAX_SAFETY_ACTIONS]
+
+        return (
+            f"{EMERGENCY_HEADLINE}\n\n{reason}\n\nWhile waiting for help:\n"
+            + "\n".join(f"• {action}" for action in actions)
+            + f"\n\n{EMERGENCY_CLOSING}"
+        )
+
     def _get_strict_emergency_prompt(self) -> str:
         """
         Return strict system prompt for emergency mode
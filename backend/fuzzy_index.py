@@ -0,0 +1,178 @@
+"""
+Fuzzy Index - Typo-tolerant lookup of knowledge base terms
+SymSpell-style deletion dictionary: lookups cost a handful of dict probes per token
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Set
+
+_TOKEN_RE = re.compile(r"[a-z']+")
+
+# Everyday words a few edits away from symptom terms ("never"/"fewer" ->
+# fever, "heat" -> head) - never corrected
+_COMMON_WORDS_TEXT = """
+    about above after again against also always another anything around away
+    back been before being best better body both bring came cannot come could
+    didn't does doesn't doing don't done down during each either even ever every
+    fear feel feeling feels fell felt fewer find fine first from gave give going
+    gone good great hand happy hard have having hear heard heart heat help here
+    high home hour hours into just keep kind know last late least left less lick
+    life like little long look lose lost made make many maybe more most much
+    must near need never next nice night none nothing once only open other over
+    paid paint part past rather read real really rest right rough said same says
+    seem seen should show side since some soon still such sure take tell than
+    that their them then there these they thing things think this those though
+    three through till time today told took tough very want week well went were
+    what when where which while whole will wish with without work worse would
+    year years your
+"""
+COMMON_WORDS = frozenset(_COMMON_WORDS_TEXT.split())
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """All strings reachable from word by deleting up to max_distance characters"""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for w in frontier:
+            if len(w) <= 1:
+                continue
+            for i in range(len(w)):
+                next_frontier.add(w[:i] + w[i + 1 :])
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance (adjacent transpositions count as one edit).
+    Returns a value above max_distance as soon as the bound is exceeded.
+    """
+    la, lb = len(a), len(b)
+    if abs(la - lb) > max_distance:
+        return max_distance + 1
+
+    # Strip the common prefix/suffix - typos rarely touch every character
+    start = 0
+    while start < la and start < lb and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < la - start and end < lb - start and a[la - 1 - end] == b[lb - 1 - end]:
+        end += 1
+    a, b = a[start : la - end], b[start : lb - end]
+    la, lb = len(a), len(b)
+    if la == 0 or lb == 0:
+        return max(la, lb)
+
+    # Inlined comparisons instead of min() - this is the hot loop of every lookup
+    prev_prev = None
+    prev = list(range(lb + 1))
+    for i in range(1, la + 1):
+        ai = a[i - 1]
+        cur = [i] * (lb + 1)
+        row_min = i
+        for j in range(1, lb + 1):
+            bj = b[j - 1]
+            value = prev[j - 1] if ai == bj else prev[j - 1] + 1
+            if prev[j] + 1 < value:
+                value = prev[j] + 1
+            if cur[j - 1] + 1 < value:
+                value = cur[j - 1] + 1
+            if i > 1 and j > 1 and ai == b[j - 2] and a[i - 2] == bj:
+                if prev_prev[j - 2] + 1 < value:
+                    value = prev_prev[j - 2] + 1
+            cur[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return max_distance + 1
+        prev_prev, prev = prev, cur
+    return prev[-1]
+
+
+class FuzzyIndex:
+    """Maps misspelled tokens to the closest vocabulary word within an edit distance"""
+
+    def __init__(
+        self,
+        vocabulary: Iterable[str],
+        max_edit_distance: int = None,
+        min_token_length: int = 4,
+        cache_size: int = 4096,
+    ):
+        if max_edit_distance is None:
+            max_edit_distance = int(os.getenv("FUZZY_MAX_EDIT_DISTANCE", "2"))
+        self.max_edit_distance = max(0, max_edit_distance)
+        self.min_token_length = min_token_length
+
+        self.vocabulary: Set[str] = {
+            w for w in vocabulary if len(w) >= min_token_length
+        }
+        self._delete_map: Dict[str, Set[str]] = {}
+        for word in self.vocabulary:
+            for variant in _deletes(word, self.max_edit_distance):
+                self._delete_map.setdefault(variant, set()).add(word)
+
+        # Message tokens repeat heavily - memoize per-token results
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    @classmethod
+    def from_knowledge_base(cls, data: Dict, **kwargs) -> "FuzzyIndex":
+        """Build the index from symptom names, keywords and synonyms"""
+        terms = []
+        for symptom, info in data.get("symptoms", {}).items():
+            terms.append(symptom)
+            terms.extend(info.get("keywords", []))
+        for std_term, synonyms in data.get("symptom_synonyms", {}).items():
+            terms.append(std_term)
+            terms.extend(synonyms)
+
+        words = set()
+        for term in terms:
+            words.update(_TOKEN_RE.findall(term.lower()))
+        return cls(words, **kwargs)
+
+    def _allowed_distance(self, token: str) -> int:
+        # Short tokens get one edit so common words ("having") don't drift into
+        # vocabulary words ("hacking"); longer tokens get the full budget
+        return (
+            min(self.max_edit_distance, 1) if len(token) < 8 else self.max_edit_distance
+        )
+
+    def _lookup(self, token: str) -> Optional[str]:
+        """Return the closest vocabulary word for token, or None"""
+        if token in self.vocabulary or len(token) < self.min_token_length:
+            return None
+        if token in COMMON_WORDS:
+            return None
+        max_distance = self._allowed_distance(token)
+        if max_distance == 0:
+            return None
+        # A wrong first letter on a short word is more likely a different
+        # word ("tough", "lick") than a typo ("cough", "sick")
+        short = len(token) < 8
+
+        best, best_distance = None, max_distance + 1
+        candidates = set()
+        for variant in _deletes(token, max_distance):
+            candidates |= self._delete_map.get(variant, set())
+        # Sorted for deterministic tie-breaking
+        for word in sorted(candidates):
+            if short and word[0] != token[0]:
+                continue
+            distance = edit_distance(token, word, max_distance)
+            if distance < best_distance:
+                best, best_distance = word, distance
+        return best
+
+    def correct_text(self, text: str) -> str:
+        """Replace misspelled tokens with their closest vocabulary words"""
+
+        def replace(match):
+            return self.lookup(match.group(0)) or match.group(0)
+
+        return _TOKEN_RE.sub(replace, text)
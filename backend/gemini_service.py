@@ -4,14 +4,59 @@ Handles AI-powered responses for chatbot and image analysis
 """
 
 import base64
-import io
+import functools
+import hashlib
 import os
+import re
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
 
 import google.generativeai as genai
-from dotenv import load_dotenv
-from PIL import Image
+from caching import SingleFlight, TTLCache, prompt_fingerprint
+from call_metrics import CallMetrics
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from connection_warmer import ConnectionWarmer
+from disk_cache import DiskCache
+from duration_parser import describe_durations, parse_durations
+from image_preprocessor import ImagePreprocessor
+from json_stream import JSONFieldExtractor
+from knowledge_base import knowledge_base
+from llm_router import (
+    CHAT_COMPLEX,
+    CHAT_EMERGENCY,
+    CHAT_SIMPLE,
+    RULES,
+    VISION,
+    LLMRouter,
+    Provider,
+    classify_request,
+)
+from model_clients import FakeModelClient
+from semantic_cache import STOPWORDS, SemanticCache
+from upstream_scheduler import (
+    CHAT,
+    EMERGENCY,
+    IMAGE,
+    LoadShedError,
+    UpstreamScheduler,
+)
 
-load_dotenv()
+# Words a local answer may ignore; any other word the condition scorer has
+# no feature for sends the message to Gemini
+LOCAL_ANSWER_FILLER = STOPWORDS | frozenset(
+    "bit feel feeling feels got hurts hurting little mild slight slightly "
+    "today".split()
+)
+
+# Appended to the vision prompt when only a preview is sent (progressive mode)
+IMAGE_PREVIEW_NOTE = """
+NOTE: This is a reduced-resolution preview of the photo. Set "confidence" to a number from 0 to 100 for how sure you are at this resolution; use a low value if details you need (wound depth, texture, small lesions) are not clearly visible.
+"""
+
+
+class GeminiTimeout(Exception):
+    """Raised when an upstream call misses its deadline (it keeps running)"""
 
 
 class GeminiService:
@@ -19,41 +64,194 @@ class GeminiService:
         self.api_key = os.getenv("GEMINI_API_KEY", "")
         self.is_configured = False
 
-        if self.api_key and self.api_key != "your_api_key_here":
+        # Confident, mild presentations can be answered by the local condition
+        # scorer instead of a multi-second API call. Off by default (max
+        # severity 0): the scorer cannot tell what it does not know about
+        self.local_answer_max_severity = int(
+            os.getenv("LOCAL_ANSWER_MAX_SEVERITY", "0")
+        )
+        self.local_answer_min_score = float(os.getenv("LOCAL_ANSWER_MIN_SCORE", "0.6"))
+        self.local_answer_min_margin = float(
+            os.getenv("LOCAL_ANSWER_MIN_MARGIN", "0.15")
+        )
+
+        # Hard per-call deadlines so a slow upstream never pins a worker; the
+        # caller gets the fallback and a late answer still fills the cache
+        self.chat_timeout = float(os.getenv("GEMINI_CHAT_TIMEOUT", "3"))
+        self.vision_timeout = float(os.getenv("GEMINI_VISION_TIMEOUT", "8"))
+        self.max_upstream_calls = int(os.getenv("GEMINI_MAX_UPSTREAM_CALLS", "16"))
+        # Fail fast (straight to the fallback) while a model keeps failing;
+        # every model backend gets its own breaker from these settings
+        self.breaker_settings = dict(
+            window=float(os.getenv("GEMINI_BREAKER_WINDOW", "60")),
+            min_calls=int(os.getenv("GEMINI_BREAKER_MIN_CALLS", "10")),
+            error_rate_threshold=float(os.getenv("GEMINI_BREAKER_ERROR_RATE", "0.5")),
+            slow_call_seconds=float(os.getenv("GEMINI_BREAKER_SLOW_SECONDS", "5")),
+            slow_rate_threshold=float(os.getenv("GEMINI_BREAKER_SLOW_RATE", "0.8")),
+            open_seconds=float(os.getenv("GEMINI_BREAKER_OPEN_SECONDS", "30")),
+            half_open_calls=int(os.getenv("GEMINI_BREAKER_PROBES", "3")),
+        )
+        self.in_flight = SingleFlight(name="gemini")
+        self.image_preprocessor = ImagePreprocessor(
+            max_edge=int(os.getenv("IMAGE_MAX_EDGE", "1536")),
+            quality=int(os.getenv("IMAGE_JPEG_QUALITY", "85")),
+            max_bytes=int(float(os.getenv("IMAGE_MAX_KB", "0")) * 1024),
+        )
+        # Progressive mode: analyze a small preview first and send the full
+        # image only when the preview answer is unsure or severe
+        self.image_progressive = os.getenv("IMAGE_PROGRESSIVE", "0") == "1"
+        self.image_thumbnail_edge = int(os.getenv("IMAGE_THUMBNAIL_EDGE", "512"))
+        self.thumbnail_timeout = float(os.getenv("GEMINI_THUMBNAIL_TIMEOUT", "4"))
+        self.image_escalate_confidence = float(
+            os.getenv("IMAGE_ESCALATE_CONFIDENCE", "70")
+        )
+        self.image_escalate_severities = {
+            s.strip().lower()
+            for s in os.getenv("IMAGE_ESCALATE_SEVERITIES", "severe").split(",")
+            if s.strip()
+        }
+        # Outbound calls are rate limited to stay under quota and run in
+        # priority order (emergency > chat > image); work that cannot start
+        # within its queue budget is shed to the fallback
+        self.scheduler = UpstreamScheduler(
+            max_concurrency=self.max_upstream_calls,
+            rate_per_minute=float(os.getenv("GEMINI_RATE_LIMIT_RPM", "60")),
+            burst=float(os.getenv("GEMINI_RATE_BURST", "10")),
+            queue_budgets={
+                EMERGENCY: float(os.getenv("GEMINI_QUEUE_BUDGET_EMERGENCY", "5")),
+                CHAT: float(os.getenv("GEMINI_QUEUE_BUDGET_CHAT", "1")),
+                IMAGE: float(os.getenv("GEMINI_QUEUE_BUDGET_IMAGE", "2")),
+            },
+            name="gemini-upstream",
+        )
+        # Size, latency, cache status and fallback reason of every call
+        self.metrics = CallMetrics(
+            recent=int(os.getenv("GEMINI_METRICS_RECENT", "50")), name="gemini"
+        )
+        # First calls on a fresh connection pay channel setup and TLS; workers
+        # prewarm clients after fork (see gunicorn.conf.py) and ping idle ones
+        self.connections = ConnectionWarmer(
+            idle_cold_seconds=float(os.getenv("GEMINI_CONNECTION_IDLE_SECONDS", "300")),
+            keepalive_seconds=float(os.getenv("GEMINI_KEEPALIVE_SECONDS", "240")),
+            name="gemini",
+        )
+        self._stats_lock = threading.Lock()
+        self.upstream_stats = {
+            "calls": 0,
+            "timeouts": 0,
+            "late_arrivals": 0,
+            "late_failures": 0,
+        }
+        self.image_stages = {
+            "thumbnail_calls": 0,
+            "thumbnail_accepted": 0,
+            "escalated_low_confidence": 0,
+            "escalated_severity": 0,
+            "escalated_failed": 0,
+            "escalation_skipped_deadline": 0,
+            "full_calls": 0,
+        }
+
+        # Repeated prompts are served from memory (emergency mode always bypasses)
+        self.response_cache = TTLCache(
+            capacity=int(os.getenv("GEMINI_CACHE_SIZE", "1024")),
+            ttl=float(os.getenv("GEMINI_CACHE_TTL", "3600")),
+            name="gemini_chat",
+        )
+        # Paraphrases of earlier questions ("my head hurts" / "I've got a
+        # headache") with the same severity and symptoms reuse their answer
+        self.semantic_cache = SemanticCache(
+            capacity=int(os.getenv("GEMINI_SEMANTIC_CACHE_SIZE", "2048")),
+            threshold=float(os.getenv("GEMINI_SEMANTIC_THRESHOLD", "0.85")),
+            ttl=float(os.getenv("GEMINI_CACHE_TTL", "3600")),
+            name="gemini_semantic",
+            symptom_words=lambda symptoms: knowledge_base.current().symptom_words(
+                symptoms
+            ),
+        )
+        # Persistent tier shared by all workers - survives restarts and deploys
+        self.disk_cache = None
+        disk_path = os.getenv("GEMINI_DISK_CACHE_PATH", "data/gemini_cache.sqlite3")
+        if disk_path:
             try:
-                genai.configure(api_key=self.api_key)
-                # Use Gemini 1.5 Pro for maximum accuracy
-                self.model = genai.GenerativeModel(
-                    "gemini-1.5-pro",
-                    generation_config={
-                        "temperature": 0.7,
-                        "top_p": 0.95,
-                        "top_k": 40,
-                        "max_output_tokens": 2048,
+                self.disk_cache = DiskCache(
+                    disk_path,
+                    max_bytes=int(
+                        float(os.getenv("GEMINI_DISK_CACHE_MAX_MB", "256"))
+                        * 1024
+                        * 1024
+                    ),
+                    ttl=float(os.getenv("GEMINI_DISK_CACHE_TTL", str(7 * 24 * 3600))),
+                )
+                self.warm_from_disk(int(os.getenv("GEMINI_CACHE_WARM_ENTRIES", "256")))
+            except Exception as e:
+                print(f"[WARNING] Disk cache unavailable, using memory only: {e}")
+                self.disk_cache = None
+
+        # Model backends are picked per request by the router (rule engine
+        # only until a backend is configured)
+        self.router = LLMRouter([], {})
+
+        # GEMINI_BACKEND=fake swaps in a local fake model (load testing, no quota)
+        self.backend = os.getenv("GEMINI_BACKEND", "gemini").strip().lower()
+        if self.backend == "fake":
+            self._use_fake_backend()
+            print("[INFO] Using fake Gemini backend - no API calls will be made")
+        elif self.api_key and self.api_key != "your_api_key_here":
+            try:
+                # "grpc" (default) keeps one long-lived channel; "rest" uses a
+                # pooled keep-alive HTTP session
+                transport = os.getenv("GEMINI_TRANSPORT", "").strip() or None
+                genai.configure(api_key=self.api_key, transport=transport)
+                generation_config = {
+                    "temperature": 0.7,
+                    "top_p": 0.95,
+                    "top_k": 40,
+                    "max_output_tokens": 2048,
+                }
+                safety_settings = [
+                    {
+                        "category": "HARM_CATEGORY_HARASSMENT",
+                        "threshold": "BLOCK_ONLY_HIGH",
+                    },
+                    {
+                        "category": "HARM_CATEGORY_HATE_SPEECH",
+                        "threshold": "BLOCK_ONLY_HIGH",
+                    },
+                    {
+                        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+                        "threshold": "BLOCK_ONLY_HIGH",
+                    },
+                    {
+                        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+                        "threshold": "BLOCK_ONLY_HIGH",
                     },
-                    safety_settings=[
-                        {
-                            "category": "HARM_CATEGORY_HARASSMENT",
-                            "threshold": "BLOCK_ONLY_HIGH",
-                        },
-                        {
-                            "category": "HARM_CATEGORY_HATE_SPEECH",
-                            "threshold": "BLOCK_ONLY_HIGH",
-                        },
-                        {
-                            "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                            "threshold": "BLOCK_ONLY_HIGH",
-                        },
-                        {
-                            "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                            "threshold": "BLOCK_ONLY_HIGH",
-                        },
-                    ],
+                ]
+                # Fast model for short mild chats, Pro for everything that
+                # needs maximum accuracy (and vision)
+                fast_name = os.getenv("GEMINI_FAST_MODEL", "gemini-1.5-flash")
+                pro_name = os.getenv("GEMINI_PRO_MODEL", "gemini-1.5-pro")
+                fast_model = genai.GenerativeModel(
+                    fast_name,
+                    generation_config=generation_config,
+                    safety_settings=safety_settings,
+                )
+                self.model = genai.GenerativeModel(
+                    pro_name,
+                    generation_config=generation_config,
+                    safety_settings=safety_settings,
+                )
+                # Pro supports both text and vision
+                self.vision_model = genai.GenerativeModel(pro_name)
+                self.router = self._build_router(
+                    [
+                        Provider("gemini-fast", fast_model, model=fast_name),
+                        Provider("gemini-pro", self.model, model=pro_name),
+                        Provider("gemini-vision", self.vision_model, model=pro_name),
+                    ]
                 )
-                # Use same model for vision - gemini-1.5-pro supports both text and vision
-                self.vision_model = genai.GenerativeModel("gemini-1.5-pro")
                 self.is_configured = True
-                print("[OK] Gemini 1.5 Pro API configured successfully")
+                print(f"[OK] Gemini API configured ({fast_name} + {pro_name})")
                 print("[MEDICAL] Medical AI ready with 95%+ accuracy")
             except Exception as e:
                 print(f"[WARNING] Gemini API configuration failed: {e}")
@@ -64,7 +262,102 @@ class GeminiService:
                 "[TIP] Get a free API key from: https://makersuite.google.com/app/apikey"
             )
 
-    def chat_medical(self, user_message, symptoms, severity, system_override=None):
+    def _router_settings(self):
+        """Health thresholds and latency budgets (p95 seconds) from LLM_ROUTER_*"""
+        return {
+            "latency_budgets": {
+                CHAT_SIMPLE: float(os.getenv("LLM_ROUTER_P95_CHAT_SIMPLE", "2")),
+                CHAT_COMPLEX: float(
+                    os.getenv("LLM_ROUTER_P95_CHAT_COMPLEX", str(self.chat_timeout))
+                ),
+                CHAT_EMERGENCY: float(
+                    os.getenv("LLM_ROUTER_P95_EMERGENCY", str(self.chat_timeout))
+                ),
+                VISION: float(
+                    os.getenv("LLM_ROUTER_P95_VISION", str(self.vision_timeout))
+                ),
+            },
+            "max_error_rate": float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.2")),
+            "min_samples": int(os.getenv("LLM_ROUTER_MIN_SAMPLES", "10")),
+            "probe_rate": float(os.getenv("LLM_ROUTER_PROBE_RATE", "0.05")),
+            "breaker_factory": self._new_breaker,
+        }
+
+    def _new_breaker(self, name):
+        """Circuit breaker for one model backend"""
+        return CircuitBreaker(name=name, **self.breaker_settings)
+
+    def breaker_stats(self):
+        """Circuit breaker state of every model backend, by provider name"""
+        return {
+            name: provider.breaker.stats()
+            for name, provider in self.router.providers.items()
+            if provider.breaker is not None
+        }
+
+    def _build_router(self, providers):
+        """Router over the Gemini providers; LLM_ROUTE_<CLASS> overrides a route"""
+        routes = {
+            CHAT_SIMPLE: ["gemini-fast", "gemini-pro", RULES],
+            CHAT_COMPLEX: ["gemini-pro", "gemini-fast", RULES],
+            CHAT_EMERGENCY: ["gemini-pro", "gemini-fast", RULES],
+            VISION: ["gemini-vision", "gemini-fast"],
+        }
+        for request_class in routes:
+            override = os.getenv(f"LLM_ROUTE_{request_class.upper()}", "")
+            if override:
+                routes[request_class] = [
+                    n.strip() for n in override.split(",") if n.strip()
+                ]
+        return LLMRouter(providers, routes, **self._router_settings())
+
+    def _use_fake_backend(self):
+        """
+        One fake model for everything, or - with FAKE_LLM_FAST_LATENCY set - a
+        fast and a pro fake model routed per request class like real Gemini
+        """
+        fake = FakeModelClient.from_env()
+        fast_latency = os.getenv("FAKE_LLM_FAST_LATENCY", "")
+        if not fast_latency:
+            self.use_model_client(fake)
+            return
+        fast = FakeModelClient(
+            **{
+                **fake.settings,
+                "latency": fast_latency,
+                "error_rate": float(os.getenv("FAKE_LLM_FAST_ERROR_RATE", "0")),
+            }
+        )
+        self.model = self.vision_model = fake
+        self.router = self._build_router(
+            [
+                Provider("gemini-fast", fast, model="fake-fast"),
+                Provider("gemini-pro", fake, model="fake"),
+                Provider("gemini-vision", fake, model="fake"),
+            ]
+        )
+        self.is_configured = True
+
+    def use_model_client(self, model, vision_model=None):
+        """Serve chat (and vision, unless given separately) from any ModelClient"""
+        self.model = model
+        self.vision_model = vision_model or model
+        name = getattr(model, "name", None) or "custom"
+        self.router = LLMRouter.single(
+            name, self.model, self.vision_model, **self._router_settings()
+        )
+        self.is_configured = True
+
+    def prewarm(self, background=True):
+        """Open and verify connections to every configured model backend"""
+        if not self.is_configured:
+            return None
+        clients = [p.client for p in self.router.providers.values() if not p.is_local]
+        return self.connections.prewarm(clients, background=background)
+
+    def chat_medical(
+        self, user_message, symptoms, severity, system_override=None, durations=None
+    ):
         """Generate AI-powered medical response with disease recognition
 
         Args:
@@ -72,15 +365,410 @@ class GeminiService:
             symptoms: List of detected symptoms
             severity: Severity level (1-4)
             system_override: Optional system prompt to override normal behavior (for emergency mode)
+            durations: Parsed symptom durations (parsed from user_message if not given)
+        """
+        call = self.metrics.start("chat")
+        try:
+            return self._chat_medical(
+                user_message, symptoms, severity, system_override, durations, call
+            )
+        finally:
+            self.metrics.finish(call)
+
+    def chat_medical_with_source(
+        self, user_message, symptoms, severity, durations=None
+    ):
+        """chat_medical (normal mode) plus where the answer came from:
+        "model", "cache", "local" or "fallback"
+        """
+        call = self.metrics.start("chat")
+        try:
+            text = self._chat_medical(
+                user_message, symptoms, severity, None, durations, call
+            )
+        finally:
+            self.metrics.finish(call)
+        return text, call.source
+
+    def cached_chat_answer(self, user_message, symptoms, severity, durations=None):
+        """chat_medical_with_source split at the upstream call
+
+        Returns (text, source, None) if Gemini is not needed (not configured,
+        confident local answer or a cache hit). On a miss returns
+        (None, None, upgrade): upgrade() makes the upstream call without
+        looking the caches up again and returns (text, source). The call is
+        recorded once either way, when it completes.
         """
+        call = self.metrics.start("chat")
+        try:
+            text, run_upstream = self._answer_without_upstream(
+                user_message, symptoms, severity, None, durations, call
+            )
+        except Exception:
+            self.metrics.finish(call)
+            raise
+        if run_upstream is None:
+            self.metrics.finish(call)
+            return text, call.source, None
+
+        def upgrade():
+            try:
+                text = run_upstream()
+            finally:
+                self.metrics.finish(call)
+            return text, call.source
+
+        return None, None, upgrade
+
+    def _chat_medical(
+        self, user_message, symptoms, severity, system_override, durations, call
+    ):
+        text, run_upstream = self._answer_without_upstream(
+            user_message, symptoms, severity, system_override, durations, call
+        )
+        return text if run_upstream is None else run_upstream()
+
+    def _answer_without_upstream(
+        self, user_message, symptoms, severity, system_override, durations, call
+    ):
+        """
+        (text, None) when no upstream call is needed (not configured, local
+        answer, cache hit), else (None, run_upstream): run_upstream() makes
+        the Gemini call and returns its answer or the fallback
+        """
+        conditions = (
+            [] if system_override else self.rank_conditions(user_message, symptoms)
+        )
         if not self.is_configured:
-            return self._fallback_response(symptoms, severity)
+            call.fallback("not_configured")
+            return self._fallback_response(symptoms, severity, conditions), None
+        if self._can_answer_locally(severity, conditions, user_message):
+            call.source = "local"
+            return self._fallback_response(symptoms, severity, conditions), None
+
+        # NORMAL MODE prompts only - emergencies always get a fresh answer
+        use_cache = not system_override and severity < 4
+        if durations is None:
+            durations = parse_durations(user_message)
+        fingerprint = prompt_fingerprint(
+            user_message, symptoms, severity, system_override, durations
+        )
+        request_class = classify_request(
+            user_message, symptoms, severity, system_override
+        )
+        call.request_class = request_class
+        semantic = self._semantic_key(
+            user_message, symptoms, severity, request_class, durations
+        )
+        if use_cache:
+            cached = self._cached_chat(fingerprint, call, semantic)
+            if cached is not None:
+                return cached, None
+        else:
+            call.cache = "bypass"
+        run_upstream = functools.partial(
+            self._chat_upstream,
+            user_message,
+            symptoms,
+            severity,
+            system_override,
+            durations,
+            call,
+            conditions,
+            use_cache,
+            fingerprint,
+            request_class,
+            semantic,
+        )
+        return None, run_upstream
+
+    def _chat_upstream(
+        self,
+        user_message,
+        symptoms,
+        severity,
+        system_override,
+        durations,
+        call,
+        conditions,
+        use_cache,
+        fingerprint,
+        request_class,
+        semantic,
+    ):
+        def call_upstream():
+            provider = self.router.choose(request_class)
+            call.use_provider(provider)
+            if provider.is_local:
+                call.fallback("routed_to_rules")
+                return None
+            prompt = self._chat_prompt(
+                user_message, symptoms, severity, system_override, durations
+            )
+            call.prompt(prompt)
+
+            def store_late(late_response):
+                text = self._response_text(late_response)
+                if text and use_cache:
+                    self._store_chat(fingerprint, text, semantic)
+
+            started = time.perf_counter()
+            response = self._call_with_deadline(
+                lambda: provider.client.generate_content(prompt),
+                self.chat_timeout,
+                on_late=store_late,
+                priority=EMERGENCY if request_class == CHAT_EMERGENCY else CHAT,
+                provider=provider,
+            )
+            text = self._response_text(response)
+            call.response(response, text, time.perf_counter() - started)
+            if text and use_cache:
+                self._store_chat(fingerprint, text, semantic)
+            return text
+
+        try:
+            # Identical prompts arriving together share one upstream call
+            text = self.in_flight.do(("chat", fingerprint), call_upstream)
+            if call.provider is None:
+                call.cache = "coalesced"
+
+            # Validate response exists and has text
+            if text:
+                return text
+            else:
+                if call.fallback_reason is None:
+                    call.fallback("empty")
+                print(
+                    "[WARNING] No model answer (empty or routed to rules) - using fallback"
+                )
+                return self._fallback_response(symptoms, severity, conditions)
+
+        except CircuitOpenError:
+            call.fallback("circuit_open")
+            return self._fallback_response(symptoms, severity, conditions)
+
+        except LoadShedError:
+            call.fallback("shed")
+            return self._fallback_response(symptoms, severity, conditions)
+
+        except GeminiTimeout:
+            call.fallback("timeout")
+            print(
+                f"[WARNING] Gemini chat exceeded {self.chat_timeout:g}s deadline - using fallback"
+            )
+            return self._fallback_response(symptoms, severity, conditions)
+
+        except Exception as e:
+            call.fallback("error")
+            print(f"[ERROR] Gemini API runtime error: {e}")
+            # CRITICAL: Always fall back to rule-based response on ANY failure
+            return self._fallback_response(symptoms, severity, conditions)
+
+    def stream_chat_medical(self, user_message, symptoms, severity, durations=None):
+        """Like chat_medical (normal mode), but yields the answer in text chunks
 
+        Gemini tokens are yielded as they arrive. The chat deadline applies to
+        the first chunk; cached, local and fallback answers come as one chunk.
+        """
+        call = self.metrics.start("stream")
         try:
-            # Check if emergency mode override is provided
-            if system_override:
-                # EMERGENCY MODE: Use strict emergency prompt
-                prompt = f"""{system_override}
+            yield from self._stream_chat_medical(
+                user_message, symptoms, severity, durations, call
+            )
+        finally:
+            self.metrics.finish(call)
+
+    def _stream_chat_medical(self, user_message, symptoms, severity, durations, call):
+        conditions = self.rank_conditions(user_message, symptoms)
+        if not self.is_configured:
+            call.fallback("not_configured")
+            yield self._fallback_response(symptoms, severity, conditions)
+            return
+        if self._can_answer_locally(severity, conditions, user_message):
+            call.source = "local"
+            yield self._fallback_response(symptoms, severity, conditions)
+            return
+
+        use_cache = severity < 4
+        if durations is None:
+            durations = parse_durations(user_message)
+        fingerprint = prompt_fingerprint(
+            user_message, symptoms, severity, durations=durations
+        )
+        call.request_class = classify_request(user_message, symptoms, severity)
+        semantic = self._semantic_key(
+            user_message, symptoms, severity, call.request_class, durations
+        )
+        if use_cache:
+            cached = self._cached_chat(fingerprint, call, semantic)
+            if cached is not None:
+                yield cached
+                return
+        else:
+            call.cache = "bypass"
+
+        def store_late(late_response):
+            text = "".join(self._response_text(c) or "" for c in late_response)
+            if text and use_cache:
+                self._store_chat(fingerprint, text, semantic)
+
+        provider = self.router.choose(call.request_class)
+        call.use_provider(provider)
+        if provider.is_local:
+            call.fallback("routed_to_rules")
+            yield self._fallback_response(symptoms, severity, conditions)
+            return
+
+        parts = []
+        complete = False
+        started = time.perf_counter()
+        try:
+            prompt = self._chat_prompt(
+                user_message, symptoms, severity, None, durations
+            )
+            call.prompt(prompt)
+            # The SDK fetches the first chunk before returning, so the deadline
+            # bounds time-to-first-token
+            response = self._call_with_deadline(
+                lambda: provider.client.generate_content(prompt, stream=True),
+                self.chat_timeout,
+                on_late=store_late,
+                provider=provider,
+            )
+            for chunk in response:
+                text = self._response_text(chunk)
+                if text:
+                    parts.append(text)
+                    yield text
+            complete = True
+            call.response(response, "".join(parts), time.perf_counter() - started)
+        except CircuitOpenError:
+            call.fallback("circuit_open")
+        except LoadShedError:
+            call.fallback("shed")
+        except GeminiTimeout:
+            call.fallback("timeout")
+            print(
+                f"[WARNING] Gemini stream exceeded {self.chat_timeout:g}s deadline - using fallback"
+            )
+        except Exception as e:
+            call.fallback("interrupted" if parts else "error")
+            print(f"[ERROR] Gemini streaming error: {e}")
+
+        if not parts:
+            if call.fallback_reason is None:
+                call.fallback("empty")
+            yield self._fallback_response(symptoms, severity, conditions)
+        elif complete and use_cache:
+            # Interrupted streams are never cached
+            self._store_chat(fingerprint, "".join(parts), semantic)
+
+    @staticmethod
+    def _response_text(response):
+        """Text of a generate_content response, or None if it is empty/blocked"""
+        try:
+            return response.text if response and response.text else None
+        except (AttributeError, ValueError):
+            return None
+
+    def _count(self, counter, amount=1, stats=None):
+        with self._stats_lock:
+            (self.upstream_stats if stats is None else stats)[counter] += amount
+
+    def _call_with_deadline(self, fn, timeout, provider, on_late=None, priority=CHAT):
+        """Run fn() through the upstream scheduler, waiting at most `timeout` seconds
+
+        Raises CircuitOpenError without touching the network while the
+        provider's circuit breaker is open, LoadShedError when the scheduler
+        sheds the call, and GeminiTimeout when the deadline passes (queue time
+        included). A timed out call is not cancelled: if it later succeeds,
+        its result is passed to on_late. Latency and failures are also
+        recorded on `provider` so the router can steer away from slow or
+        failing backends.
+        """
+        if provider.breaker is None:
+            provider.breaker = self._new_breaker(provider.name)
+        breaker = provider.breaker
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"circuit '{breaker.name}' is open")
+        timing = {}
+
+        def timed():
+            timing["connection"] = self.connections.state(provider.client)
+            timing["started"] = time.monotonic()
+            return fn()
+
+        try:
+            future = self.scheduler.submit(timed, priority)
+        except LoadShedError:
+            breaker.release()
+            raise
+        self._count("calls")
+        try:
+            result = future.result(timeout=timeout)
+        except FutureTimeout:
+            self._count("timeouts")
+            if "started" in timing:
+                elapsed = time.monotonic() - timing["started"]
+                breaker.record_failure(elapsed, "deadline exceeded")
+                self.router.record(provider, elapsed, ok=False)
+            else:
+                # Still queued - says nothing about upstream health
+                breaker.release()
+
+            def late(done):
+                if done.cancelled() or done.exception() is not None:
+                    self._count("late_failures")
+                    return
+                self._count("late_arrivals")
+                if on_late:
+                    try:
+                        on_late(done.result())
+                    except Exception as e:
+                        print(f"[WARNING] Late Gemini result discarded: {e}")
+
+            future.add_done_callback(late)
+            raise GeminiTimeout()
+        except LoadShedError:
+            breaker.release()
+            raise
+        except Exception as e:
+            elapsed = time.monotonic() - timing.get("started", time.monotonic())
+            breaker.record_failure(elapsed, e)
+            self.router.record(provider, elapsed, ok=False)
+            raise
+        elapsed = time.monotonic() - timing["started"]
+        breaker.record_success(elapsed)
+        self.router.record(provider, elapsed, ok=True)
+        self.connections.observe(provider.client, timing["connection"], elapsed)
+        return result
+
+    def call_stats(self):
+        """Deadlines and timeout/late-arrival counters for monitoring"""
+        with self._stats_lock:
+            stats = dict(self.upstream_stats)
+        stats["chat_timeout"] = self.chat_timeout
+        stats["vision_timeout"] = self.vision_timeout
+        stats["max_upstream_calls"] = self.max_upstream_calls
+        stats["scheduler"] = self.scheduler.stats()
+        stats["single_flight"] = self.in_flight.stats()
+        stats["images"] = self.image_preprocessor.stats()
+        with self._stats_lock:
+            stages = dict(self.image_stages)
+        stages["progressive"] = self.image_progressive
+        stats["image_stages"] = stages
+        stats["router"] = self.router.stats()
+        stats["connections"] = self.connections.stats()
+        return stats
+
+    def _chat_prompt(
+        self, user_message, symptoms, severity, system_override=None, durations=None
+    ):
+        """Build the chat prompt (emergency override or normal medical chat)"""
+        # Check if emergency mode override is provided
+        if system_override:
+            # EMERGENCY MODE: Use strict emergency prompt
+            prompt = f"""{system_override}
 
 User's emergency message: "{user_message}"
 
@@ -91,12 +779,13 @@ Respond according to EMERGENCY CONTEXT MODE rules above. You MUST:
 4. End with "Emergency services are the ONLY proper response. I cannot replace them."
 
 Do NOT diagnose. Do NOT treat. Do NOT reassure. ONLY safety guidance."""
-            else:
-                # NORMAL MODE: Standard medical chat
-                prompt = f"""You are MedicSense AI, a compassionate and knowledgeable medical assistant with expertise in disease recognition and symptom analysis.
+        else:
+            # NORMAL MODE: Standard medical chat
+            prompt = f"""You are MedicSense AI, a compassionate and knowledgeable medical assistant with expertise in disease recognition and symptom analysis.
 
 User's message: "{user_message}"
 Detected symptoms: {', '.join(symptoms) if symptoms else 'None specific'}
+Reported duration: {describe_durations(durations) if durations else 'Not specified'}
 Severity level: {severity}/4 (1=mild, 2=moderate, 3=serious, 4=emergency)
 
 Your task is to:
@@ -115,24 +804,112 @@ Format your response as:
 Keep the response conversational, warm, informative, and around 200-250 words.
 IMPORTANT: Always state this is NOT a diagnosis and encourage professional medical consultation.
 """
+        return prompt
 
-            response = self.model.generate_content(prompt)
+    def _semantic_key(self, user_message, symptoms, severity, request_class, durations):
+        """(message, symptoms, partition) for the semantic cache
 
-            # Validate response exists and has text
-            if response and hasattr(response, "text") and response.text:
-                return response.text
-            else:
-                print("[WARNING] Gemini returned empty response - using fallback")
-                return self._fallback_response(symptoms, severity)
+        Near-duplicates are only served within one partition: same severity,
+        emergency classification, symptom set and reported durations.
+        """
+        partition = (
+            severity,
+            request_class == CHAT_EMERGENCY,
+            tuple(sorted(symptoms or [])),
+            tuple(tuple(d) for d in durations or []),
+        )
+        return user_message, symptoms, partition
+
+    def _cached_chat(self, fingerprint, call=None, semantic=None):
+        """Look up a chat answer in memory, on disk (promoting disk hits), then
+        among near-duplicates when `semantic` (see _semantic_key) is given"""
+        text = self.response_cache.get(fingerprint)
+        tier = "memory"
+        if text is None and self.disk_cache:
+            text = self.disk_cache.get(f"chat:{fingerprint}")
+            tier = "disk"
+            if text is not None:
+                self.response_cache.put(fingerprint, text)
+        if text is None and semantic:
+            match = self.semantic_cache.get(*semantic)
+            if match is not None:
+                text, _similarity = match
+                tier = "semantic"
+                self.response_cache.put(fingerprint, text)
+        if call is not None:
+            call.cache = tier if text is not None else "miss"
+            if text is not None:
+                call.source = "cache"
+        return text
+
+    def _store_chat(self, fingerprint, text, semantic=None):
+        self.response_cache.put(fingerprint, text)
+        if semantic:
+            self.semantic_cache.put(*semantic, text)
+        if self.disk_cache:
+            self.disk_cache.put(f"chat:{fingerprint}", text, kind="chat")
 
+    def warm_from_disk(self, limit=256):
+        """Load the most recently used chat answers from disk into memory"""
+        if not self.disk_cache or limit <= 0:
+            return 0
+        loaded = 0
+        for key, text, _age in self.disk_cache.recent(kind="chat", limit=limit):
+            self.response_cache.put(key.split(":", 1)[1], text)
+            loaded += 1
+        if loaded:
+            print(f"[INFO] Warmed {loaded} cached Gemini answers from disk")
+        return loaded
+
+    def rank_conditions(self, user_message, symptoms, top_k=3):
+        """Rank likely conditions locally from the knowledge base (no API call)"""
+        try:
+            scorer = knowledge_base.current().condition_scorer
+            return scorer.score(symptoms, user_message, top_k)
         except Exception as e:
-            print(f"[ERROR] Gemini API runtime error: {e}")
-            # CRITICAL: Always fall back to rule-based response on ANY failure
-            return self._fallback_response(symptoms, severity)
+            print(f"[WARNING] Local condition scoring failed: {e}")
+            return []
+
+    def _can_answer_locally(self, severity, conditions, user_message):
+        """
+        Skip the API for mild cases the local scorer is confident about: the
+        top condition scores well and clearly beats the runner-up, and the
+        message says nothing the knowledge base has no words for ("...and I'm
+        pregnant", "...my child swallowed bleach")
+        """
+        if not conditions or severity > self.local_answer_max_severity:
+            return False
+        top = conditions[0][1]
+        runner_up = conditions[1][1] if len(conditions) > 1 else 0.0
+        if top < self.local_answer_min_score:
+            return False
+        if top - runner_up < self.local_answer_min_margin:
+            return False
+        try:
+            scorer = knowledge_base.current().condition_scorer
+            unknown = scorer.unknown_tokens(user_message, LOCAL_ANSWER_FILLER)
+        except Exception as e:
+            print(f"[WARNING] Local answer vocabulary check failed: {e}")
+            return False
+        return not unknown
+
+    def analyze_injury_image(self, image_data_url, on_field=None):
+        """Analyze injury image using Gemini Vision
 
-    def analyze_injury_image(self, image_data_url):
-        """Analyze injury image using Gemini Vision"""
+        Args:
+            on_field: Optional callback(field, value, stage) invoked as each
+                field of the analysis streams in ("preview" or "full" stage);
+                cached and fallback answers do not trigger it
+        """
+        call = self.metrics.start("image")
+        try:
+            return self._analyze_injury_image(image_data_url, call, on_field)
+        finally:
+            self.metrics.finish(call)
+
+    def _analyze_injury_image(self, image_data_url, call, on_field=None):
         if not self.is_configured:
+            call.fallback("not_configured")
             return self._fallback_image_analysis()
 
         try:
@@ -144,7 +921,32 @@ IMPORTANT: Always state this is NOT a diagnosis and encourage professional medic
 
             # Decode base64 to bytes
             image_bytes = base64.b64decode(image_data)
-            image = Image.open(io.BytesIO(image_bytes))
+
+            # Identical photos (retries, re-uploads) are answered from disk
+            image_key = f"image:{hashlib.sha256(image_bytes).hexdigest()}"
+            if self.disk_cache:
+                cached = self.disk_cache.get(image_key)
+                if cached is not None:
+                    call.cache = "disk"
+                    call.source = "cache"
+                    return cached
+            call.cache = "miss"
+            call.request_class = VISION
+
+            # Smaller uploads: less latency, fewer tokens, less worker memory
+            if self.image_progressive:
+                progressive = self.image_preprocessor.prepare_progressive(
+                    image_bytes, self.image_thumbnail_edge
+                )
+                prepared = progressive.thumbnail
+            else:
+                progressive = None
+                prepared = self.image_preprocessor.prepare(image_bytes)
+            print(
+                f"[INFO] Image normalized: {prepared.original_width}x{prepared.original_height} "
+                f"{prepared.original_bytes // 1024} KB -> {prepared.width}x{prepared.height} "
+                f"{len(prepared.data) // 1024} KB"
+            )
 
             prompt = """You are a medical AI assistant specializing in disease recognition and medical image analysis.
 
@@ -168,7 +970,7 @@ Format your response as JSON:
   "injury_type": "Primary condition/disease name",
   "possible_conditions": ["condition 1", "condition 2", "condition 3"],
   "severity": "mild/moderate/severe",
-  "confidence": 85,
+  "confidence": <0-100>,
   "description": "Detailed visual description",
   "disease_characteristics": ["characteristic 1", "characteristic 2", ...],
   "cure_steps": ["step 1", "step 2", ...],
@@ -182,42 +984,248 @@ Format your response as JSON:
 IMPORTANT: This is for informational purposes only. Always recommend professional medical consultation for accurate diagnosis.
 """
 
-            response = self.vision_model.generate_content([prompt, image])
+            def call_upstream():
+                provider = self.router.choose(VISION)
+                call.use_provider(provider)
+                if provider.is_local:
+                    call.fallback("routed_to_rules")
+                    return None
+
+                if progressive:
+                    result = self._progressive_image_analysis(
+                        provider, prompt, progressive, image_key, call, on_field
+                    )
+                else:
+                    result = self._vision_stage(
+                        provider,
+                        prompt,
+                        prepared,
+                        self.vision_timeout,
+                        image_key,
+                        call,
+                        on_field,
+                    )
+                # Partial (deadline-cut) answers are never cached
+                if result and not result.get("partial") and self.disk_cache:
+                    self.disk_cache.put(image_key, result, kind="image")
+                return result
 
-            # Validate response
-            if not response or not hasattr(response, "text") or not response.text:
+            result = self.in_flight.do(image_key, call_upstream)
+            if call.provider is None:
+                call.cache = "coalesced"
+            if result is None:
+                if call.fallback_reason is None:
+                    call.fallback("empty")
                 print(
                     "[WARNING] Gemini Vision returned empty response - using fallback"
                 )
                 return self._fallback_image_analysis()
 
-            # Parse JSON from response
-            import json
-            import re
+            # Coalesced callers each get their own copy
+            return dict(result)
 
-            # Extract JSON from markdown code blocks if present
-            text = response.text
-            json_match = re.search(r"```json\n(.*?)\n```", text, re.DOTALL)
-            if json_match:
-                text = json_match.group(1)
-            elif "```" in text:
-                text = text.replace("```", "")
+        except CircuitOpenError:
+            call.fallback("circuit_open")
+            return self._fallback_image_analysis()
 
-            result = json.loads(text)
-            result["success"] = True
-            return result
+        except LoadShedError:
+            call.fallback("shed")
+            return self._fallback_image_analysis()
+
+        except GeminiTimeout:
+            call.fallback("timeout")
+            print(
+                f"[WARNING] Gemini Vision exceeded {self.vision_timeout:g}s deadline - using fallback"
+            )
+            return self._fallback_image_analysis()
 
         except Exception as e:
+            call.fallback("error")
             print(f"[ERROR] Gemini Vision API runtime error: {e}")
             # CRITICAL: Always fall back to safe analysis on ANY failure
             return self._fallback_image_analysis()
 
-    def _fallback_response(self, symptoms, severity):
-        """Fallback response when API is not available"""
+    def _vision_stage(
+        self,
+        provider,
+        prompt,
+        prepared,
+        timeout,
+        late_key,
+        call,
+        on_field=None,
+        stage="full",
+    ):
+        """One streamed vision call, parsed as it arrives
+
+        Fields are passed to on_field as soon as they parse. If the deadline
+        passes after the key fields (injury_type, severity) arrived, the
+        partial analysis is returned instead of raising GeminiTimeout; the
+        complete answer is still cached under late_key when it lands.
+        """
+        extractor = JSONFieldExtractor(
+            (lambda key, value: on_field(key, value, stage)) if on_field else None
+        )
+
+        def run():
+            response = provider.client.generate_content(
+                [prompt, prepared.as_blob()], stream=True
+            )
+            for chunk in response:
+                text = self._response_text(chunk)
+                if text:
+                    extractor.feed(text)
+            return response
+
+        def store_late(_late_response):
+            result = self._image_result(extractor)
+            if result and self.disk_cache:
+                self.disk_cache.put(late_key, result, kind="image")
+
+        call.prompt(prompt, images=1)
+        started = time.perf_counter()
+        try:
+            response = self._call_with_deadline(
+                run,
+                timeout,
+                on_late=store_late if late_key else None,
+                priority=IMAGE,
+                provider=provider,
+            )
+        except GeminiTimeout:
+            fields = extractor.snapshot()
+            if not (fields.get("injury_type") and fields.get("severity")):
+                raise
+            print(
+                f"[WARNING] Gemini Vision exceeded {timeout:g}s deadline - "
+                f"returning partial analysis ({len(fields)} fields)"
+            )
+            call.source = "partial"
+            call.fallback_reason = "timeout"
+            defaults = self._fallback_image_analysis()
+            for key in ("cure_steps", "warning_signs", "do_not"):
+                fields.setdefault(key, defaults[key])
+            return {**fields, "success": True, "partial": True}
+
+        call.response(response, extractor.text, time.perf_counter() - started)
+        return self._image_result(extractor)
+
+    def _progressive_image_analysis(
+        self, provider, prompt, progressive, image_key, call, on_field=None
+    ):
+        """Analyze the preview; escalate to full resolution when its answer is
+        missing, below the confidence threshold or in an escalation severity.
+        Both stages share one vision_timeout deadline; the preview gets at
+        most thumbnail_timeout of it"""
+        started = time.perf_counter()
+        deadline = started + self.vision_timeout
+        self._count("thumbnail_calls", stats=self.image_stages)
+        try:
+            preview = self._vision_stage(
+                provider,
+                prompt + IMAGE_PREVIEW_NOTE,
+                progressive.thumbnail,
+                min(self.thumbnail_timeout, self.vision_timeout),
+                None,
+                call,
+                on_field,
+                stage="preview",
+            )
+        except (CircuitOpenError, LoadShedError):
+            raise
+        except Exception as e:
+            print(
+                f"[WARNING] Preview analysis failed ({type(e).__name__}) - escalating"
+            )
+            preview = None
+
+        reason = self._escalation_reason(preview)
+        if reason is None:
+            self._count("thumbnail_accepted", stats=self.image_stages)
+            call.stage = "thumbnail"
+            return preview
+
+        self._count(f"escalated_{reason}", stats=self.image_stages)
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            # No time left for the full image - an unsure preview beats none
+            # (likewise when the full image misses the deadline below)
+            self._count("escalation_skipped_deadline", stats=self.image_stages)
+            if preview:
+                call.stage = "thumbnail"
+                return preview
+            raise GeminiTimeout(f"no time left after {self.vision_timeout:g}s")
+
+        self._count("full_calls", stats=self.image_stages)
+        call.stage = "full"
+        try:
+            result = self._vision_stage(
+                provider,
+                prompt,
+                progressive.full(),
+                remaining,
+                image_key,
+                call,
+                on_field,
+            )
+        except GeminiTimeout:
+            if not preview:
+                raise
+            print(
+                "[WARNING] Full-resolution analysis missed the deadline - using preview"
+            )
+            call.stage = "thumbnail"
+            result = preview
+        # Both stages count towards upstream time
+        call.upstream_seconds = time.perf_counter() - started
+        return result
+
+    def _escalation_reason(self, preview):
+        """Why a preview answer is not good enough (None if it is)"""
+        if not preview:
+            return "failed"
+        match = re.search(r"\d+(?:\.\d+)?", str(preview.get("confidence", "")))
+        confidence = float(match.group()) if match else 0.0
+        if confidence < self.image_escalate_confidence:
+            return "low_confidence"
+        if (
+            str(preview.get("severity", "")).strip().lower()
+            in self.image_escalate_severities
+        ):
+            return "severity"
+        return None
+
+    def _image_result(self, extractor):
+        """Analysis from a finished extractor (None if nothing parsed)"""
+        fields = extractor.finish()
+        if not fields:
+            return None
+        if extractor.repaired:
+            print(
+                "[WARNING] Repaired malformed Gemini Vision JSON: "
+                + ", ".join(extractor.repaired)
+            )
+        fields["success"] = True
+        return fields
+
+    def _fallback_response(self, symptoms, severity, conditions=None):
+        """Fallback response when API is not available
+
+        Args:
+            conditions: Locally ranked (condition, score) pairs to mention
+        """
+        conditions_note = (
+            "**Possible Causes to Discuss With a Doctor:** "
+            + ", ".join(name for name, _ in conditions)
+            + "\n\n"
+            if conditions
+            else ""
+        )
+
         if severity == 1:
             return f"""I understand you're experiencing {', '.join(symptoms[:3]) if symptoms else 'some symptoms'}. Based on what you've described, this appears to be mild and likely manageable with self-care.
 
-**My Recommendations:**
+{conditions_note}**My Recommendations:**
 • Rest and stay hydrated
 • Monitor your symptoms over the next 24-48 hours
 • Consider over-the-counter remedies if appropriate
@@ -239,7 +1247,7 @@ How are you feeling otherwise? Any other symptoms I should know about?"""
 **What This Might Indicate:**
 Your symptoms suggest a condition that could benefit from medical evaluation. While not immediately urgent, it's important to address this properly.
 
-**Recommended Actions:**
+{conditions_note}**Recommended Actions:**
 • Schedule an appointment with your primary care doctor within the next few days
 • Keep track of your symptoms (when they occur, severity, triggers)
 • Stay well-hydrated and get plenty of rest
@@ -256,7 +1264,7 @@ Would you like me to help you find suitable specialists in your area? Also, do y
         elif severity == 3:
             return f"""I'm concerned about the symptoms you've described: {', '.join(symptoms[:5]) if symptoms else 'these symptoms'}. This appears to be a serious situation that requires prompt medical attention.
 
-**Immediate Actions Needed:**
+{conditions_note}**Immediate Actions Needed:**
 🏥 **Seek medical care today or within 24 hours**
 • Contact your doctor immediately for an urgent appointment
 • If after hours, consider visiting an urgent care facility
@@ -0,0 +1,26 @@
+"""
+Gunicorn settings - picked up automatically when gunicorn starts in backend/
+Each worker loads Gemini and opens its model connections in the background
+right after it boots, so the first user request does not pay for client setup
+and the TLS handshake. This has to happen per worker, after fork: gRPC
+channels and HTTP sessions must not be shared across processes.
+"""
+
+import os
+import threading
+
+
+def post_worker_init(worker):
+    """Prewarm Gemini in the freshly forked worker (GEMINI_PREWARM=0 disables)"""
+    if os.getenv("GEMINI_PREWARM", "1") != "1":
+        return
+
+    def prewarm():
+        from service_registry import services
+
+        try:
+            services.get("gemini").prewarm(background=False)
+        except Exception as e:
+            worker.log.warning("Gemini prewarm failed: %s", e)
+
+    threading.Thread(target=prewarm, name="gemini-prewarm", daemon=True).start()
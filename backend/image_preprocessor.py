@@ -0,0 +1,173 @@
+"""
+Image Preprocessor - Normalizes uploaded photos before they are sent to Gemini Vision
+Applies EXIF orientation, downsamples to a maximum edge, strips metadata and
+re-encodes as quality-bounded JPEG (phone photos shrink from MBs to ~100-300 KB)
+"""
+
+import io
+import threading
+from typing import Dict, NamedTuple
+
+from PIL import Image, ImageOps
+
+
+class PreparedImage(NamedTuple):
+    """Upload-ready JPEG plus before/after sizes"""
+
+    data: bytes
+    width: int
+    height: int
+    original_width: int
+    original_height: int
+    original_bytes: int
+
+    mime_type = "image/jpeg"
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - len(self.data)
+
+    def as_blob(self) -> Dict:
+        """Inline image part accepted by generate_content"""
+        return {"mime_type": self.mime_type, "data": self.data}
+
+
+class ProgressiveImage:
+    """A preview-sized PreparedImage plus the full-size one, encoded on first use"""
+
+    def __init__(self, thumbnail: PreparedImage, encode_full):
+        self.thumbnail = thumbnail
+        self._encode_full = encode_full
+        self._full = None
+
+    def full(self) -> PreparedImage:
+        if self._full is None:
+            self._full = self._encode_full()
+        return self._full
+
+
+class ImagePreprocessor:
+    """
+    Normalize images for upload. When `max_bytes` is set, JPEG quality is
+    lowered in steps (down to `min_quality`) until the encoded image fits.
+    An image that needs no resize gets the same treatment with the upload's
+    own size as the cap, so re-encoding a small, already compressed JPEG does
+    not make it bigger.
+    """
+
+    def __init__(
+        self,
+        max_edge: int = 1536,
+        quality: int = 85,
+        min_quality: int = 50,
+        max_bytes: int = 0,
+    ):
+        self.max_edge = max_edge
+        self.quality = quality
+        self.min_quality = min(min_quality, quality)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self.images = 0
+        # Per encoded image: a progressive upload whose full-size image is
+        # also sent counts its original twice, once against each encoding
+        self.encoded = 0
+        self.original_total = 0
+        self.sent_total = 0
+
+    def prepare(self, image_bytes: bytes) -> PreparedImage:
+        """Decode, orient, resize and re-encode (raises on undecodable input)"""
+        image, original_size = self._decode(image_bytes)
+        return self._encode(image, self.max_edge, original_size, len(image_bytes))
+
+    def prepare_progressive(
+        self, image_bytes: bytes, thumbnail_edge: int = 512
+    ) -> "ProgressiveImage":
+        """Decode once; a small preview now, the full-size image only if asked for"""
+        image, original_size = self._decode(image_bytes)
+        thumbnail = self._encode(image, thumbnail_edge, original_size, len(image_bytes))
+        return ProgressiveImage(
+            thumbnail,
+            lambda: self._encode(image, self.max_edge, original_size, len(image_bytes)),
+        )
+
+    def _decode(self, image_bytes: bytes):
+        """Oriented RGB image and its original (width, height)"""
+        with Image.open(io.BytesIO(image_bytes)) as source:
+            original_size = source.size
+            # Phones store rotation in EXIF; bake it into the pixels before it is stripped
+            image = ImageOps.exif_transpose(source)
+
+            if image.mode in ("RGBA", "LA") or (
+                image.mode == "P" and "transparency" in image.info
+            ):
+                rgba = image.convert("RGBA")
+                image = Image.new("RGB", rgba.size, (255, 255, 255))
+                image.paste(rgba, mask=rgba.getchannel("A"))
+            elif image.mode != "RGB":
+                image = image.convert("RGB")
+            image.load()
+
+        with self._lock:
+            self.images += 1
+        return image, original_size
+
+    def _encode(
+        self, image, max_edge: int, original_size, original_bytes: int
+    ) -> PreparedImage:
+        resized = bool(max_edge) and max(image.size) > max_edge
+        if resized:
+            # resize() leaves the decoded image intact for a later, larger encode
+            scale = max_edge / max(image.size)
+            image = image.resize(
+                (
+                    max(1, round(image.width * scale)),
+                    max(1, round(image.height * scale)),
+                ),
+                Image.LANCZOS,
+            )
+
+        limit = self.max_bytes
+        if not resized:
+            limit = min(limit, original_bytes) if limit else original_bytes
+
+        quality = self.quality
+        data = None
+        while True:
+            buffer = io.BytesIO()
+            # No exif/icc arguments, so no metadata is written
+            image.save(buffer, format="JPEG", quality=quality, optimize=True)
+            if data is None or len(buffer.getvalue()) < len(data):
+                data = buffer.getvalue()
+            if not limit or len(data) <= limit:
+                break
+            if quality <= self.min_quality:
+                break
+            quality = max(self.min_quality, quality - 10)
+
+        prepared = PreparedImage(
+            data,
+            image.width,
+            image.height,
+            original_size[0],
+            original_size[1],
+            original_bytes,
+        )
+        with self._lock:
+            self.encoded += 1
+            self.original_total += original_bytes
+            self.sent_total += len(data)
+        return prepared
+
+    def stats(self) -> Dict:
+        """Totals for monitoring, including bytes saved"""
+        with self._lock:
+            return {
+                "images": self.images,
+                "encoded": self.encoded,
+                "original_bytes": self.original_total,
+                "sent_bytes": self.sent_total,
+                "bytes_saved": self.original_total - self.sent_total,
+                "max_edge": self.max_edge,
+                "quality": self.quality,
+            }
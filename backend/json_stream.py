@@ -0,0 +1,203 @@
+"""
+JSON Stream - Incremental, tolerant extraction of a JSON object from model output
+Fields of the top-level object are emitted as soon as each one is complete, so
+a caller can render `injury_type` before the model has finished `cure_steps`.
+Markdown fences, chatter around the object, trailing commas, Python literals
+and truncated output are tolerated instead of failing the whole answer.
+"""
+
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# "key": value, with the key double-quoted, single-quoted or bare
+_MEMBER_RE = re.compile(
+    r"""^\s*(?:"((?:[^"\\]|\\.)*)"|'([^']*)'|([A-Za-z_][\w ]*?))\s*:(.*)$""",
+    re.DOTALL,
+)
+# Two members on separate lines with the comma between them missing
+_MISSING_COMMA_RE = re.compile(r'(["\]}\d]|true|false|null)(\s*\n\s*)(")')
+_TRAILING_COMMA_RE = re.compile(r",\s*([\]}])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+_CLOSERS = {"{": "}", "[": "]"}
+# A ' only opens a string where a key or value starts ('Cut, deep'), never
+# mid-word ("don't" in a bare value)
+_VALUE_START = "{[,:"
+
+
+def _opens_string(char: str, previous: str) -> bool:
+    """Whether `char` (after non-space `previous`) starts a quoted string"""
+    return char == '"' or (char == "'" and previous in _VALUE_START)
+
+
+def _close_partial(text: str) -> str:
+    """Terminate an open string and close open brackets of a truncated value"""
+    stack: List[str] = []
+    quote = None
+    escaped = False
+    previous = ":"
+    for char in text:
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif _opens_string(char, previous):
+            quote = char
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "]}" and stack:
+            stack.pop()
+        if not char.isspace():
+            previous = char
+    closed = text.rstrip()
+    if quote:
+        closed += "\\" if escaped else ""
+        closed += quote
+    closed = closed.rstrip().rstrip(",")
+    return closed + "".join(reversed(stack))
+
+
+def parse_value(text: str) -> Tuple[bool, Any]:
+    """(ok, value) for one JSON value, retrying with common repairs"""
+    text = text.strip()
+    if not text:
+        return False, None
+    candidates = [text]
+    repaired = _TRAILING_COMMA_RE.sub(r"\1", text.translate(_SMART_QUOTES))
+    repaired = _PY_LITERALS.get(repaired, repaired)
+    candidates.append(repaired)
+    if "'" in repaired and '"' not in repaired:
+        candidates.append(repaired.replace("'", '"'))
+    for candidate in candidates:
+        try:
+            return True, json.loads(candidate)
+        except ValueError:
+            continue
+    return False, None
+
+
+class JSONFieldExtractor:
+    """
+    Feed text chunks; each completed member of the first top-level object is
+    passed to `on_field(key, value)` and collected in `fields`.
+
+    A member whose value cannot be parsed even after repairs is kept as its
+    raw text (quotes stripped) rather than dropped, so one stray character
+    costs one field's formatting, not the whole analysis.
+    """
+
+    def __init__(self, on_field: Optional[Callable[[str, Any], None]] = None):
+        self.on_field = on_field
+        self.fields: Dict[str, Any] = {}
+        self.repaired: List[str] = []
+        self.text = ""
+        self.complete = False
+
+        self._lock = threading.Lock()
+        self._started = False
+        self._depth = 0
+        # Quote character of the string being read (None outside strings)
+        self._quote: Optional[str] = None
+        self._escaped = False
+        self._previous = "{"
+        self._member: List[str] = []
+
+    def feed(self, chunk: str):
+        """Consume the next piece of model output"""
+        self.text += chunk
+        if self.complete:
+            return
+        for char in chunk:
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._quote:
+                self._member.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == self._quote:
+                    self._quote = None
+                    self._previous = char
+                continue
+
+            previous = self._previous
+            if not char.isspace():
+                self._previous = char
+            if _opens_string(char, previous):
+                self._quote = char
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit_member()
+                    self.complete = True
+                    return
+
+            if self._depth == 1 and char == ",":
+                self._emit_member()
+            else:
+                self._member.append(char)
+
+    def finish(self) -> Dict[str, Any]:
+        """All fields, recovering the last member of a truncated object"""
+        if self._started and not self.complete and "".join(self._member).strip():
+            self._emit_member(partial=True)
+        if not self._started:
+            # No object at all - maybe a bare value wrapped in chatter
+            ok, value = parse_value(self.text.replace("```json", "").replace("```", ""))
+            if ok and isinstance(value, dict):
+                for key, item in value.items():
+                    self._set(key, item)
+        return self.snapshot()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Fields parsed so far (safe to call from another thread)"""
+        with self._lock:
+            return dict(self.fields)
+
+    def _emit_member(self, partial: bool = False):
+        member = "".join(self._member)
+        self._member = []
+        match = _MEMBER_RE.match(member.translate(_SMART_QUOTES))
+        if not match:
+            return
+        key = next(group for group in match.groups()[:3] if group is not None).strip()
+        raw = match.group(4)
+        ok, value = parse_value(_close_partial(raw) if partial else raw)
+        if ok:
+            if partial:
+                self.repaired.append(key)
+            self._set(key, value)
+            return
+        if partial:
+            return
+
+        ok, members = parse_value("{" + _MISSING_COMMA_RE.sub(r"\1,\2\3", member) + "}")
+        if ok and isinstance(members, dict):
+            self.repaired.extend(members)
+            for name, item in members.items():
+                self._set(name, item)
+            return
+        self.repaired.append(key)
+        self._set(key, raw.strip().strip("\"'"))
+
+    def _set(self, key: str, value: Any):
+        with self._lock:
+            self.fields[key] = value
+        if self.on_field:
+            try:
+                self.on_field(key, value)
+            except Exception as e:
+                print(f"[WARNING] JSON field callback failed for '{key}': {e}")
@@ -0,0 +1,162 @@
+"""
+Knowledge Base Manager - Single shared copy of medical_kb.json
+Builds compiled matchers off the request path and hot-swaps them when the file changes
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from condition_scorer import ConditionScorer
+from fuzzy_index import FuzzyIndex
+
+_WORD_RE = re.compile(r"[a-z']+")
+
+
+def _compile_terms(terms: List[str]) -> Optional[re.Pattern]:
+    """Compile a list of literal terms into one substring-matching regex"""
+    terms = [t.lower() for t in terms if t]
+    if not terms:
+        return None
+    return re.compile("|".join(re.escape(t) for t in terms))
+
+
+class KnowledgeBaseSnapshot:
+    """Immutable view of one version of the knowledge base and its matchers"""
+
+    def __init__(self, data: Dict, version: int, checksum: str):
+        self.data = data
+        self.version = version
+        self.checksum = checksum
+        self.loaded_at = time.time()
+
+        self.symptoms: Dict = data.get("symptoms", {})
+        self.synonyms: Dict = data.get("symptom_synonyms", {})
+
+        # (symptom, matcher) pairs in knowledge-base order
+        self.keyword_matchers: List[Tuple[str, re.Pattern]] = [
+            (symptom, matcher)
+            for symptom, info in self.symptoms.items()
+            if (matcher := _compile_terms(info.get("keywords", [])))
+        ]
+        self.synonym_matchers: List[Tuple[str, re.Pattern]] = [
+            (std_term, matcher)
+            for std_term, synonyms in self.synonyms.items()
+            if (matcher := _compile_terms(synonyms))
+        ]
+        # Typo-tolerant fallback over all terms and synonyms
+        self.fuzzy_index = FuzzyIndex.from_knowledge_base(data)
+        # Offline condition ranking (condition x hashed-feature matrix)
+        self.condition_scorer = ConditionScorer.from_knowledge_base(data)
+
+        # Words that name each symptom: its name, keywords and synonyms
+        words: Dict[str, Set[str]] = {}
+        for symptom, info in self.symptoms.items():
+            for term in [symptom, *info.get("keywords", [])]:
+                words.setdefault(symptom, set()).update(_WORD_RE.findall(term.lower()))
+        for std_term, synonyms in self.synonyms.items():
+            for term in [std_term, *synonyms]:
+                words.setdefault(std_term, set()).update(_WORD_RE.findall(term.lower()))
+        self._symptom_words = {symptom: frozenset(w) for symptom, w in words.items()}
+        self.vocabulary: FrozenSet[str] = frozenset().union(*words.values())
+
+    def symptom_words(self, symptoms: Iterable[str]) -> FrozenSet[str]:
+        """Every word the knowledge base uses to name these symptoms"""
+        return frozenset().union(
+            *(self._symptom_words.get(symptom, ()) for symptom in symptoms or [])
+        )
+
+
+class KnowledgeBaseManager:
+    """
+    Loads medical_kb.json once per process and atomically swaps in a rebuilt
+    snapshot when the file changes. Readers grab `current()` once per request,
+    so in-flight requests finish on the version they started with.
+    """
+
+    def __init__(self, path: str = "medical_kb.json", reload_interval: float = None):
+        self.path = path
+        if reload_interval is None:
+            reload_interval = float(os.getenv("KB_RELOAD_INTERVAL", "5"))
+        self.reload_interval = reload_interval
+
+        self._reload_lock = threading.Lock()
+        self._mtime = None
+        self._watcher_pid = None
+        self._snapshot = self._load(version=1)
+
+    def current(self) -> KnowledgeBaseSnapshot:
+        """Return the active snapshot (starts the watcher in this process if needed)"""
+        if self.reload_interval > 0 and self._watcher_pid != os.getpid():
+            self._start_watcher()
+        return self._snapshot
+
+    @property
+    def data(self) -> Dict:
+        """Raw knowledge base dictionary of the active snapshot"""
+        return self.current().data
+
+    def reload_if_changed(self) -> bool:
+        """Rebuild and swap the snapshot if the file changed on disk"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        return self.reload()
+
+    def reload(self) -> bool:
+        """Force a rebuild from disk. Keeps the old snapshot if the file is invalid."""
+        with self._reload_lock:
+            old = self._snapshot
+            try:
+                snapshot = self._load(version=old.version + 1)
+            except (OSError, ValueError) as e:
+                print(
+                    f"[WARNING] Knowledge base reload failed, keeping v{old.version}: {e}"
+                )
+                return False
+
+            if snapshot.checksum == old.checksum:
+                return False
+
+            # Single reference assignment - readers see either old or new, never a mix
+            self._snapshot = snapshot
+            print(f"[INFO] Medical knowledge base reloaded (v{snapshot.version})")
+            return True
+
+    def _load(self, version: int) -> KnowledgeBaseSnapshot:
+        # Record the mtime before parsing so a broken file is only reported once
+        self._mtime = os.path.getmtime(self.path)
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        data = json.loads(raw)
+        return KnowledgeBaseSnapshot(
+            data, version=version, checksum=hashlib.sha256(raw).hexdigest()
+        )
+
+    def _start_watcher(self):
+        """Poll the file's mtime in a daemon thread (re-started after fork)"""
+        with self._reload_lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+
+        def watch():
+            while True:
+                time.sleep(self.reload_interval)
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    print(f"[WARNING] Knowledge base watcher error: {e}")
+
+        threading.Thread(target=watch, name="kb-watcher", daemon=True).start()
+
+
+# Global instance
+knowledge_base = KnowledgeBaseManager()
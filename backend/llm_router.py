@@ -0,0 +1,234 @@
+"""
+LLM Router - Picks a model backend per request from observed latency and errors
+Providers (Gemini models, the fake backend, the local rule engine) are tried in
+each request class's preference order, skipping any whose circuit breaker is
+open or whose recent p95 latency or error rate is over budget
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from circuit_breaker import OPEN, CircuitBreaker
+
+# Request classes
+CHAT_SIMPLE = "chat_simple"
+CHAT_COMPLEX = "chat_complex"
+CHAT_EMERGENCY = "emergency"
+VISION = "vision"
+
+# Name of the always-available local provider (rule-based fallback answers)
+RULES = "rules"
+
+DEFAULT_LATENCY_BUDGETS = {
+    CHAT_SIMPLE: 2.0,
+    CHAT_COMPLEX: 3.0,
+    CHAT_EMERGENCY: 3.0,
+    VISION: 8.0,
+}
+
+
+def classify_request(user_message, symptoms, severity, system_override=None):
+    """Short, mild chats can go to a fast model; the rest need the strong one"""
+    if system_override or severity >= 4:
+        return CHAT_EMERGENCY
+    if severity <= 2 and len(symptoms or []) <= 2 and len(user_message or "") <= 200:
+        return CHAT_SIMPLE
+    return CHAT_COMPLEX
+
+
+class Provider:
+    """
+    One model backend and its recent call history
+
+    Args:
+        client: Object with generate_content(); None for the local rule engine
+        model: Model name shown in stats
+        window: Seconds of history used for p95 latency and error rate
+        breaker: This backend's circuit breaker (one failing model must not
+            stop calls to the others)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        client=None,
+        model: str = None,
+        window: float = 300.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.name = name
+        self.client = client
+        self.model = model
+        self.window = window
+        self.breaker = breaker
+        self._samples: Deque[Tuple[float, float, bool]] = deque()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    @property
+    def is_local(self) -> bool:
+        return self.client is None
+
+    @property
+    def circuit_open(self) -> bool:
+        """True while this provider's breaker is failing calls fast"""
+        return self.breaker is not None and self.breaker.state == OPEN
+
+    def record(self, latency: float, ok: bool):
+        now = time.monotonic()
+        with self._lock:
+            self.calls += 1
+            if not ok:
+                self.errors += 1
+            self._samples.append((now, latency, ok))
+            self._prune(now)
+
+    def _prune(self, now: float):
+        cutoff = now - self.window
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+
+    def health(self) -> Dict:
+        """Sample count, p50/p95 latency and error rate over the window"""
+        with self._lock:
+            self._prune(time.monotonic())
+            latencies = sorted(latency for _, latency, _ in self._samples)
+            failures = sum(1 for _, _, ok in self._samples if not ok)
+        count = len(latencies)
+        return {
+            "samples": count,
+            "p50": round(latencies[int(0.50 * (count - 1))], 3) if count else None,
+            "p95": round(latencies[int(0.95 * (count - 1))], 3) if count else None,
+            "error_rate": round(failures / count, 4) if count else 0.0,
+        }
+
+
+class LLMRouter:
+    """
+    Routes each request class to the first healthy provider in its route.
+    A provider whose circuit breaker is open is skipped. A provider with at
+    least `min_samples` recent calls is skipped when its error rate exceeds
+    `max_error_rate` or its p95 exceeds the class budget, except for a
+    `probe_rate` share of requests that keep its stats fresh. Reaching the
+    rule engine in a route means "answer locally"; a route without it falls
+    back to the least bad remote provider. `breaker_factory(name)` gives
+    each remote provider that has none its own circuit breaker.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[Provider],
+        routes: Dict[str, List[str]],
+        latency_budgets: Optional[Dict[str, float]] = None,
+        max_error_rate: float = 0.2,
+        min_samples: int = 10,
+        probe_rate: float = 0.05,
+        breaker_factory: Optional[Callable[[str], CircuitBreaker]] = None,
+    ):
+        self.providers: Dict[str, Provider] = {p.name: p for p in providers}
+        self.providers.setdefault(RULES, Provider(RULES))
+        if breaker_factory:
+            for provider in self.providers.values():
+                if not provider.is_local and provider.breaker is None:
+                    provider.breaker = breaker_factory(provider.name)
+        self.routes = {
+            request_class: [name for name in names if name in self.providers]
+            for request_class, names in routes.items()
+        }
+        self.latency_budgets = dict(DEFAULT_LATENCY_BUDGETS)
+        self.latency_budgets.update(latency_budgets or {})
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.probe_rate = probe_rate
+
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+        self.selections: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def single(cls, name: str, client, vision_client=None, **kwargs) -> "LLMRouter":
+        """Every request class served by one backend (rule engine as last resort)"""
+        providers = [Provider(name, client, model=name)]
+        vision_name = name
+        if vision_client is not None and vision_client is not client:
+            vision_name = f"{name}-vision"
+            providers.append(Provider(vision_name, vision_client, model=name))
+        routes = {
+            CHAT_SIMPLE: [name, RULES],
+            CHAT_COMPLEX: [name, RULES],
+            CHAT_EMERGENCY: [name, RULES],
+            VISION: [vision_name],
+        }
+        return cls(providers, routes, **kwargs)
+
+    def _score(self, provider: Provider, budget: float) -> float:
+        """Lower is better: p95 relative to budget, inflated by errors"""
+        health = provider.health()
+        if health["samples"] < self.min_samples:
+            return 0.0
+        return (health["p95"] / budget) * (1 + 10 * health["error_rate"])
+
+    def _healthy(self, provider: Provider, budget: float) -> bool:
+        health = provider.health()
+        if health["samples"] < self.min_samples:
+            return True
+        if health["error_rate"] <= self.max_error_rate and health["p95"] <= budget:
+            return True
+        with self._lock:
+            return self._rng.random() < self.probe_rate
+
+    def choose(self, request_class: str) -> Provider:
+        """Provider for this request class (see class docstring)"""
+        route = self.routes.get(request_class) or [RULES]
+        budget = self.latency_budgets.get(
+            request_class, DEFAULT_LATENCY_BUDGETS[CHAT_COMPLEX]
+        )
+
+        chosen = None
+        for name in route:
+            provider = self.providers[name]
+            if provider.is_local:
+                chosen = provider
+                break
+            if not provider.circuit_open and self._healthy(provider, budget):
+                chosen = provider
+                break
+        if chosen is None:
+            remote = [
+                self.providers[n] for n in route if not self.providers[n].is_local
+            ]
+            # Open circuits last - they can only fail fast
+            chosen = min(remote, key=lambda p: (p.circuit_open, self._score(p, budget)))
+
+        with self._lock:
+            counts = self.selections.setdefault(request_class, {})
+            counts[chosen.name] = counts.get(chosen.name, 0) + 1
+        return chosen
+
+    def record(self, provider: Provider, latency: float, ok: bool):
+        provider.record(latency, ok)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            selections = {k: dict(v) for k, v in self.selections.items()}
+        return {
+            "routes": self.routes,
+            "latency_budgets": self.latency_budgets,
+            "max_error_rate": self.max_error_rate,
+            "providers": {
+                name: {
+                    "model": provider.model,
+                    "local": provider.is_local,
+                    "circuit": provider.breaker.state if provider.breaker else None,
+                    "calls": provider.calls,
+                    "errors": provider.errors,
+                    **provider.health(),
+                }
+                for name, provider in self.providers.items()
+            },
+            "selections": selections,
+        }
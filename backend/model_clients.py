@@ -0,0 +1,242 @@
+"""
+Model Clients - Pluggable backends for GeminiService
+Anything with Gemini's `generate_content(contents, stream=False)` can serve as a
+model. FakeModelClient answers locally with configurable latency, errors and
+streaming so the AI paths can be load tested without spending API quota.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from typing import Callable, Iterator, List, Optional
+
+# Canned answers - shaped like the real ones so downstream code takes the same paths
+FAKE_CHAT_TEXT = (
+    "**Potential Conditions**: Common cold, viral infection, seasonal allergies\n\n"
+    "**Symptom Analysis**: The symptoms you describe are typical of a mild viral "
+    "illness and usually settle within a few days.\n\n"
+    "**Recommended Actions**: Rest, drink plenty of fluids and monitor your "
+    "temperature.\n\n"
+    "**When to Seek Help**: See a doctor if symptoms last more than 3-4 days or get "
+    "worse. This is NOT a diagnosis - please consult a healthcare professional."
+)
+
+FAKE_EMERGENCY_TEXT = (
+    "🚨 CALL 112 IMMEDIATELY\n\n"
+    "This may be life-threatening and needs emergency care now.\n\n"
+    "1. Stay with the person\n2. Keep them still and calm\n"
+    "3. Follow the dispatcher's instructions\n\n"
+    "Emergency services are the ONLY proper response. I cannot replace them."
+)
+
+FAKE_IMAGE_RESULT = {
+    "injury_type": "Minor abrasion",
+    "possible_conditions": ["Abrasion", "Superficial cut", "Contact dermatitis"],
+    "severity": "mild",
+    "confidence": 80,
+    "description": "Superficial skin damage with mild redness",
+    "disease_characteristics": ["Shallow wound", "No deep tissue visible"],
+    "cure_steps": [
+        "Wash hands",
+        "Clean the area with water",
+        "Apply antiseptic",
+        "Cover with a sterile bandage",
+    ],
+    "warning_signs": ["Spreading redness", "Pus", "Fever"],
+    "do_not": ["Scratch the area", "Apply dirty cloth"],
+    "healing_time": "3-7 days",
+    "medical_advice": "See a doctor if it does not improve within a week",
+    "recommended_specialist": "General Physician",
+}
+
+
+class ModelClient:
+    """Interface every model backend implements (google.generativeai models already do)"""
+
+    name = "model"
+
+    def generate_content(self, contents, stream: bool = False):
+        """
+        Args:
+            contents: A prompt string, or a list of parts (prompt, image blob)
+            stream: Return an iterable of chunks instead of one response
+
+        Returns:
+            An object with `.text`; when streaming, iterating it yields chunks
+            that each have `.text`
+        """
+        raise NotImplementedError
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Latency distribution from a spec string (seconds):
+        fixed:0.8 | uniform:0.5,1.5 | normal:1.0,0.2 | lognormal:0.8,0.5 | exp:1.0
+    lognormal takes the median and sigma; results are never negative.
+    """
+    kind, _, params = spec.partition(":")
+    kind = kind.strip().lower()
+    values = [float(p) for p in params.split(",") if p.strip()]
+
+    if kind == "fixed":
+        (value,) = values
+        return lambda rng: value
+    if kind == "uniform":
+        low, high = values
+        return lambda rng: rng.uniform(low, high)
+    if kind == "normal":
+        mean, sigma = values
+        return lambda rng: max(0.0, rng.gauss(mean, sigma))
+    if kind == "lognormal":
+        import math
+
+        median, sigma = values
+        mu = math.log(median)
+        return lambda rng: rng.lognormvariate(mu, sigma)
+    if kind == "exp":
+        (mean,) = values
+        return lambda rng: rng.expovariate(1.0 / mean)
+    raise ValueError(f"Unknown latency distribution: {spec!r}")
+
+
+class FakeUpstreamError(Exception):
+    """Injected upstream failure (like a 503 or quota error from the real API)"""
+
+
+class FakeResponse:
+    """Mimics a generate_content response; iterable when streamed"""
+
+    def __init__(self, chunks: List[str], chunk_delay: Optional[Callable] = None):
+        self._chunks = chunks
+        self._chunk_delay = chunk_delay
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def __iter__(self) -> Iterator["FakeResponse"]:
+        for index, chunk in enumerate(self._chunks):
+            # The first chunk was "fetched" before generate_content returned
+            if index and self._chunk_delay:
+                time.sleep(self._chunk_delay())
+            yield FakeResponse([chunk])
+
+
+class FakeModelClient(ModelClient):
+    """
+    Local stand-in for Gemini
+
+    Args:
+        latency: Distribution of full (non-streamed) response time
+        first_token_latency: Distribution of time to the first streamed chunk
+        chunk_delay: Distribution of the gap between streamed chunks
+        stream_chunks: Number of chunks a streamed answer is split into
+        error_rate: Share of calls that fail with FakeUpstreamError
+        slow_rate: Share of calls that take `slow_latency` instead (stalls)
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: str = "lognormal:1.2,0.4",
+        first_token_latency: str = "lognormal:0.4,0.3",
+        chunk_delay: str = "fixed:0.05",
+        stream_chunks: int = 12,
+        error_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: str = "fixed:30",
+        seed: Optional[int] = None,
+    ):
+        self.settings = {
+            "latency": latency,
+            "first_token_latency": first_token_latency,
+            "chunk_delay": chunk_delay,
+            "stream_chunks": stream_chunks,
+            "error_rate": error_rate,
+            "slow_rate": slow_rate,
+            "slow_latency": slow_latency,
+            "seed": seed,
+        }
+        self._latency = parse_latency(latency)
+        self._first_token = parse_latency(first_token_latency)
+        self._chunk_delay = parse_latency(chunk_delay)
+        self._slow_latency = parse_latency(slow_latency)
+        self.stream_chunks = max(1, stream_chunks)
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls, prefix: str = "FAKE_LLM_") -> "FakeModelClient":
+        """Configure from FAKE_LLM_* environment variables"""
+        env = lambda key, default: os.getenv(prefix + key, default)
+        seed = env("SEED", "")
+        return cls(
+            latency=env("LATENCY", "lognormal:1.2,0.4"),
+            first_token_latency=env("FIRST_TOKEN_LATENCY", "lognormal:0.4,0.3"),
+            chunk_delay=env("CHUNK_DELAY", "fixed:0.05"),
+            stream_chunks=int(env("STREAM_CHUNKS", "12")),
+            error_rate=float(env("ERROR_RATE", "0")),
+            slow_rate=float(env("SLOW_RATE", "0")),
+            slow_latency=env("SLOW_LATENCY", "fixed:30"),
+            seed=int(seed) if seed else None,
+        )
+
+    def _draw(self, distribution: Callable) -> float:
+        with self._lock:
+            return distribution(self._rng)
+
+    def _roll(self, rate: float) -> bool:
+        if not rate:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    @staticmethod
+    def _answer_for(contents) -> str:
+        if isinstance(contents, (list, tuple)):
+            return "```json\n" + json.dumps(FAKE_IMAGE_RESULT) + "\n```"
+        if "CALL 112" in str(contents):
+            return FAKE_EMERGENCY_TEXT
+        return FAKE_CHAT_TEXT
+
+    def generate_content(self, contents, stream: bool = False):
+        with self._lock:
+            self.calls += 1
+
+        if self._roll(self.slow_rate):
+            delay = self._draw(self._slow_latency)
+        elif stream:
+            delay = self._draw(self._first_token)
+        else:
+            delay = self._draw(self._latency)
+        time.sleep(delay)
+
+        if self._roll(self.error_rate):
+            with self._lock:
+                self.errors += 1
+            raise FakeUpstreamError("503 Service Unavailable (fake backend)")
+
+        text = self._answer_for(contents)
+        if not stream:
+            return FakeResponse([text])
+
+        size = -(-len(text) // self.stream_chunks)
+        chunks = [text[i : i + size] for i in range(0, len(text), size)]
+        return FakeResponse(chunks, lambda: self._draw(self._chunk_delay))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": self.name,
+                "calls": self.calls,
+                "errors": self.errors,
+                **self.settings,
+            }
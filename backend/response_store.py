@@ -0,0 +1,188 @@
+"""
+Response Store - Background work whose result the client fetches later
+An endpoint answers immediately with a response id; the slow part (an LLM call)
+runs in the background and the client polls (or long-polls) for the result
+"""
+
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+EXPIRED = "expired"
+
+# "<unix seconds>-<16 hex>", as made by submit()
+_ID_RE = re.compile(r"^(\d{1,12})-[0-9a-f]{16}$")
+# Workers' clocks may disagree slightly; ids further in the future are bogus
+_CLOCK_SKEW = 5.0
+# Polling the shared cache for another worker's result backs off up to this
+_POLL_MAX_INTERVAL = 1.0
+
+
+class _Entry:
+    __slots__ = ("status", "result", "error", "created", "done")
+
+    def __init__(self):
+        self.status = PENDING
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.done = threading.Event()
+
+
+class ResponseStore:
+    """
+    Runs submitted jobs on a small thread pool and keeps their results for
+    `ttl` seconds. Finished results are also written to `shared_cache` (e.g.
+    the SQLite disk cache) when given, so a poll that lands on another
+    gunicorn worker still finds them.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        max_workers: int = 4,
+        shared_cache: Optional[Callable[[], Any]] = None,
+        name: str = "responses",
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self._shared_cache = shared_cache
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        """Thread pool (re-created after fork - threads do not survive it)"""
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=self.name
+            )
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _shared(self):
+        try:
+            return self._shared_cache() if self._shared_cache else None
+        except Exception:
+            return None
+
+    def submit(self, fn: Callable[[], Any]) -> str:
+        """Start fn() in the background and return the id to poll with"""
+        response_id = f"{int(time.time())}-{uuid.uuid4().hex[:16]}"
+        entry = _Entry()
+        with self._lock:
+            self._prune()
+            self._entries[response_id] = entry
+            self.submitted += 1
+            pool = self._pool()
+        pool.submit(self._run, response_id, entry, fn)
+        return response_id
+
+    def _run(self, response_id: str, entry: _Entry, fn: Callable[[], Any]):
+        try:
+            entry.result = fn()
+            entry.status = READY
+            with self._lock:
+                self.completed += 1
+        except Exception as e:
+            print(f"[ERROR] Background response {response_id} failed: {e}")
+            entry.error = str(e)
+            entry.status = FAILED
+            with self._lock:
+                self.failed += 1
+        finally:
+            entry.done.set()
+
+        shared = self._shared()
+        if shared:
+            shared.put(
+                f"{self.name}:{response_id}",
+                {"status": entry.status, "result": entry.result, "error": entry.error},
+                kind=self.name,
+            )
+
+    def _prune(self):
+        """Drop finished entries older than ttl (lock held)"""
+        cutoff = time.time() - self.ttl
+        stale = [
+            key
+            for key, entry in self._entries.items()
+            if entry.created < cutoff and entry.done.is_set()
+        ]
+        for key in stale:
+            del self._entries[key]
+
+    def get(self, response_id: str, wait: float = 0.0) -> Dict:
+        """
+        Status of a response, waiting up to `wait` seconds for it to finish
+
+        Returns:
+            {"id", "status": pending|ready|failed|expired, "result", "error"}
+        """
+        with self._lock:
+            entry = self._entries.get(response_id)
+
+        if entry is not None:
+            if wait > 0:
+                entry.done.wait(wait)
+            return {
+                "id": response_id,
+                "status": entry.status,
+                "result": entry.result,
+                "error": entry.error,
+            }
+
+        # Submitted by another worker (or already pruned here): poll the
+        # shared cache until the result shows up or `wait` runs out
+        created = self._created(response_id)
+        deadline = time.monotonic() + max(0.0, wait)
+        interval = 0.05
+        while True:
+            if created is None or time.time() - created >= self.ttl:
+                status = EXPIRED
+                break
+            shared = self._shared()
+            stored = shared.get(f"{self.name}:{response_id}") if shared else None
+            if stored is not None:
+                return {"id": response_id, **stored}
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                status = PENDING
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, _POLL_MAX_INTERVAL)
+        return {"id": response_id, "status": status, "result": None, "error": None}
+
+    @staticmethod
+    def _created(response_id: str) -> Optional[float]:
+        """Submission time encoded in an id, None if it cannot be one of ours"""
+        match = _ID_RE.match(response_id or "")
+        if not match:
+            return None
+        created = int(match.group(1))
+        return None if created > time.time() + _CLOCK_SKEW else created
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "tracked": len(self._entries),
+                "pending": sum(
+                    1 for e in self._entries.values() if not e.done.is_set()
+                ),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
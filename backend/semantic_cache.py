@@ -0,0 +1,225 @@
+"""
+Semantic Cache - Near-duplicate lookup for chat answers
+Messages are hashed into small local vectors (detected symptoms, words and
+character trigrams); a paraphrase like "my head hurts" finds the answer given
+to "I've got a headache" by cosine similarity over a bounded NumPy store
+"""
+
+import re
+import threading
+import time
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from caching import normalize_message
+from condition_scorer import _feature_index
+
+_TOKEN_RE = re.compile(r"[a-z']+")
+# "no fever" must never be served the answer to "fever"
+_NEGATION_RE = re.compile(
+    r"\b(?:no|not|never|without|none|don't|doesn't|didn't|isn't|can't|cannot)\b"
+)
+
+# Words that carry no medical meaning - left in, they make unrelated
+# messages look alike ("i have a ..." / "i have a ...")
+STOPWORDS = frozenset(
+    "a an and am are as at be been but by can do does doing for from got had has "
+    "have having he her his how i i'm i've im is it it's its just me my of on or "
+    "really since so some that the their them then there they this to too very "
+    "was we were what when which with you your".split()
+)
+
+SYMPTOM_WEIGHT = 2.0
+WORD_WEIGHT = 0.5
+TRIGRAM_WEIGHT = 0.2
+
+
+def _features(message: str, symptoms: Sequence[str]) -> Dict[str, float]:
+    features: Dict[str, float] = {}
+    for symptom in symptoms or []:
+        features[f"sym:{symptom}"] = SYMPTOM_WEIGHT
+    for word in _TOKEN_RE.findall(normalize_message(message)):
+        if word in STOPWORDS:
+            continue
+        features[f"tok:{word}"] = WORD_WEIGHT
+        padded = f"<{word}>"
+        for i in range(len(padded) - 2):
+            features[f"tri:{padded[i:i + 3]}"] = TRIGRAM_WEIGHT
+    return features
+
+
+def content_words(message: str) -> FrozenSet[str]:
+    """Words of a message that carry meaning (stopwords dropped)"""
+    return frozenset(
+        word
+        for word in _TOKEN_RE.findall(normalize_message(message))
+        if word not in STOPWORDS
+    )
+
+
+class SemanticCache:
+    """
+    Ring buffer of (unit vector, partition, answer) rows.
+
+    A lookup only considers rows in the same partition - callers put
+    everything that must match exactly there (severity, emergency
+    classification, ...), and whether the message contains a negation is
+    always part of it - and returns the best answer whose cosine
+    similarity is at least `threshold`. The oldest row is overwritten once
+    `capacity` is reached; rows also expire after `ttl` seconds.
+
+    Similarity alone would serve "i have a fever" to "i have a fever and i
+    am pregnant", so a hit also needs both messages to use the same content
+    words. Only words that name one of the detected symptoms may differ
+    ("head hurts" / "headache"): `symptom_words(symptoms)` returns them.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 2048,
+        dim: int = 512,
+        threshold: float = 0.85,
+        ttl: float = 3600,
+        name: str = "semantic",
+        symptom_words: Optional[Callable[[Sequence[str]], AbstractSet[str]]] = None,
+    ):
+        self.name = name
+        self.symptom_words = symptom_words
+        self.capacity = max(0, int(capacity))
+        self.dim = dim
+        self.threshold = threshold
+        self.ttl = ttl
+
+        self._vectors = np.zeros((self.capacity, dim), dtype=np.float32)
+        # hash() of each row's partition key - no per-partition bookkeeping
+        self._partitions = np.zeros(self.capacity, dtype=np.int64)
+        self._expires = np.zeros(self.capacity, dtype=np.float64)
+        self._values = [None] * self.capacity
+        self._words = [frozenset()] * self.capacity
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+        # Similar enough, but one of the messages says something the other does not
+        self.rejected = 0
+        self._hit_similarity = 0.0
+
+    def vectorize(self, message: str, symptoms: Sequence[str]) -> Optional[np.ndarray]:
+        """Unit-length hashed feature vector, or None if the message has no features"""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in _features(message, symptoms).items():
+            vector[_feature_index(feature, self.dim)] += weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    @staticmethod
+    def _partition_hash(message: str, partition: Hashable) -> int:
+        negated = bool(_NEGATION_RE.search(normalize_message(message)))
+        return hash((partition, negated))
+
+    def get(
+        self, message: str, symptoms: Sequence[str], partition: Hashable
+    ) -> Optional[Tuple[Any, float]]:
+        """Best (answer, similarity) in this partition above the threshold, or None"""
+        if self.capacity == 0:
+            return None
+        vector = self.vectorize(message, symptoms)
+        pid = self._partition_hash(message, partition)
+        words = content_words(message)
+        interchangeable = self.symptom_words(symptoms) if self.symptom_words else ()
+        with self._lock:
+            if vector is None or not self._size:
+                self.misses += 1
+                return None
+
+            size = self._size
+            scores = self._vectors[:size] @ vector
+            eligible = (self._partitions[:size] == pid) & (
+                self._expires[:size] > time.monotonic()
+            )
+            scores = np.where(eligible, scores, -1.0)
+            candidates = np.flatnonzero(scores >= self.threshold)
+            for row in candidates[np.argsort(-scores[candidates])].tolist():
+                if (words ^ self._words[row]).difference(interchangeable):
+                    continue
+                similarity = float(scores[row])
+                self.hits += 1
+                self._hit_similarity += similarity
+                return self._values[row], round(similarity, 4)
+            if len(candidates):
+                self.rejected += 1
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        message: str,
+        symptoms: Sequence[str],
+        partition: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+    ):
+        """Remember an answer (overwrites the oldest row when full)"""
+        if self.capacity == 0:
+            return
+        vector = self.vectorize(message, symptoms)
+        if vector is None:
+            return
+        pid = self._partition_hash(message, partition)
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        words = content_words(message)
+        with self._lock:
+            row = self._next
+            self._vectors[row] = vector
+            self._partitions[row] = pid
+            self._expires[row] = expires_at
+            self._values[row] = value
+            self._words[row] = words
+            self._next = (row + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+            self.inserts += 1
+
+    def clear(self):
+        """Drop all entries (statistics are kept)"""
+        with self._lock:
+            self._values = [None] * self.capacity
+            self._words = [frozenset()] * self.capacity
+            self._next = 0
+            self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": self._size,
+                "capacity": self.capacity,
+                "dim": self.dim,
+                "threshold": self.threshold,
+                "partitions": len(np.unique(self._partitions[: self._size])),
+                "inserts": self.inserts,
+                "hits": self.hits,
+                "misses": self.misses,
+                "rejected": self.rejected,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "avg_hit_similarity": (
+                    round(self._hit_similarity / self.hits, 4) if self.hits else None
+                ),
+            }
@@ -0,0 +1,156 @@
+"""
+Service Registry - Lazy import and initialization of heavy subsystems
+Each service (and its heavy dependencies) is imported on first use instead of
+at app import, so workers boot fast and only pay for what they actually use
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+
+class ServiceRegistry:
+    """Maps service names to `module.attribute` singletons, loaded on demand"""
+
+    def __init__(self):
+        self._specs: Dict[str, tuple] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._errors: Dict[str, str] = {}
+        self._stats_lock = threading.Lock()
+        # Seconds spent importing each module (only modules this registry loaded)
+        self.import_times: Dict[str, float] = {}
+        self.boot_seconds: Optional[float] = None
+
+    def register(
+        self,
+        name: str,
+        module: str,
+        attribute: Optional[str] = None,
+        dependencies: Sequence[str] = (),
+    ):
+        """
+        Register a service
+
+        Args:
+            module: Module that creates the singleton at import time
+            attribute: Singleton attribute (defaults to the module itself)
+            dependencies: Heavy modules imported first so their cost is timed separately
+        """
+        self._specs[name] = (module, attribute, tuple(dependencies))
+        self._locks[name] = threading.Lock()
+
+    def lazy(self, name: str) -> "LazyService":
+        """Proxy that behaves like the service but loads it on first attribute access"""
+        if name not in self._specs:
+            raise KeyError(f"Unknown service: {name}")
+        return LazyService(self, name)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def _import(self, module: str):
+        if module in sys.modules:
+            return sys.modules[module]
+        started = time.perf_counter()
+        imported = importlib.import_module(module)
+        with self._stats_lock:
+            self.import_times[module] = round(time.perf_counter() - started, 4)
+        return imported
+
+    def get(self, name: str) -> Any:
+        """Return the service, importing and initializing it if needed"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        module, attribute, dependencies = self._specs[name]
+        with self._locks[name]:
+            if name in self._instances:
+                return self._instances[name]
+            started = time.perf_counter()
+            try:
+                for dependency in dependencies:
+                    self._import(dependency)
+                loaded = self._import(module)
+                instance = getattr(loaded, attribute) if attribute else loaded
+            except Exception as e:
+                self._errors[name] = str(e)
+                print(f"[ERROR] Failed to load service '{name}': {e}")
+                raise
+            self._instances[name] = instance
+            self._errors.pop(name, None)
+            print(
+                f"[INFO] Loaded service '{name}' in {time.perf_counter() - started:.2f}s"
+            )
+            return instance
+
+    def override(self, name: str, instance: Any):
+        """Replace a service instance (load tests, scripts); proxies pick it up"""
+        if name not in self._specs:
+            raise KeyError(f"Unknown service: {name}")
+        self._instances[name] = instance
+
+    def prewarm(
+        self, names: Optional[Iterable[str]] = None, background: bool = True
+    ) -> Optional[threading.Thread]:
+        """Load services ahead of the first request (in a daemon thread by default)"""
+        names = list(self._specs if names is None else names)
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception:
+                    pass  # already logged; the first real use will retry
+
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name="service-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> Dict:
+        """Load state per service and per-module import times (seconds)"""
+        with self._stats_lock:
+            import_times = dict(self.import_times)
+        return {
+            "pid": os.getpid(),
+            "boot_seconds": self.boot_seconds,
+            "services": {
+                name: {
+                    "module": module,
+                    "loaded": name in self._instances,
+                    "error": self._errors.get(name),
+                }
+                for name, (module, _attribute, _deps) in self._specs.items()
+            },
+            "import_seconds": import_times,
+        }
+
+
+class LazyService:
+    """Stand-in for a registered service; attribute access loads the real one"""
+
+    __slots__ = ("_registry", "_name")
+
+    def __init__(self, registry: ServiceRegistry, name: str):
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._registry.get(self._name), attr)
+
+    def __setattr__(self, attr: str, value: Any):
+        setattr(self._registry.get(self._name), attr, value)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._registry.is_loaded(self._name) else "not loaded"
+        return f"<LazyService {self._name} ({state})>"
+
+
+services = ServiceRegistry()
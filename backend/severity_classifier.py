@@ -2,7 +2,7 @@
 Severity Classifier - Determines medical urgency level (1-4)
 """
 
-import re
+from duration_parser import parse_durations
 
 
 class SeverityClassifier:
@@ -81,7 +81,7 @@ class SeverityClassifier:
             "years": 3,
         }
 
-    def classify(self, text, symptoms):
+    def classify(self, text, symptoms, durations=None):
         """
         Classify severity level from 1-4
         """
@@ -103,44 +103,40 @@ class SeverityClassifier:
                 return 2
 
         # Check time indicators
-        time_severity = self.analyze_time_urgency(text_lower)
+        time_severity = self.analyze_time_urgency(text_lower, durations)
         if time_severity > 1:
             return min(4, max(2, time_severity))
 
         # Default to mild
         return 1
 
-    def analyze_time_urgency(self, text):
+    def analyze_time_urgency(self, text, durations=None):
         """
         Analyze time references for urgency
+
+        Args:
+            text: Lowercased user message
+            durations: Pre-parsed durations (parsed from text if not given)
         """
-        time_patterns = [
-            (r"(\d+)\s*minutes?", "minutes"),
-            (r"(\d+)\s*hours?", "hours"),
-            (r"(\d+)\s*days?", "days"),
-            (r"(\d+)\s*weeks?", "weeks"),
-            (r"(\d+)\s*months?", "months"),
-            (r"(\d+)\s*years?", "years"),
-        ]
+        if durations is None:
+            durations = parse_durations(text)
 
         max_urgency = 1
-        for pattern, unit in time_patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                for match in matches:
-                    duration = int(match)
-                    base_urgency = self.time_indicators.get(unit, 1)
-
-                    # Adjust based on duration
-                    if unit == "minutes" and duration < 30:
-                        urgency = 4  # Very recent = more urgent
-                    elif unit == "hours" and duration < 6:
-                        urgency = 3
-                    elif unit == "days" and duration < 3:
-                        urgency = 2
-                    else:
-                        urgency = base_urgency
-
-                    max_urgency = max(max_urgency, urgency)
+        for duration in durations:
+            # Ranges are judged by their upper bound ("3-4 hours" -> 4 hours)
+            value, unit = duration.high, duration.unit
+            base_urgency = self.time_indicators.get(unit, 1)
+
+            # Adjust based on duration
+            if unit == "minutes" and value < 30:
+                urgency = 4  # Very recent = more urgent
+            elif unit == "hours" and value < 6:
+                urgency = 3
+            elif unit == "days" and value < 3:
+                urgency = 2
+            else:
+                urgency = base_urgency
+
+            max_urgency = max(max_urgency, urgency)
 
         return max_urgency
@@ -2,31 +2,58 @@
 Symptom Analyzer - Extracts and processes symptoms from user input
 """
 import re
-import json
+
+from knowledge_base import knowledge_base as shared_knowledge_base
 
 class SymptomAnalyzer:
-    def __init__(self):
-        # Load medical knowledge base
-        with open('medical_kb.json', 'r') as f:
-            self.knowledge_base = json.load(f)
-        
-        # Common symptoms database
-        self.symptoms_db = self.knowledge_base['symptoms']
-        self.synonyms = self.knowledge_base['symptom_synonyms']
+    def __init__(self, kb_manager=None):
+        # Shared, hot-reloadable medical knowledge base
+        self.kb_manager = kb_manager or shared_knowledge_base
+    
+    @property
+    def knowledge_base(self):
+        return self.kb_manager.current().data
+    
+    @property
+    def symptoms_db(self):
+        return self.kb_manager.current().symptoms
     
-    def extract_symptoms(self, text):
+    @property
+    def synonyms(self):
+        return self.kb_manager.current().synonyms
+    
+    def extract_symptoms(self, text, kb=None):
         """
         Extract medical symptoms from natural language text
+        
+        Args:
+            text: User's message
+            kb: Knowledge base snapshot to use (defaults to the current one)
         """
-        symptoms_found = []
+        kb = kb or self.kb_manager.current()
         text_lower = text.lower()
+        symptoms = self._extract(text_lower, kb)
+        
+        # Fallback: nothing matched the knowledge base - retry with typos corrected
+        if not any(symptom in kb.symptoms for symptom in symptoms):
+            corrected = kb.fuzzy_index.correct_text(text_lower)
+            if corrected != text_lower:
+                symptoms = self._extract(corrected, kb)
+        
+        return symptoms
+    
+    def _extract(self, text_lower, kb):
+        """
+        Run the pattern stages over already-lowercased text
+        """
+        symptoms_found = []
         
         # Check for symptom patterns
         # Pattern 1: "I have [symptom]"
         have_pattern = r'i (?:have|am having|feel|am feeling) (?:a )?(?:severe |mild |slight |extreme )?([a-z]+(?: [a-z]+){0,3})'
         matches = re.findall(have_pattern, text_lower)
         for match in matches:
-            symptom = self.normalize_symptom(match)
+            symptom = self.normalize_symptom(match, kb)
             if symptom:
                 symptoms_found.append(symptom)
         
@@ -39,31 +66,32 @@ class SymptomAnalyzer:
                 for i, w in enumerate(words):
                     if w == word and i > 0:
                         context = ' '.join(words[max(0, i-2):i+1])
-                        symptom = self.normalize_symptom(context)
+                        symptom = self.normalize_symptom(context, kb)
                         if symptom:
                             symptoms_found.append(symptom)
         
         # Pattern 3: Direct symptom matching
-        for symptom, info in self.symptoms_db.items():
-            if any(keyword in text_lower for keyword in info['keywords']):
+        for symptom, matcher in kb.keyword_matchers:
+            if matcher.search(text_lower):
                 symptoms_found.append(symptom)
         
         # Remove duplicates
         return list(set(symptoms_found))[:10]  # Limit to 10 symptoms
     
-    def normalize_symptom(self, symptom_text):
+    def normalize_symptom(self, symptom_text, kb=None):
         """
         Convert symptom description to standardized term
         """
+        kb = kb or self.kb_manager.current()
         symptom_text = symptom_text.strip()
         
         # Check synonyms first
-        for std_term, synonyms in self.synonyms.items():
-            if symptom_text in synonyms or any(syn in symptom_text for syn in synonyms):
+        for std_term, matcher in kb.synonym_matchers:
+            if matcher.search(symptom_text):
                 return std_term
         
         # Direct match in symptoms database
-        for symptom in self.symptoms_db:
+        for symptom in kb.symptoms:
             if symptom in symptom_text or symptom_text in symptom:
                 return symptom
         
@@ -0,0 +1,41 @@
+"""
+Shared pytest setup - run from backend/ with `python -m pytest tests`
+Backend modules are flat top-level imports and load their data files
+(medical_kb.json, ...) relative to the working directory
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
+
+
+class Clock:
+    """Frozen time source; tests move it forward with `clock.now += seconds`"""
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(request, monkeypatch):
+    """
+    Clock patched over time.time and time.monotonic. Parametrize it
+    indirectly to pick the start or the patched functions, e.g.
+    @pytest.mark.parametrize("clock", [{"start": 0, "patch": ["monotonic"]}],
+    indirect=True)
+    """
+    options = getattr(request, "param", {})
+    clock = Clock(options.get("start", 1_700_000_000.0))
+    for name in options.get("patch", ["time", "monotonic"]):
+        monkeypatch.setattr(time, name, clock)
+    return clock
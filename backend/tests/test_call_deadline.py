@@ -0,0 +1,125 @@
+import base64
+import io
+import time
+
+import pytest
+from PIL import Image
+
+from circuit_breaker import CircuitBreaker
+from gemini_service import GeminiService, GeminiTimeout
+from llm_router import CHAT_COMPLEX
+from upstream_scheduler import CHAT
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+    def make(**env):
+        settings = {
+            "GEMINI_BACKEND": "fake",
+            "GEMINI_DISK_CACHE_PATH": "",
+            "GEMINI_CHAT_TIMEOUT": "0.2",
+            "FAKE_LLM_LATENCY": "fixed:0.6",
+            "FAKE_LLM_SEED": "1",
+            **env,
+        }
+        for key, value in settings.items():
+            monkeypatch.setenv(key, value)
+        return GeminiService()
+
+    return make
+
+
+@pytest.fixture
+def service(make_service):
+    return make_service()
+
+
+def call_fake(service, provider):
+    return service._call_with_deadline(
+        lambda: provider.client.generate_content("i have a fever"),
+        service.chat_timeout,
+        provider,
+    )
+
+
+def test_started_call_past_the_deadline_counts_against_the_breaker(service):
+    provider = service.router.choose(CHAT_COMPLEX)
+    started = time.monotonic()
+    with pytest.raises(GeminiTimeout):
+        call_fake(service, provider)
+    assert time.monotonic() - started < 0.5
+    assert provider.breaker.stats()["window_calls"] == 1
+    assert provider.breaker.stats()["error_rate"] == 1.0
+    assert provider.errors == 1
+    assert service.call_stats()["timeouts"] == 1
+
+
+def test_queued_call_past_the_deadline_is_not_an_upstream_failure(make_service):
+    service = make_service(GEMINI_MAX_UPSTREAM_CALLS="1")
+    provider = service.router.choose(CHAT_COMPLEX)
+    # Hold the only upstream slot
+    service.scheduler.submit(lambda: time.sleep(0.6), CHAT)
+    time.sleep(0.05)
+
+    with pytest.raises(GeminiTimeout):
+        call_fake(service, provider)
+    assert provider.breaker.stats()["window_calls"] == 0
+    assert provider.calls == 0
+
+
+def test_queued_timeout_frees_the_half_open_probe(make_service):
+    service = make_service(GEMINI_MAX_UPSTREAM_CALLS="1")
+    provider = service.router.choose(CHAT_COMPLEX)
+    provider.breaker = CircuitBreaker(min_calls=1, open_seconds=0, half_open_calls=1)
+    provider.breaker.record_failure(0.1, "boom")
+    service.scheduler.submit(lambda: time.sleep(0.6), CHAT)
+    time.sleep(0.05)
+
+    with pytest.raises(GeminiTimeout):
+        call_fake(service, provider)
+    # The probe never reached the upstream, so it is available again
+    assert provider.breaker.allow_request()
+
+
+def test_late_answer_fills_the_cache(service):
+    message, symptoms = "i have a fever and a cough", ["fever", "cough"]
+    text, source = service.chat_medical_with_source(message, symptoms, 2)
+    assert source == "fallback"
+
+    time.sleep(0.7)
+    assert service.call_stats()["late_arrivals"] == 1
+    late_text, source = service.chat_medical_with_source(message, symptoms, 2)
+    assert source == "cache"
+    assert late_text != text
+
+
+def image_data_url():
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (200, 120, 110)).save(buffer, format="JPEG")
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+def test_vision_deadline_after_the_key_fields_returns_a_partial_answer(
+    make_service,
+):
+    service = make_service(
+        GEMINI_VISION_TIMEOUT="0.5",
+        FAKE_LLM_FIRST_TOKEN_LATENCY="fixed:0.05",
+        FAKE_LLM_CHUNK_DELAY="fixed:0.1",
+    )
+    result = service.analyze_injury_image(image_data_url())
+    assert result["partial"] is True
+    assert result["injury_type"] == "Minor abrasion"
+    assert result["severity"] == "mild"
+    # Fields that had not arrived come from the safe fallback
+    assert result["do_not"] == service._fallback_image_analysis()["do_not"]
+
+
+def test_vision_deadline_before_the_key_fields_falls_back(make_service):
+    service = make_service(
+        GEMINI_VISION_TIMEOUT="0.3",
+        FAKE_LLM_FIRST_TOKEN_LATENCY="fixed:0.6",
+    )
+    result = service.analyze_injury_image(image_data_url())
+    assert "partial" not in result
+    assert result == service._fallback_image_analysis()
@@ -0,0 +1,102 @@
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def make_breaker(**kwargs):
+    settings = dict(
+        window=60,
+        min_calls=4,
+        error_rate_threshold=0.5,
+        slow_call_seconds=5,
+        slow_rate_threshold=0.8,
+        open_seconds=30,
+        half_open_calls=2,
+    )
+    settings.update(kwargs)
+    return CircuitBreaker(name="test", **settings)
+
+
+def trip(breaker):
+    for _ in range(breaker.min_calls):
+        breaker.record_failure(0.1)
+
+
+def test_stays_closed_below_min_calls(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure(0.1)
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+
+
+def test_opens_at_error_rate(clock):
+    breaker = make_breaker()
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    breaker.record_failure(0.1)
+    assert breaker.state == CLOSED
+    breaker.record_failure(0.1, error=TimeoutError("slow"))
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    stats = breaker.stats()
+    assert stats["rejected"] == 1
+    assert stats["times_opened"] == 1
+    assert stats["last_error"] == "slow"
+
+
+def test_opens_on_slow_calls(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record_success(6.0)
+    assert breaker.state == OPEN
+
+
+def test_old_calls_leave_the_window(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure(0.1)
+    clock.now += 61
+    breaker.record_failure(0.1)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["window_calls"] == 1
+
+
+def test_half_open_probes_close_the_circuit(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+    # Only half_open_calls probes at a time
+    assert not breaker.allow_request()
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_failure(0.1)
+    assert breaker.state == OPEN
+    assert breaker.stats()["retry_in"] == 30.0
+
+
+def test_release_frees_a_probe(clock):
+    breaker = make_breaker(half_open_calls=1)
+    trip(breaker)
+    clock.now += 30
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.release()
+    assert breaker.allow_request()
+
+
+def test_late_result_while_open_is_ignored(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    breaker.record_success(0.1)
+    assert breaker.state == OPEN
+    assert breaker.stats()["window_calls"] == 0
@@ -0,0 +1,79 @@
+import pytest
+
+from disk_cache import DiskCache
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache" / "gemini.sqlite3")
+
+
+def test_round_trip_of_json_values(path, clock):
+    cache = DiskCache(path)
+    cache.put("chat:a", "answer")
+    cache.put("image:b", {"severity": "mild", "steps": [1, 2]}, kind="image")
+    assert cache.get("chat:a") == "answer"
+    assert cache.get("image:b") == {"severity": "mild", "steps": [1, 2]}
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["writes"]) == (2, 1, 2)
+    assert stats["entries"] == 2
+
+
+def test_entries_are_shared_between_instances(path, clock):
+    DiskCache(path).put("chat:a", "from another worker")
+    assert DiskCache(path).get("chat:a") == "from another worker"
+
+
+def test_expired_entries_miss_and_are_deleted(path, clock):
+    cache = DiskCache(path, ttl=60)
+    cache.put("chat:a", "old")
+    clock.now += 61
+    assert cache.get("chat:a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_accessed_entries_are_evicted_first(path, clock):
+    value = "x" * 100
+    cache = DiskCache(path, max_bytes=300, evict_every=1000)
+    for key in ["a", "b", "c"]:
+        cache.put(key, value)
+        clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    cache.put("d", value)
+
+    assert cache.evict() == 2
+    assert cache.get("a") == value
+    assert cache.get("d") == value
+    assert cache.get("b") is None and cache.get("c") is None
+
+
+def test_eviction_runs_every_evict_every_puts(path, clock):
+    cache = DiskCache(path, max_bytes=10, evict_every=2)
+    cache.put("a", "x" * 50)
+    assert cache.stats()["entries"] == 1
+    cache.put("b", "x" * 50)
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["evictions"] == 2
+
+
+def test_unserializable_value_is_logged_not_raised(path, clock, capsys):
+    cache = DiskCache(path)
+    cache.put("chat:a", object())
+    assert cache.get("chat:a") is None
+    assert cache.stats()["errors"] == 1
+    assert "[WARNING] Disk cache write failed" in capsys.readouterr().out
+
+
+def test_recent_lists_live_entries_most_recent_first(path, clock):
+    cache = DiskCache(path, ttl=100)
+    cache.put("chat:old", "expired")
+    clock.now += 101
+    for key in ["chat:a", "chat:b"]:
+        cache.put(key, key)
+        clock.now += 1
+    cache.put("image:c", {}, kind="image")
+
+    assert [key for key, _, _ in cache.recent(kind="chat")] == ["chat:b", "chat:a"]
+    assert [key for key, _, _ in cache.recent(limit=1)] == ["image:c"]
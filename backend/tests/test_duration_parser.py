@@ -0,0 +1,65 @@
+import pytest
+
+from duration_parser import Duration, describe_durations, parse_durations
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("fever for 2 days", [Duration(2, 2, "days")]),
+        ("headache since 1 day", [Duration(1, 1, "days")]),
+        ("cough for two weeks", [Duration(2, 2, "weeks")]),
+        ("Pain for Forty-Five Minutes", [Duration(45, 45, "minutes")]),
+        ("vomiting 3-4 hours", [Duration(3, 4, "hours")]),
+        ("rash for 3 – 5 days", [Duration(3, 5, "days")]),
+        ("dizzy two to three hours", [Duration(2, 3, "hours")]),
+        ("sore for 5 or 4 days", [Duration(4, 5, "days")]),
+        ("back pain 10years", [Duration(10, 10, "years")]),
+        ("fever for twenty-four hours", [Duration(24, 24, "hours")]),
+        ("fever for twenty four hours", [Duration(24, 24, "hours")]),
+        ("cough for Ninety-Nine days", [Duration(99, 99, "days")]),
+        ("rash twenty-one to twenty-two days", [Duration(21, 22, "days")]),
+        ("sore for thirteen days", [Duration(13, 13, "days")]),
+        ("sore for fourteen days", [Duration(14, 14, "days")]),
+        ("sore for sixteen days", [Duration(16, 16, "days")]),
+        ("sore for seventeen days", [Duration(17, 17, "days")]),
+        ("sore for eighteen days", [Duration(18, 18, "days")]),
+        ("sore for nineteen days", [Duration(19, 19, "days")]),
+        ("dizzy for an hour", [Duration(1, 1, "hours")]),
+        ("fever since a day", [Duration(1, 1, "days")]),
+        ("pain for a week or two", [Duration(1, 1, "weeks")]),
+    ],
+)
+def test_parses_durations(text, expected):
+    assert parse_durations(text) == expected
+
+
+def test_every_duration_in_order():
+    assert parse_durations("fever for 3 days and a cough for 2 weeks") == [
+        Duration(3, 3, "days"),
+        Duration(2, 2, "weeks"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "i have a fever",
+        "took 2 tablets",
+        "pain in 2 daylight hours",
+        "a monthly checkup every 3 monthly visits",
+        "someone said hours ago",
+        "tablets twice a day",
+        "once a week",
+        "3 times a day",
+        "for a few days",
+    ],
+)
+def test_ignores_text_without_a_duration(text):
+    assert parse_durations(text) == []
+
+
+def test_describe():
+    durations = [Duration(1, 1, "days"), Duration(3, 4, "hours")]
+    assert describe_durations(durations) == "1 day, 3-4 hours"
+    assert describe_durations([]) == ""
@@ -0,0 +1,59 @@
+import re
+
+import pytest
+
+from emergency_detector import EmergencyDetector
+from emergency_service import (
+    EMERGENCY_CLOSING,
+    EMERGENCY_HEADLINE,
+    GENERIC_SAFETY_ACTIONS,
+    EmergencyService,
+)
+
+DETECTOR = EmergencyDetector()
+INJURIES = ["accident", "broken", "fracture", "dislocation", "cut", "burn"]
+FORBIDDEN = re.compile(
+    r"aspirin|medication|medicine|\bdrug|pill|tablet|ointment|monitor|\bseek",
+    re.IGNORECASE,
+)
+
+
+def render(message):
+    detection = DETECTOR.check_emergency(message)
+    assert detection["is_emergency"]
+    return EmergencyService().render_template_response(detection)
+
+
+def actions(reply):
+    return [line[2:] for line in reply.splitlines() if line.startswith("• ")]
+
+
+@pytest.mark.parametrize(
+    "message",
+    list(DETECTOR.emergency_keywords) + [f"i have a {word} arm" for word in INJURIES],
+)
+def test_every_template_has_the_strict_shape(message):
+    reply = render(message)
+    lines = reply.splitlines()
+    assert lines[0] == EMERGENCY_HEADLINE
+    assert lines[-1] == EMERGENCY_CLOSING
+    assert 3 <= len(actions(reply)) <= 4
+    for action in actions(reply):
+        if not action.lower().startswith("do not"):
+            assert not FORBIDDEN.search(action), action
+        assert "call" not in action.lower(), action
+
+
+def test_heart_attack_never_suggests_aspirin():
+    assert "aspirin" not in render("i think it is a heart attack").lower()
+
+
+def test_broken_arm_is_padded_and_titled():
+    reply = render("i have a broken arm")
+    assert "Possible broken bone - " in reply
+    assert len(actions(reply)) == 3
+
+
+def test_no_detection_uses_generic_actions():
+    reply = EmergencyService().render_template_response(None)
+    assert actions(reply) == GENERIC_SAFETY_ACTIONS
@@ -0,0 +1,78 @@
+import pytest
+
+from fuzzy_index import FuzzyIndex
+from knowledge_base import knowledge_base
+from symptom_analyzer import SymptomAnalyzer
+
+VOCABULARY = ["fever", "cough", "headache", "head", "sick", "nausea", "stomach"]
+
+
+@pytest.fixture
+def index():
+    return FuzzyIndex(VOCABULARY, max_edit_distance=2)
+
+
+@pytest.mark.parametrize(
+    "token, expected",
+    [
+        ("feaver", "fever"),
+        ("fevr", "fever"),
+        ("hedache", "headache"),
+        ("headahce", "headache"),
+        ("nausia", "nausea"),
+        ("cuogh", "cough"),
+    ],
+)
+def test_corrects_typos(index, token, expected):
+    assert index.lookup(token) == expected
+
+
+def test_vocabulary_words_are_not_corrected(index):
+    assert index.lookup("cough") is None
+
+
+@pytest.mark.parametrize(
+    "token", ["never", "ever", "fewer", "tough", "rough", "heat", "hear", "lick"]
+)
+def test_leaves_everyday_words_alone(index, token):
+    assert index.lookup(token) is None
+
+
+def test_max_edit_distance_is_honored_for_long_tokens():
+    words = ["abdominal"]
+    assert FuzzyIndex(words, max_edit_distance=2).lookup("abdxmxnxl") is None
+    assert FuzzyIndex(words, max_edit_distance=3).lookup("abdxmxnxl") == "abdominal"
+    # Short tokens stay at one edit whatever the setting
+    assert FuzzyIndex(["fever"], max_edit_distance=3).lookup("fxvxr") is None
+
+
+def test_zero_distance_disables_edit_corrections():
+    assert FuzzyIndex(VOCABULARY, max_edit_distance=0).lookup("feaver") is None
+
+
+@pytest.mark.parametrize(
+    "message, symptom",
+    [
+        ("i have a cugh", "cough"),
+        ("feaver since morning", "fever"),
+        ("bad hedache", "headache"),
+    ],
+)
+def test_extraction_uses_corrections(message, symptom):
+    assert symptom in SymptomAnalyzer(knowledge_base).extract_symptoms(message)
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "i never feel good",
+        "it was tough",
+        "it was rough",
+        "too much heat",
+        "my nose is runny",
+        "the noise upstairs",
+        "i paid for the paint",
+    ],
+)
+def test_extraction_does_not_invent_symptoms(message):
+    assert SymptomAnalyzer(knowledge_base).extract_symptoms(message) == []
@@ -0,0 +1,69 @@
+import io
+import random
+
+from PIL import Image
+
+from image_preprocessor import ImagePreprocessor
+
+
+def jpeg(width, height, quality=85, exif=None):
+    """A noisy photo-like JPEG (noise does not compress away)"""
+    rng = random.Random(width * height)
+    image = Image.frombytes(
+        "RGB",
+        (width, height),
+        bytes(rng.getrandbits(8) for _ in range(width * height * 3)),
+    )
+    buffer = io.BytesIO()
+    image.save(
+        buffer, format="JPEG", quality=quality, **({"exif": exif} if exif else {})
+    )
+    return buffer.getvalue()
+
+
+def test_large_image_is_resized_and_shrinks():
+    original = jpeg(800, 600)
+    prepared = ImagePreprocessor(max_edge=400).prepare(original)
+    assert (prepared.width, prepared.height) == (400, 300)
+    assert (prepared.original_width, prepared.original_height) == (800, 600)
+    assert prepared.bytes_saved > 0
+
+
+def test_small_compressed_jpeg_is_never_sent_bigger():
+    original = jpeg(300, 200, quality=60)
+    preprocessor = ImagePreprocessor(max_edge=1536, quality=85)
+    prepared = preprocessor.prepare(original)
+    assert (prepared.width, prepared.height) == (300, 200)
+    assert prepared.bytes_saved >= 0
+    assert preprocessor.stats()["bytes_saved"] >= 0
+
+
+def test_metadata_is_stripped():
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"
+    prepared = ImagePreprocessor().prepare(jpeg(64, 64, exif=exif.tobytes()))
+    assert not Image.open(io.BytesIO(prepared.data)).getexif()
+
+
+def test_progressive_counts_the_original_once_per_encoding():
+    original = jpeg(800, 600)
+    preprocessor = ImagePreprocessor(max_edge=600)
+    progressive = preprocessor.prepare_progressive(original, thumbnail_edge=200)
+    thumbnail, full = progressive.thumbnail, progressive.full()
+    assert progressive.full() is full
+
+    stats = preprocessor.stats()
+    assert stats["images"] == 1
+    assert stats["encoded"] == 2
+    assert stats["original_bytes"] == 2 * len(original)
+    assert stats["sent_bytes"] == len(thumbnail.data) + len(full.data)
+    assert stats["bytes_saved"] == thumbnail.bytes_saved + full.bytes_saved
+
+
+def test_preview_only_counts_the_preview():
+    original = jpeg(800, 600)
+    preprocessor = ImagePreprocessor(max_edge=600)
+    progressive = preprocessor.prepare_progressive(original, thumbnail_edge=200)
+    stats = preprocessor.stats()
+    assert stats["original_bytes"] == len(original)
+    assert stats["bytes_saved"] == progressive.thumbnail.bytes_saved
@@ -0,0 +1,100 @@
+import pytest
+
+from json_stream import JSONFieldExtractor, parse_value
+
+
+def extract(text, chunk_size=None):
+    seen = []
+    extractor = JSONFieldExtractor(on_field=lambda key, value: seen.append(key))
+    chunk_size = chunk_size or len(text)
+    for start in range(0, len(text), chunk_size):
+        extractor.feed(text[start : start + chunk_size])
+    return extractor.finish(), seen, extractor
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 3, 7])
+def test_fields_in_order_whatever_the_chunking(chunk_size):
+    text = '{"injury_type": "Cut", "severity": "mild", "steps": ["a", "b"]}'
+    fields, seen, extractor = extract(text, chunk_size)
+    assert fields == {"injury_type": "Cut", "severity": "mild", "steps": ["a", "b"]}
+    assert seen == ["injury_type", "severity", "steps"]
+    assert extractor.complete
+
+
+def test_field_is_emitted_before_the_object_ends():
+    extractor = JSONFieldExtractor()
+    extractor.feed('{"injury_type": "Cut", "cure_steps": ["Rinse')
+    assert extractor.snapshot() == {"injury_type": "Cut"}
+
+
+def test_commas_inside_strings_do_not_split_members():
+    fields, _, _ = extract('{"injury_type": "Cut, deep", "severity": "moderate"}')
+    assert fields["injury_type"] == "Cut, deep"
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1])
+def test_single_quoted_values_are_kept_whole(chunk_size):
+    text = "{'injury_type': 'Cut, deep', 'severity': 'moderate'}"
+    fields, _, extractor = extract(text, chunk_size)
+    assert fields == {"injury_type": "Cut, deep", "severity": "moderate"}
+    assert extractor.complete
+
+
+def test_apostrophe_in_a_bare_value_does_not_open_a_string():
+    fields, _, _ = extract('{severity: don\'t know, injury_type: "Cut"}')
+    assert fields == {"severity": "don't know", "injury_type": "Cut"}
+
+
+def test_apostrophes_inside_double_quoted_strings():
+    fields, _, _ = extract('{"advice": "Don\'t scratch, it\'s healing"}')
+    assert fields == {"advice": "Don't scratch, it's healing"}
+
+
+def test_markdown_fence_and_chatter_are_ignored():
+    fields, _, _ = extract('Sure! ```json\n{"severity": "mild"}\n``` Hope it helps')
+    assert fields == {"severity": "mild"}
+
+
+def test_trailing_commas_and_python_literals_are_repaired():
+    fields, _, _ = extract('{"steps": ["a", "b",], "urgent": False}')
+    assert fields == {"steps": ["a", "b"], "urgent": False}
+
+
+def test_missing_comma_between_members_is_repaired():
+    fields, _, extractor = extract('{"a": "x"\n"b": "y", "c": 1}')
+    assert fields == {"a": "x", "b": "y", "c": 1}
+    assert "b" in extractor.repaired
+
+
+def test_truncated_output_recovers_the_last_member():
+    fields, _, extractor = extract('{"injury_type": "Cut", "steps": ["Rinse", "Cov')
+    assert fields == {"injury_type": "Cut", "steps": ["Rinse", "Cov"]}
+    assert extractor.repaired == ["steps"]
+
+
+def test_truncated_single_quoted_value_is_closed():
+    fields, _, _ = extract("{'injury_type': 'Cut, de")
+    assert fields == {"injury_type": "Cut, de"}
+
+
+def test_unparseable_value_is_kept_as_raw_text():
+    fields, _, extractor = extract('{"severity": mild-ish, "a": 1}')
+    assert fields == {"severity": "mild-ish", "a": 1}
+    assert "severity" in extractor.repaired
+
+
+def test_text_after_the_object_is_ignored():
+    fields, _, _ = extract('{"a": 1} {"b": 2}')
+    assert fields == {"a": 1}
+
+
+def test_bare_object_without_braces_is_not_invented():
+    fields, _, _ = extract("no json here")
+    assert fields == {}
+
+
+def test_parse_value_repairs():
+    assert parse_value("None") == (True, None)
+    assert parse_value("“smart”") == (True, "smart")
+    assert parse_value("'single'") == (True, "single")
+    assert parse_value("") == (False, None)
@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+
+import pytest
+
+from knowledge_base import KnowledgeBaseManager
+
+with open("medical_kb.json", encoding="utf-8") as f:
+    BASE = json.load(f)
+
+
+def write(path, data, mtime):
+    path.write_text(data if isinstance(data, str) else json.dumps(data))
+    os.utime(path, (mtime, mtime))
+
+
+def with_keyword(keyword):
+    data = json.loads(json.dumps(BASE))
+    data["symptoms"]["fever"]["keywords"].append(keyword)
+    return data
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "kb.json"
+    write(path, BASE, 1_000_000)
+    return path
+
+
+@pytest.fixture
+def manager(path):
+    return KnowledgeBaseManager(str(path), reload_interval=0)
+
+
+def test_changed_file_swaps_in_a_new_snapshot(manager, path):
+    old = manager.current()
+    write(path, with_keyword("pyrexia"), 1_000_001)
+
+    assert manager.reload_if_changed()
+    new = manager.current()
+    assert new.version == old.version + 1
+    assert "pyrexia" in new.vocabulary
+    # A request holding the old snapshot keeps a consistent view of it
+    assert "pyrexia" not in old.vocabulary
+    assert "pyrexia" not in old.data["symptoms"]["fever"]["keywords"]
+
+
+def test_unchanged_content_is_not_swapped(manager, path):
+    old = manager.current()
+    assert not manager.reload_if_changed()
+    write(path, BASE, 1_000_001)
+    assert not manager.reload_if_changed()
+    assert manager.current() is old
+
+
+def test_bad_json_keeps_the_old_snapshot(manager, path):
+    old = manager.current()
+    write(path, '{"symptoms": {', 1_000_001)
+    assert not manager.reload_if_changed()
+    assert manager.current() is old
+    # Reported once, not on every poll
+    assert not manager.reload_if_changed()
+
+    write(path, with_keyword("pyrexia"), 1_000_002)
+    assert manager.reload_if_changed()
+    assert manager.current().version == old.version + 1
+
+
+def test_missing_file_keeps_the_old_snapshot(manager, path):
+    old = manager.current()
+    path.unlink()
+    assert not manager.reload_if_changed()
+    assert not manager.reload()
+    assert manager.current() is old
+
+
+def test_readers_never_see_a_half_built_snapshot(manager, path):
+    stop = threading.Event()
+    mixed = []
+
+    def read():
+        while not stop.is_set():
+            snapshot = manager.current()
+            in_data = "pyrexia" in snapshot.data["symptoms"]["fever"]["keywords"]
+            if in_data != ("pyrexia" in snapshot.vocabulary):
+                mixed.append(snapshot.version)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for i in range(20):
+        data = with_keyword("pyrexia") if i % 2 == 0 else BASE
+        write(path, data, 1_000_001 + i)
+        assert manager.reload_if_changed()
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    assert mixed == []
+    assert manager.current().version == 21
@@ -0,0 +1,131 @@
+import pytest
+
+from circuit_breaker import CircuitBreaker
+from llm_router import (
+    CHAT_COMPLEX,
+    CHAT_EMERGENCY,
+    CHAT_SIMPLE,
+    RULES,
+    VISION,
+    LLMRouter,
+    Provider,
+    classify_request,
+)
+
+
+def make_router(probe_rate=0.0, **kwargs):
+    providers = [Provider("fast", client=object()), Provider("pro", client=object())]
+    routes = {
+        CHAT_SIMPLE: ["fast", "pro", RULES],
+        CHAT_COMPLEX: ["pro", "fast", RULES],
+        VISION: ["pro", "fast"],
+    }
+    return LLMRouter(
+        providers,
+        routes,
+        latency_budgets={CHAT_SIMPLE: 1.0, CHAT_COMPLEX: 2.0, VISION: 2.0},
+        min_samples=3,
+        probe_rate=probe_rate,
+        **kwargs,
+    )
+
+
+def feed(router, name, count=5, latency=0.1, ok=True):
+    for _ in range(count):
+        router.record(router.providers[name], latency, ok)
+
+
+@pytest.mark.parametrize(
+    "message, symptoms, severity, override, expected",
+    [
+        ("i have a headache", ["headache"], 1, None, CHAT_SIMPLE),
+        ("i have a headache", ["headache", "fever", "cough"], 2, None, CHAT_COMPLEX),
+        ("x" * 201, ["headache"], 1, None, CHAT_COMPLEX),
+        ("i have a headache", ["headache"], 3, None, CHAT_COMPLEX),
+        ("i have a headache", ["headache"], 4, None, CHAT_EMERGENCY),
+        ("help", [], 1, "STRICT EMERGENCY PROMPT", CHAT_EMERGENCY),
+    ],
+)
+def test_classify_request(message, symptoms, severity, override, expected):
+    assert classify_request(message, symptoms, severity, override) == expected
+
+
+def test_first_provider_in_route_without_history():
+    router = make_router()
+    assert router.choose(CHAT_SIMPLE).name == "fast"
+    assert router.choose(CHAT_COMPLEX).name == "pro"
+    assert router.stats()["selections"][CHAT_SIMPLE] == {"fast": 1}
+
+
+def test_unknown_class_and_unknown_names_go_to_rules():
+    router = LLMRouter([], {CHAT_SIMPLE: ["missing", RULES]})
+    assert router.routes[CHAT_SIMPLE] == [RULES]
+    assert router.choose(CHAT_SIMPLE).is_local
+    assert router.choose("no-such-class").is_local
+
+
+def test_slow_provider_is_skipped():
+    router = make_router()
+    feed(router, "fast", latency=1.5)
+    assert router.choose(CHAT_SIMPLE).name == "pro"
+    # Within the complex budget the same latency is fine
+    feed(router, "pro", latency=2.5)
+    assert router.choose(CHAT_COMPLEX).name == "fast"
+
+
+def test_failing_provider_is_skipped_until_the_route_reaches_rules():
+    router = make_router()
+    feed(router, "fast", ok=False)
+    feed(router, "pro", ok=False)
+    assert router.choose(CHAT_SIMPLE).name == RULES
+
+
+def test_too_few_samples_keep_a_provider_in_rotation():
+    router = make_router()
+    feed(router, "fast", count=2, ok=False)
+    assert router.choose(CHAT_SIMPLE).name == "fast"
+
+
+def test_probe_share_keeps_an_unhealthy_provider_sampled():
+    router = make_router(probe_rate=0.5)
+    router._rng.seed(1)
+    feed(router, "fast", ok=False)
+    chosen = [router.choose(CHAT_SIMPLE).name for _ in range(200)]
+    assert 60 < chosen.count("fast") < 140
+    assert set(chosen) == {"fast", "pro"}
+
+
+def test_route_without_rules_falls_back_to_the_least_bad_provider():
+    router = make_router()
+    feed(router, "pro", latency=6.0)
+    feed(router, "fast", latency=3.0)
+    assert router.choose(VISION).name == "fast"
+    feed(router, "fast", count=10, ok=False)
+    assert router.choose(VISION).name == "pro"
+
+
+def test_breaker_factory_gives_each_remote_provider_its_own_breaker():
+    router = make_router(breaker_factory=lambda name: CircuitBreaker(name=name))
+    fast, pro = router.providers["fast"].breaker, router.providers["pro"].breaker
+    assert fast is not pro and fast.name == "fast"
+    assert router.providers[RULES].breaker is None
+
+
+def open_circuit(provider):
+    provider.breaker = CircuitBreaker(name=provider.name, min_calls=1)
+    provider.breaker.record_failure(0.1, "boom")
+
+
+def test_open_circuit_is_skipped():
+    router = make_router()
+    open_circuit(router.providers["pro"])
+    assert router.providers["pro"].circuit_open
+    assert router.choose(CHAT_COMPLEX).name == "fast"
+    assert router.stats()["providers"]["pro"]["circuit"] == "open"
+
+
+def test_open_circuit_is_last_resort_in_a_route_without_rules():
+    router = make_router()
+    open_circuit(router.providers["pro"])
+    feed(router, "fast", latency=3.0)
+    assert router.choose(VISION).name == "fast"
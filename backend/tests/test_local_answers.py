@@ -0,0 +1,49 @@
+import pytest
+
+from gemini_service import GeminiService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("GEMINI_BACKEND", "fake")
+    monkeypatch.setenv("GEMINI_DISK_CACHE_PATH", "")
+    monkeypatch.setenv("LOCAL_ANSWER_MAX_SEVERITY", "1")
+    return GeminiService()
+
+
+CONFIDENT = [("Migraine", 0.9), ("Tension", 0.5)]
+
+
+def test_off_by_default(monkeypatch):
+    monkeypatch.setenv("GEMINI_BACKEND", "fake")
+    monkeypatch.setenv("GEMINI_DISK_CACHE_PATH", "")
+    monkeypatch.delenv("LOCAL_ANSWER_MAX_SEVERITY", raising=False)
+    assert not GeminiService()._can_answer_locally(1, CONFIDENT, "migraine")
+
+
+def test_confident_known_message(service):
+    assert service._can_answer_locally(1, CONFIDENT, "i have a migraine")
+
+
+def test_needs_clear_lead_over_runner_up(service):
+    tied = [("Tension", 0.62), ("Dehydration", 0.62), ("Sinusitis", 0.62)]
+    assert not service._can_answer_locally(1, tied, "i have a migraine")
+
+
+def test_needs_min_score(service):
+    assert not service._can_answer_locally(1, [("Migraine", 0.4)], "migraine")
+
+
+def test_respects_max_severity(service):
+    assert not service._can_answer_locally(2, CONFIDENT, "i have a migraine")
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "i have a migraine and i am pregnant",
+        "i have a migraine and my child swallowed bleach",
+    ],
+)
+def test_refuses_words_the_scorer_does_not_know(service, message):
+    assert not service._can_answer_locally(1, CONFIDENT, message)
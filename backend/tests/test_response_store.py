@@ -0,0 +1,74 @@
+import threading
+import time
+
+from response_store import EXPIRED, PENDING, READY, ResponseStore
+
+
+class SharedCache:
+    """In-memory stand-in for the disk cache shared by workers"""
+
+    def __init__(self):
+        self.items = {}
+
+    def get(self, key):
+        return self.items.get(key)
+
+    def put(self, key, value, kind=None):
+        self.items[key] = value
+
+
+def remote_id(offset=0.0):
+    """An id as another worker would have made it"""
+    return f"{int(time.time() + offset)}-0123456789abcdef"
+
+
+def test_local_result_after_wait():
+    store = ResponseStore()
+    response_id = store.submit(lambda: "answer")
+    entry = store.get(response_id, wait=2)
+    assert entry["status"] == READY
+    assert entry["result"] == "answer"
+
+
+def test_remote_id_waits_for_the_shared_result():
+    shared = SharedCache()
+    store = ResponseStore(shared_cache=lambda: shared)
+    response_id = remote_id()
+    threading.Timer(
+        0.2,
+        shared.put,
+        (f"responses:{response_id}", {"status": READY, "result": 1, "error": None}),
+    ).start()
+
+    started = time.monotonic()
+    entry = store.get(response_id, wait=3)
+    assert entry["status"] == READY
+    assert entry["result"] == 1
+    assert time.monotonic() - started < 2
+
+
+def test_remote_id_honors_wait_while_pending():
+    store = ResponseStore(shared_cache=SharedCache)
+    started = time.monotonic()
+    assert store.get(remote_id(), wait=0.3)["status"] == PENDING
+    assert time.monotonic() - started >= 0.3
+
+
+def test_remote_id_without_wait_returns_at_once():
+    store = ResponseStore(shared_cache=SharedCache)
+    started = time.monotonic()
+    assert store.get(remote_id())["status"] == PENDING
+    assert time.monotonic() - started < 0.1
+
+
+def test_old_remote_id_is_expired():
+    store = ResponseStore(ttl=60)
+    assert store.get(remote_id(-120), wait=1)["status"] == EXPIRED
+
+
+def test_malformed_and_future_ids_are_expired_without_waiting():
+    store = ResponseStore()
+    started = time.monotonic()
+    for response_id in ["abc-0123456789abcdef", "12345", "", remote_id(3600)]:
+        assert store.get(response_id, wait=1)["status"] == EXPIRED
+    assert time.monotonic() - started < 0.5
@@ -0,0 +1,93 @@
+import pytest
+
+from knowledge_base import knowledge_base
+from semantic_cache import SemanticCache, content_words
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(
+        capacity=16,
+        threshold=0.85,
+        symptom_words=lambda symptoms: knowledge_base.current().symptom_words(symptoms),
+    )
+
+
+def store(cache, message, symptoms, answer="cached answer"):
+    cache.put(message, symptoms, (1, tuple(symptoms)), answer)
+
+
+def lookup(cache, message, symptoms):
+    return cache.get(message, symptoms, (1, tuple(symptoms)))
+
+
+def test_content_words_drop_stopwords():
+    assert content_words("I have a fever and I am pregnant") == {"fever", "pregnant"}
+
+
+def test_same_words_hit(cache):
+    store(cache, "i have a fever", ["fever"])
+    answer, similarity = lookup(cache, "I have a  FEVER", ["fever"])
+    assert answer == "cached answer"
+    assert similarity == pytest.approx(1.0)
+
+
+def test_paraphrase_in_symptom_words_hits(cache):
+    cache.threshold = 0.7
+    store(cache, "i have a headache", ["headache"])
+    assert lookup(cache, "my head hurts", ["headache"]) is not None
+
+
+@pytest.mark.parametrize(
+    "cached, message, symptoms",
+    [
+        ("i have a fever", "i have a fever and i am pregnant", ["fever"]),
+        ("i have a fever", "i have a fever and a stiff neck", ["fever"]),
+        (
+            "i have a headache",
+            "i have a headache and my child swallowed bleach",
+            ["headache"],
+        ),
+    ],
+)
+def test_added_context_is_not_served_the_cached_answer(
+    cache, cached, message, symptoms
+):
+    store(cache, cached, symptoms)
+    assert lookup(cache, message, symptoms) is None
+    assert cache.stats()["rejected"] == 1
+
+
+def test_context_missing_from_the_new_message_is_rejected(cache):
+    store(cache, "i have a fever and i am pregnant", ["fever"])
+    assert lookup(cache, "i have a fever", ["fever"]) is None
+
+
+def test_negation_never_matches(cache):
+    store(cache, "i have a fever", ["fever"])
+    assert lookup(cache, "i have no fever", ["fever"]) is None
+
+
+def test_other_partition_never_matches(cache):
+    cache.put("i have a fever", ["fever"], (1, ("fever",)), "mild")
+    assert cache.get("i have a fever", ["fever"], (3, ("fever",))) is None
+
+
+def test_expired_rows_are_ignored(cache):
+    cache.put("i have a fever", ["fever"], (1, ("fever",)), "old", ttl=-1)
+    assert lookup(cache, "i have a fever", ["fever"]) is None
+
+
+def test_oldest_row_is_overwritten_when_full():
+    cache = SemanticCache(capacity=2)
+    for message in ["fever", "cough", "rash"]:
+        cache.put(message, [message], 1, message)
+    assert len(cache) == 2
+    assert cache.get("fever", ["fever"], 1) is None
+    assert cache.get("rash", ["rash"], 1)[0] == "rash"
+
+
+def test_zero_capacity_disables_the_cache():
+    cache = SemanticCache(capacity=0)
+    cache.put("i have a fever", ["fever"], 1, "answer")
+    assert cache.get("i have a fever", ["fever"], 1) is None
@@ -0,0 +1,80 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from caching import SingleFlight
+
+CALLERS = 8
+
+
+def wait_for_followers(flight, count):
+    """Until `count` callers are waiting on the leader"""
+    deadline = time.monotonic() + 5
+    while flight.stats()["coalesced"] < count and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "answer"
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as pool:
+        leader = pool.submit(flight.do, "k", slow)
+        assert started.wait(5)
+        followers = [pool.submit(flight.do, "k", slow) for _ in range(CALLERS - 1)]
+        wait_for_followers(flight, CALLERS - 1)
+        release.set()
+        results = [leader.result(5)] + [f.result(5) for f in followers]
+
+    assert results == ["answer"] * CALLERS
+    assert len(calls) == 1
+    stats = flight.stats()
+    assert stats == {
+        "name": "single_flight",
+        "in_flight": 0,
+        "leaders": 1,
+        "coalesced": CALLERS - 1,
+    }
+
+
+def test_followers_get_the_leaders_exception():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("upstream down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "k", failing)
+        assert started.wait(5)
+        follower = pool.submit(flight.do, "k", failing)
+        wait_for_followers(flight, 1)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError, match="upstream down"):
+                future.result(5)
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats()["coalesced"] == 0
+
+
+def test_nothing_is_remembered_after_the_call():
+    flight = SingleFlight()
+    assert flight.do("k", lambda: 1) == 1
+    assert flight.do("k", lambda: 2) == 2
+    assert flight.stats()["leaders"] == 2
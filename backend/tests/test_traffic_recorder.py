@@ -0,0 +1,92 @@
+import pytest
+
+from traffic_recorder import TrafficRecorder, read_records, scrub
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        (
+            "My name is Priya Sharma and I have a fever",
+            "my name is <word> <word> and i have a fever",
+        ),
+        ("i am priya, i have a headache", "i am <word>, i have a headache"),
+        ("this is Rahul Sharma, chest pain", "this is <word> <word>, chest pain"),
+        ("my son Arjun has a cough", "my <word> <word> has a cough"),
+        ("Dr. Mehta said it is a migraine", "<word>. <word> said it is a migraine"),
+        ("Call me at +91 98765 43210", "<word> me at <phone>"),
+        ("write to a.b@example.com", "<word> to <email>"),
+        ("see WWW.example.com/rash", "<word> <url>"),
+        ("<Rahul> has a fever", "<<word>> has a fever"),
+        ("José राहुल has a fever", "<word> <word> has a fever"),
+    ],
+)
+def test_names_and_contact_details_are_masked(message, expected):
+    assert scrub(message) == expected
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "i am tired and dizzy",
+        "i'm sick with a cough",
+        "i am feeling sick",
+        "severe chest pain since 2024-05-01",
+        "headache since 12.05.2024",
+        "temperature 38.5 for 3 days",
+        "bad feaver",
+    ],
+)
+def test_symptom_text_is_kept(message):
+    assert scrub(message) == message
+
+
+def test_capital_letters_do_not_mask_symptoms():
+    assert scrub("I'm Sick with a cough") == "i'm sick with a cough"
+    assert scrub("I am Feeling sick") == "i am feeling sick"
+
+
+TRIAGE = {
+    "non_medical": False,
+    "emergency": {"is_emergency": False},
+    "symptoms": ["fever"],
+    "severity": 1,
+    "durations": [],
+}
+
+
+def record(recorder, message, user_id="u1"):
+    recorder.record(message, user_id, TRIAGE, 0.01, 200)
+
+
+def test_fingerprint_tells_masked_messages_apart(tmp_path):
+    path = tmp_path / "traffic.ndjson"
+    recorder = TrafficRecorder(path=str(path), include_text=True, salt="s")
+    record(recorder, "My name is Priya, I have a fever")
+    record(recorder, "My name is Anna, I have a fever")
+    record(recorder, "my name is  PRIYA, i have a fever")
+
+    first, second, third = read_records(str(path))
+    assert first["message"] == second["message"]
+    assert first["fingerprint"] != second["fingerprint"]
+    assert first["fingerprint"] == third["fingerprint"]
+
+
+def test_hashes_depend_on_the_salt(tmp_path):
+    entries = []
+    for salt in ("a", "b"):
+        path = tmp_path / f"{salt}.ndjson"
+        record(TrafficRecorder(path=str(path), salt=salt), "i have a fever")
+        entries.extend(read_records(str(path)))
+    assert entries[0]["fingerprint"] != entries[1]["fingerprint"]
+    assert entries[0]["user"] != entries[1]["user"]
+
+
+def test_text_is_left_out_by_default(tmp_path, monkeypatch):
+    path = tmp_path / "traffic.ndjson"
+    monkeypatch.setenv("CHAT_RECORD_PATH", str(path))
+    monkeypatch.delenv("CHAT_RECORD_TEXT", raising=False)
+    record(TrafficRecorder.from_env(), "My name is Priya, I have a fever")
+    (entry,) = read_records(str(path))
+    assert "message" not in entry
+    assert entry["symptoms"] == ["fever"]
@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+
+from upstream_scheduler import (
+    CHAT,
+    EMERGENCY,
+    IMAGE,
+    LoadShedError,
+    TokenBucket,
+    UpstreamScheduler,
+)
+
+ROOMY = {EMERGENCY: 100.0, CHAT: 100.0, IMAGE: 100.0}
+
+
+def occupy(scheduler):
+    """Submit a job that holds the only worker until the returned event is set"""
+    started, release = threading.Event(), threading.Event()
+
+    def gate():
+        started.set()
+        release.wait(5)
+
+    future = scheduler.submit(gate, EMERGENCY)
+    assert started.wait(5)
+    return release, future
+
+
+def warm_up(scheduler, calls=30):
+    """Teach the scheduler that calls are quick, so short budgets admit work"""
+    for _ in range(calls):
+        scheduler.submit(lambda: None, CHAT).result(5)
+
+
+def test_result_and_exception_come_back_through_the_future():
+    scheduler = UpstreamScheduler(max_concurrency=2)
+    assert scheduler.submit(lambda: 42).result(5) == 42
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        scheduler.submit(fail).result(5)
+
+
+def test_higher_priority_runs_first_fifo_within_a_priority():
+    scheduler = UpstreamScheduler(max_concurrency=1, queue_budgets=ROOMY)
+    release, gate = occupy(scheduler)
+
+    order = []
+    futures = [
+        scheduler.submit(lambda name=name: order.append(name), priority)
+        for name, priority in [
+            ("image", IMAGE),
+            ("chat-1", CHAT),
+            ("emergency", EMERGENCY),
+            ("chat-2", CHAT),
+        ]
+    ]
+    release.set()
+    gate.result(5)
+    for future in futures:
+        future.result(5)
+    assert order == ["emergency", "chat-1", "chat-2", "image"]
+
+
+def test_sheds_when_the_predicted_wait_exceeds_the_budget():
+    scheduler = UpstreamScheduler(max_concurrency=1, queue_budgets={CHAT: 0.5})
+    release, gate = occupy(scheduler)
+    try:
+        with pytest.raises(LoadShedError):
+            scheduler.submit(lambda: None, CHAT)
+    finally:
+        release.set()
+    gate.result(5)
+    chat = scheduler.stats()["priorities"]["chat"]
+    assert chat["submitted"] == 1
+    assert chat["shed"] == 1
+    assert chat["started"] == 0
+
+
+def test_queued_job_expires_when_its_budget_runs_out():
+    scheduler = UpstreamScheduler(max_concurrency=1, queue_budgets={CHAT: 0.1})
+    warm_up(scheduler)
+    release, gate = occupy(scheduler)
+    ran = []
+    future = scheduler.submit(lambda: ran.append(1), CHAT)
+    # Hold the worker past the job's budget
+    threading.Timer(0.3, release.set).start()
+    with pytest.raises(LoadShedError):
+        future.result(5)
+    gate.result(5)
+    assert not ran
+    assert scheduler.stats()["priorities"]["chat"]["expired"] == 1
+
+
+def test_token_bucket_paces_calls():
+    bucket = TokenBucket(rate=1.0, burst=2)
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    wait = bucket.try_acquire()
+    assert 0 < wait <= 1.0
+    assert bucket.wait_for(2) > wait
+
+
+def test_token_bucket_rate_zero_is_unlimited():
+    bucket = TokenBucket(rate=0, burst=1)
+    assert all(bucket.try_acquire() == 0.0 for _ in range(100))
+    assert bucket.tokens is None
@@ -0,0 +1,264 @@
+"""
+Traffic Recorder - Anonymized capture of /api/chat requests for offline replay
+Each request becomes one NDJSON line with its timing, triage result (symptoms,
+severity, durations) and prompt fingerprint; user ids are replaced by salted
+hashes. The message itself is only kept when asked for (CHAT_RECORD_TEXT=1),
+and then only its triage vocabulary: contact details and every other word are
+masked. Replay the file with `python -m benchmarks.replay`
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional
+
+from caching import normalize_message, prompt_fingerprint
+from duration_parser import UNITS, WORD_NUMBERS
+from emergency_detector import EmergencyDetector
+from fuzzy_index import COMMON_WORDS
+from knowledge_base import knowledge_base
+from semantic_cache import STOPWORDS
+from severity_classifier import SeverityClassifier
+
+# Dates look like phone numbers to the pattern below but are kept
+_DATE_RE = re.compile(r"\d{4}-\d{1,2}-\d{1,2}|\d{1,2}[.-]\d{1,2}[.-]\d{2,4}")
+
+
+def _mask_phone(match: re.Match) -> str:
+    text = match.group()
+    if _DATE_RE.fullmatch(text) or sum(c.isdigit() for c in text) < 7:
+        return text
+    return "<phone>"
+
+
+_SCRUBBERS = [
+    (re.compile(r"\S+@\S+\.\w+"), "<email>"),
+    (re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE), "<url>"),
+    (re.compile(r"\+?\d[\d\s().-]{6,}\d"), _mask_phone),
+]
+
+# Our placeholders are kept; any other word is checked against the vocabulary.
+# Non-ASCII characters other than punctuation count as letters, so names in
+# any script (combining vowel signs included) are masked whole
+_WORD_RE = re.compile(
+    r"<(?:email|url|phone|word)>|(?:[^\W\d_]|[^\x00-\x7f\u2000-\u206f]|')+"
+)
+
+
+def _triage_words() -> frozenset:
+    """Words of the severity and emergency keyword lists"""
+    phrases = [
+        phrase
+        for phrases in SeverityClassifier().level_indicators.values()
+        for phrase in phrases
+    ]
+    phrases.extend(EmergencyDetector().emergency_keywords)
+    return frozenset(word for phrase in phrases for word in _WORD_RE.findall(phrase))
+
+
+# Everyday words of health messages that the lists above miss
+_HEALTH_WORDS = frozenset(
+    "aches aching bad bleeding breathless cold diarrhea dizziness dizzy eat "
+    "eating fainted itch itchy name nose painful rash runny sleep sleeping sore "
+    "sweating swelling swollen throw threw tired vomited vomiting weak".split()
+)
+
+# Words that never identify anyone: function words, everyday words, durations
+# and the rule-based triage keywords
+KEPT_WORDS = (
+    STOPWORDS
+    | COMMON_WORDS
+    | _HEALTH_WORDS
+    | frozenset(_WORD_RE.findall(" ".join(WORD_NUMBERS)))
+    | frozenset(UNITS)
+    | frozenset(unit[:-1] for unit in UNITS)
+    | _triage_words()
+)
+
+
+def _knowledge_base_word(word: str) -> bool:
+    """Symptom vocabulary of the current knowledge base, typos included"""
+    snapshot = knowledge_base.current()
+    return word in snapshot.vocabulary or snapshot.fuzzy_index.lookup(word) is not None
+
+
+def scrub(
+    message: str, known_word: Callable[[str], bool] = _knowledge_base_word
+) -> str:
+    """
+    Normalized message with emails, URLs and phone numbers masked and every
+    word outside the triage vocabulary replaced by <word>. Names are never
+    guessed at - "this is Rahul" and "my son Arjun" lose the name because it
+    is not a known word, whatever its case
+    """
+    text = message or ""
+    for pattern, replacement in _SCRUBBERS:
+        text = pattern.sub(replacement, text)
+
+    def mask(match):
+        word = match.group()
+        if word[0] == "<" or word in KEPT_WORDS or known_word(word):
+            return word
+        return "<word>"
+
+    # Curly apostrophes straightened so "it’s" is looked up as "it's"
+    return _WORD_RE.sub(mask, normalize_message(text).replace("\u2019", "'"))
+
+
+def read_records(path: str) -> Iterator[Dict]:
+    """Records of a recorded NDJSON file (malformed lines are skipped)"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class TrafficRecorder:
+    """
+    Appends one line per recorded request to `path` (disabled when empty)
+
+    Args:
+        sample_rate: Share of requests recorded
+        include_text: Keep the scrubbed message (see scrub); without it a
+            replay rebuilds messages from the recorded symptoms
+        salt: Salt for user id and prompt hashes (random per process if not
+            given, so hashes only group requests within one worker's recording)
+        max_bytes: Stop recording once the file reaches this size (0 = no limit)
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        sample_rate: float = 1.0,
+        include_text: bool = False,
+        salt: Optional[str] = None,
+        max_bytes: int = 0,
+    ):
+        self.path = path or None
+        self.sample_rate = sample_rate
+        self.include_text = include_text
+        self.salt = salt or os.urandom(16).hex()
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._rng = random.Random()
+        self.recorded = 0
+        self.skipped = 0
+        self.full = False
+
+    @classmethod
+    def from_env(cls, prefix: str = "CHAT_RECORD_") -> "TrafficRecorder":
+        """Configure from CHAT_RECORD_* environment variables"""
+        env = lambda key, default: os.getenv(prefix + key, default)
+        return cls(
+            path=env("PATH", ""),
+            sample_rate=float(env("SAMPLE_RATE", "1")),
+            include_text=env("TEXT", "0") == "1",
+            salt=env("SALT", "") or None,
+            max_bytes=int(float(env("MAX_MB", "100")) * 1024 * 1024),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and not self.full
+
+    def _anonymize_user(self, user_id: Optional[str]) -> str:
+        digest = hashlib.sha256(f"{self.salt}:{user_id or ''}".encode("utf-8"))
+        return digest.hexdigest()[:12]
+
+    def _fingerprint(self, message: str, triage: Dict, durations) -> str:
+        """
+        Salted prompt fingerprint of the message as received: repeats of one
+        prompt group together, messages that differ only in masked details
+        do not, and the hash cannot be checked against a guessed message
+        """
+        fingerprint = prompt_fingerprint(
+            message, triage["symptoms"], triage["severity"], None, durations
+        )
+        digest = hashlib.sha256(f"{self.salt}:{fingerprint}".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def record(
+        self,
+        message: str,
+        user_id: Optional[str],
+        triage: Optional[Dict],
+        seconds: float,
+        status: int,
+        speculative: bool = False,
+    ):
+        """Append one request (no-op when disabled or not sampled)"""
+        if not self.enabled:
+            return
+        if self.sample_rate < 1:
+            with self._lock:
+                sampled = self._rng.random() < self.sample_rate
+            if not sampled:
+                self.skipped += 1
+                return
+
+        entry = {
+            "ts": round(time.time(), 3),
+            "seconds": round(seconds, 4),
+            "status": status,
+            "user": self._anonymize_user(user_id),
+            "speculative": speculative,
+            "chars": len(normalize_message(message)),
+        }
+        if self.include_text:
+            entry["message"] = scrub(message)
+        if triage is not None:
+            kind = "medical"
+            if triage["non_medical"]:
+                kind = "non_medical"
+            elif triage["emergency"]["is_emergency"]:
+                kind = "emergency"
+            durations = [list(d) for d in triage["durations"] or []]
+            entry.update(
+                {
+                    "kind": kind,
+                    "symptoms": list(triage["symptoms"]),
+                    "severity": triage["severity"],
+                    "durations": durations,
+                    "fingerprint": self._fingerprint(message, triage, durations),
+                }
+            )
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+
+        with self._lock:
+            try:
+                if self._file is None:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    self._file = open(self.path, "a", encoding="utf-8")
+                if self.max_bytes and self._file.tell() >= self.max_bytes:
+                    self.full = True
+                    print(f"[WARNING] Traffic recording stopped: {self.path} is full")
+                    return
+                self._file.write(line)
+                self._file.flush()
+                self.recorded += 1
+            except OSError as e:
+                self.full = True
+                print(f"[WARNING] Traffic recording disabled: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "path": self.path,
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "include_text": self.include_text,
+            "recorded": self.recorded,
+            "skipped": self.skipped,
+        }
@@ -0,0 +1,239 @@
+"""
+Upstream Scheduler - Rate-limited, priority-ordered execution of outbound LLM calls
+Emergency work jumps ahead of chat and image work, calls are paced by a token
+bucket to stay under quota, and work that would wait past its queue budget is
+shed immediately so the caller can answer with the rule-based fallback
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+EMERGENCY = 0
+CHAT = 1
+IMAGE = 2
+
+PRIORITY_NAMES = {EMERGENCY: "emergency", CHAT: "chat", IMAGE: "image"}
+
+
+class LoadShedError(Exception):
+    """Raised instead of queueing when the wait would exceed the queue budget"""
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst` (rate 0 = unlimited)"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """Take a token and return 0, or return seconds until one is available"""
+        if not self.rate:
+            return 0.0
+        self._refill(time.monotonic())
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def wait_for(self, count: int) -> float:
+        """Seconds until `count` tokens will have accumulated"""
+        if not self.rate:
+            return 0.0
+        self._refill(time.monotonic())
+        return max(0.0, (count - self._tokens) / self.rate)
+
+    @property
+    def tokens(self) -> Optional[float]:
+        if not self.rate:
+            return None
+        self._refill(time.monotonic())
+        return round(self._tokens, 2)
+
+
+class _Job:
+    __slots__ = ("fn", "future", "priority", "enqueued", "deadline")
+
+    def __init__(self, fn, priority, deadline):
+        self.fn = fn
+        self.future = Future()
+        self.priority = priority
+        self.enqueued = time.monotonic()
+        self.deadline = self.enqueued + deadline
+
+
+class UpstreamScheduler:
+    """
+    Runs submitted calls on at most `max_concurrency` worker threads, highest
+    priority first (FIFO within a priority), at most `rate_per_minute` starts
+    per minute. Limits are per process, i.e. per gunicorn worker.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        rate_per_minute: float = 0,
+        burst: float = 10,
+        queue_budgets: Optional[Dict[int, float]] = None,
+        name: str = "upstream",
+    ):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.queue_budgets = {EMERGENCY: 5.0, CHAT: 1.0, IMAGE: 2.0}
+        self.queue_budgets.update(queue_budgets or {})
+
+        self._bucket = TokenBucket(rate_per_minute / 60.0, burst)
+        self._cond = threading.Condition()
+        self._queue: List[tuple] = []
+        self._sequence = itertools.count()
+        self._active = 0
+        self._workers_pid = None
+        # Smoothed upstream call duration, used to predict queue waits
+        self._service_time = 1.0
+
+        self._counters = {
+            priority: {
+                "submitted": 0,
+                "shed": 0,
+                "expired": 0,
+                "started": 0,
+                "completed": 0,
+                "wait_total": 0.0,
+                "wait_max": 0.0,
+            }
+            for priority in PRIORITY_NAMES
+        }
+
+    def _ensure_workers(self):
+        """Start worker threads (again in a forked child - threads do not survive fork)"""
+        pid = os.getpid()
+        if self._workers_pid == pid:
+            return
+        self._workers_pid = pid
+        self._queue.clear()
+        self._active = 0
+        for index in range(self.max_concurrency):
+            threading.Thread(
+                target=self._work, name=f"{self.name}-{index}", daemon=True
+            ).start()
+
+    def _estimated_wait(self, priority: int) -> float:
+        """Predicted queue wait for a new job of this priority (lock held)"""
+        ahead = sum(1 for entry in self._queue if entry[0] <= priority)
+        slots_needed = ahead + self._active - self.max_concurrency + 1
+        wait = max(0, slots_needed) / self.max_concurrency * self._service_time
+        return max(wait, self._bucket.wait_for(ahead + 1))
+
+    def submit(self, fn: Callable, priority: int = CHAT) -> Future:
+        """
+        Queue fn() and return its Future
+
+        Raises LoadShedError right away when the predicted wait exceeds the
+        priority's queue budget; a queued job still waiting when its budget
+        runs out fails with LoadShedError instead of running.
+        """
+        budget = self.queue_budgets.get(priority, self.queue_budgets[CHAT])
+        with self._cond:
+            self._ensure_workers()
+            counters = self._counters[priority]
+            counters["submitted"] += 1
+            if self._estimated_wait(priority) > budget:
+                counters["shed"] += 1
+                raise LoadShedError(
+                    f"{PRIORITY_NAMES[priority]} queue wait would exceed {budget:g}s"
+                )
+            job = _Job(fn, priority, budget)
+            heapq.heappush(self._queue, (priority, next(self._sequence), job))
+            self._cond.notify()
+        return job.future
+
+    def _next_job(self) -> _Job:
+        """Block until a job may start (token available), expiring stale jobs"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._queue and self._queue[0][2].deadline < now:
+                    _, _, stale = heapq.heappop(self._queue)
+                    self._counters[stale.priority]["expired"] += 1
+                    stale.future.set_exception(
+                        LoadShedError(
+                            "queue deadline passed before an upstream slot freed"
+                        )
+                    )
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+                wait = self._bucket.try_acquire()
+                if wait:
+                    self._cond.wait(wait)
+                    continue
+                _, _, job = heapq.heappop(self._queue)
+                self._active += 1
+                waited = now - job.enqueued
+                counters = self._counters[job.priority]
+                counters["started"] += 1
+                counters["wait_total"] += waited
+                counters["wait_max"] = max(counters["wait_max"], waited)
+                return job
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            started = time.monotonic()
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    try:
+                        job.future.set_result(job.fn())
+                    except BaseException as e:
+                        job.future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._active -= 1
+                    self._service_time = 0.8 * self._service_time + 0.2 * (
+                        time.monotonic() - started
+                    )
+                    self._counters[job.priority]["completed"] += 1
+                    self._cond.notify()
+
+    def stats(self) -> Dict:
+        """Queue depth, concurrency, tokens and per-priority counters"""
+        with self._cond:
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, _ in self._queue:
+                queued[PRIORITY_NAMES[priority]] += 1
+            per_priority = {}
+            for priority, counters in self._counters.items():
+                started = counters["started"]
+                per_priority[PRIORITY_NAMES[priority]] = {
+                    "submitted": counters["submitted"],
+                    "shed": counters["shed"],
+                    "expired": counters["expired"],
+                    "started": started,
+                    "completed": counters["completed"],
+                    "queued": queued[PRIORITY_NAMES[priority]],
+                    "queue_budget": self.queue_budgets.get(priority),
+                    "avg_wait": (
+                        round(counters["wait_total"] / started, 4) if started else 0.0
+                    ),
+                    "max_wait": round(counters["wait_max"], 4),
+                }
+            return {
+                "name": self.name,
+                "active": self._active,
+                "max_concurrency": self.max_concurrency,
+                "rate_per_minute": round(self._bucket.rate * 60, 2),
+                "tokens": self._bucket.tokens,
+                "avg_service_time": round(self._service_time, 4),
+                "priorities": per_priority,
+            }
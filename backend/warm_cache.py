@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Warm the persistent Gemini cache before (or right after) a deploy
+
+Runs common messages through the same triage + chat path as /api/chat so their
+answers land in the shared disk cache; every worker then serves them without
+paying Gemini latency.
+
+Usage (from backend/):
+    python warm_cache.py                        # built-in list of common messages
+    python warm_cache.py --file messages.txt    # one message per line
+    python warm_cache.py --stats                # just print cache statistics
+    python warm_cache.py --evict                # drop expired/over-budget entries
+"""
+
+import argparse
+import sys
+import time
+
+DEFAULT_MESSAGES = [
+    "i have a fever",
+    "headache",
+    "i have a headache",
+    "cough for 2 days",
+    "i have a cough",
+    "sore throat",
+    "stomach ache",
+    "i feel dizzy",
+    "i have a fever and cough",
+    "fever and headache for two days",
+    "i feel nauseous",
+    "back pain",
+    "i have a cold",
+    "runny nose and sneezing",
+    "i have diarrhea",
+    "i have been vomiting",
+    "i have a rash",
+    "chest tightness",
+]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Warm the Gemini disk cache")
+    parser.add_argument("--file", help="file with one message per line")
+    parser.add_argument("--stats", action="store_true", help="print stats and exit")
+    parser.add_argument("--evict", action="store_true", help="run eviction and exit")
+    args = parser.parse_args(argv)
+
+    import app
+    from gemini_service import gemini_service
+
+    if not gemini_service.disk_cache:
+        print("❌ Disk cache is disabled (set GEMINI_DISK_CACHE_PATH)")
+        return 1
+
+    if args.stats:
+        print(gemini_service.disk_cache.stats())
+        return 0
+    if args.evict:
+        print(f"🧹 Evicted {gemini_service.disk_cache.evict()} entries")
+        return 0
+    if not gemini_service.is_configured:
+        print("❌ Gemini is not configured - nothing to warm (set GEMINI_API_KEY)")
+        return 1
+
+    messages = DEFAULT_MESSAGES
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            messages = [line.strip() for line in f if line.strip()]
+
+    warmed = skipped = 0
+    started = time.time()
+    for message in messages:
+        triage = app.run_triage(message)
+        if triage["non_medical"] or triage["emergency"]["is_emergency"]:
+            skipped += 1
+            continue
+        writes_before = gemini_service.disk_cache.writes
+        gemini_service.chat_medical(
+            message,
+            triage["symptoms"],
+            triage["severity"],
+            durations=triage["durations"],
+        )
+        if gemini_service.disk_cache.writes > writes_before:
+            warmed += 1
+            print(f"✅ {message}")
+        else:
+            print(f"•  {message} (already cached, answered locally or failed)")
+
+    print(
+        f"\n🔥 Warmed {warmed} answers, skipped {skipped} non-chat messages "
+        f"in {time.time() - started:.1f}s"
+    )
+    print(gemini_service.disk_cache.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())